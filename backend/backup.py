@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Export or import the knowledge base (items, chunks and vectors) as NDJSON.
+
+Copyright (C) 2026 Smart Brain Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+Talks to the database in DATABASE_URL directly, so the API does not need to
+be running. Same format as GET /api/v1/export and POST /api/v1/import; a
+``.gz`` path is compressed/decompressed on the fly.
+
+    python backup.py export brain.ndjson.gz
+    python backup.py import brain.ndjson.gz
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import sys
+import time
+
+from dotenv import load_dotenv
+
+from database.connection import db
+from database.embedding_model_dao import EmbeddingModelDAO
+from database.transfer_dao import TransferDAO
+from utils.embeddings import EMBEDDING_MODELS, get_model_spec
+from utils.transfer import export_ndjson, import_ndjson
+
+
+def _open(path: str, mode: str):
+    if path == "-":
+        return sys.stdout if "w" in mode else sys.stdin
+    opener = gzip.open if path.endswith(".gz") else open
+    return opener(path, mode + "t", encoding="utf-8")
+
+
+async def _export(args) -> dict:
+    spec = None
+    if not args.no_vectors:
+        active = await EmbeddingModelDAO(db.pool).get_active()
+        spec = get_model_spec(args.model_id or (active["id"] if active else None))
+    items = 0
+    with _open(args.path, "w") as out:
+        async for line in export_ndjson(TransferDAO(db.pool), spec.id if spec else None,
+                                        spec.dimension if spec else None, batch_size=args.batch_size):
+            out.write(line)
+            items += 1
+    return {"items_exported": items - 1, "model_id": spec.id if spec else None}
+
+
+async def _import(args) -> dict:
+    # embeddings.model_id referencia embedding_models: registrar los modelos como hace el arranque de la API
+    model_dao = EmbeddingModelDAO(db.pool)
+    for spec in EMBEDDING_MODELS.values():
+        await model_dao.ensure_registered(spec)
+
+    async def lines():
+        with _open(args.path, "r") as source:
+            for line in source:
+                if line.strip():
+                    yield line
+
+    return await import_ndjson(TransferDAO(db.pool), lines(), batch_size=args.batch_size)
+
+
+async def _run(args) -> dict:
+    await db.connect()
+    try:
+        return await (_export(args) if args.command == "export" else _import(args))
+    finally:
+        await db.disconnect()
+
+
+def main() -> None:
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=("export", "import"))
+    parser.add_argument("path", help="NDJSON file (.gz to compress), or - for stdout/stdin")
+    parser.add_argument("--model-id", default=None, help="Embedding model of the exported vectors (default: active)")
+    parser.add_argument("--no-vectors", action="store_true", help="Export items only; they are re-embedded on import")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    stats = asyncio.run(_run(args))
+    stats["seconds"] = round(time.perf_counter() - started, 1)
+    print(json.dumps(stats), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
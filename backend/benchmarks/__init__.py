@@ -0,0 +1,9 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# Copyright (C) 2026 Smart Brain Contributors
+#
+# This file is part of Smart Brain.
+# See the LICENSE file at the project root for full terms.
+
+"""Load-test and benchmark harness with local stand-ins for Ollama and the embedder."""
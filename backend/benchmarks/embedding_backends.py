@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Compare embedding backends: throughput, RSS and cosine drift vs. PyTorch.
+
+Copyright (C) 2026 Smart Brain Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+Each backend runs in its own process so peak RSS is not shared. The corpus is
+built with ``chunk_text`` from the text files in static/test_files, repeated
+up to ``--chunks`` chunks.
+
+    python -m benchmarks.embedding_backends --chunks 2000 --threads 4 \\
+        --configs torch onnx onnx:avx2 onnx:avx512_vnni
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+TEST_FILES_DIR = BACKEND_DIR / "static" / "test_files"
+
+
+def build_corpus(num_chunks: int) -> list[str]:
+    from utils.embeddings import chunk_text
+
+    chunks: list[str] = []
+    for path in sorted(TEST_FILES_DIR.glob("*")):
+        if path.suffix.lower() in (".txt", ".csv"):
+            chunks.extend(chunk_text(path.read_text(encoding="utf-8", errors="ignore")))
+    if not chunks:
+        raise SystemExit(f"No text files found in {TEST_FILES_DIR}")
+    return [chunks[i % len(chunks)] for i in range(num_chunks)]
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss está en KiB en Linux y en bytes en macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _worker(config: str, num_chunks: int, batch_size: int, threads: int, out: Path) -> None:
+    from utils.embeddings import load_embedding_model
+
+    backend, _, quantize = config.partition(":")
+    corpus = build_corpus(num_chunks)
+
+    started = time.perf_counter()
+    model = load_embedding_model(backend, quantize or None, threads)
+    load_seconds = time.perf_counter() - started
+
+    model.encode(corpus[:batch_size], batch_size=batch_size)  # calentamiento
+    started = time.perf_counter()
+    vectors = model.encode(corpus, batch_size=batch_size, convert_to_numpy=True)
+    encode_seconds = time.perf_counter() - started
+
+    np.save(out.with_suffix(".npy"), vectors.astype(np.float32))
+    out.write_text(json.dumps({
+        "config": config,
+        "dimension": int(vectors.shape[1]),
+        "load_seconds": round(load_seconds, 3),
+        "encode_seconds": round(encode_seconds, 3),
+        "chunks_per_second": round(len(corpus) / encode_seconds, 1),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }))
+
+
+def _cosine_drift(reference: np.ndarray, candidate: np.ndarray) -> dict:
+    ref = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+    cand = candidate / np.linalg.norm(candidate, axis=1, keepdims=True)
+    cosine = np.sum(ref * cand, axis=1)
+    return {
+        "mean_cosine": round(float(cosine.mean()), 6),
+        "min_cosine": round(float(cosine.min()), 6),
+        "p01_cosine": round(float(np.percentile(cosine, 1)), 6),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--configs", nargs="+", default=["torch", "onnx", "onnx:avx2"],
+                        help="backend[:quantization], the first one is the drift reference")
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--out", type=Path, default=BACKEND_DIR / "benchmarks" / "results")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--worker-out", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        _worker(args.worker, args.chunks, args.batch_size, args.threads, args.worker_out)
+        return
+
+    results = []
+    vectors = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for config in args.configs:
+            out = Path(tmp) / config.replace(":", "_")
+            subprocess.run(
+                [
+                    sys.executable, "-m", "benchmarks.embedding_backends",
+                    "--worker", config, "--worker-out", str(out),
+                    "--chunks", str(args.chunks),
+                    "--batch-size", str(args.batch_size),
+                    "--threads", str(args.threads),
+                ],
+                cwd=BACKEND_DIR,
+                check=True,
+            )
+            results.append(json.loads(out.read_text()))
+            vectors[config] = np.load(out.with_suffix(".npy"))
+
+    reference = args.configs[0]
+    for result in results:
+        result["drift_vs_" + reference.replace(":", "_")] = _cosine_drift(vectors[reference], vectors[result["config"]])
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "chunks": args.chunks,
+            "batch_size": args.batch_size,
+            "threads": args.threads,
+        },
+        "results": results,
+    }
+    args.out.mkdir(parents=True, exist_ok=True)
+    out_file = args.out / f"embedding_backends_{datetime.now(timezone.utc):%Y%m%d_%H%M%S}.json"
+    out_file.write_text(json.dumps(report, indent=2))
+
+    print(f"{'config':<20} {'load s':>8} {'chunks/s':>10} {'RSS MB':>8} {'mean cos':>9} {'min cos':>9}")
+    for result in results:
+        drift = result["drift_vs_" + reference.replace(":", "_")]
+        print(
+            f"{result['config']:<20} {result['load_seconds']:>8} {result['chunks_per_second']:>10} "
+            f"{result['peak_rss_mb']:>8} {drift['mean_cosine']:>9} {drift['min_cosine']:>9}"
+        )
+    print(f"Results written to {out_file}")
+
+
+if __name__ == "__main__":
+    main()
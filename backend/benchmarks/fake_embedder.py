@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Deterministic stand-in for the sentence-transformers embedding model.
+
+Copyright (C) 2026 Smart Brain Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import hashlib
+import re
+import time
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class FakeEmbeddingModel:
+    """
+    Feature-hashing embedder with the same ``encode`` interface as SentenceTransformer.
+
+    Texts that share words get similar vectors, so pgvector search and the RAG
+    similarity threshold behave realistically, and the output is identical
+    across runs. ``seconds_per_chunk`` simulates the model's CPU cost.
+    """
+
+    def __init__(self, dimension: int = 384, seconds_per_chunk: float = 0.0):
+        self.dimension = dimension
+        self.seconds_per_chunk = seconds_per_chunk
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+    def _encode_one(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        for token in _TOKEN_RE.findall(text.lower()):
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            index = int.from_bytes(digest[:4], "little") % self.dimension
+            sign = 1.0 if digest[4] & 1 else -1.0
+            vector[index] += sign
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def encode(self, sentences, batch_size: int = 32, **kwargs) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if self.seconds_per_chunk:
+            time.sleep(self.seconds_per_chunk * len(texts))
+        vectors = np.stack([self._encode_one(t) for t in texts]) if texts else np.zeros((0, self.dimension))
+        return vectors[0] if single else vectors
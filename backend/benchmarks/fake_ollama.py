@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Fake Ollama HTTP server with configurable latency and token rate.
+
+Copyright (C) 2026 Smart Brain Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+Implements the subset of the Ollama REST API used by the backend
+(``/api/generate``, ``/api/chat``, ``/api/embed``, ``/api/embeddings``) and also
+serves synthetic HTML pages under ``/pages/<n>.html`` for URL-import workloads.
+
+    python -m benchmarks.fake_ollama --port 11435 --latency 0.3 --tokens-per-second 40
+"""
+import argparse
+import hashlib
+import json
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_ID_RE = re.compile(r"<id>([^<]+)</id>")
+_DOCUMENT_RE = re.compile(r"^### Document \d+:", re.MULTILINE)
+
+_ANSWER_WORDS = (
+    "According to the stored documents the meeting agreed to move the rollout to the next "
+    "quarter and assign the follow-up to the operations team while finance reviews the budget"
+).split()
+
+
+@dataclass
+class FakeOllamaConfig:
+    latency: float = 0.2           # segundos hasta el primer token (prefill)
+    tokens_per_second: float = 50  # velocidad de decodificación
+    num_tokens: int = 60           # longitud de las respuestas de chat
+    embedding_dim: int = 384
+
+
+def _fake_vector(text: str, dim: int) -> list[float]:
+    digest = hashlib.sha256(text.encode("utf-8")).digest()
+    return [((digest[i % len(digest)] / 255.0) * 2 - 1) for i in range(dim)]
+
+
+def _plan_answer(prompt: str) -> str:
+    item_ids = _ID_RE.findall(prompt) or [None]
+    lines = []
+    for n in range(5):
+        item_id = item_ids[n % len(item_ids)]
+        suffix = f" <id>{item_id}</id>" if item_id else ""
+        lines.append(f"📄 Review stored document number {n + 1} and summarise its key points{suffix}")
+    return "\n".join(lines)
+
+
+def _plan_json_answer(prompt: str) -> str:
+    item_ids = _ID_RE.findall(prompt) or [None]
+    tasks = [
+        {
+            "text": f"📄 Review stored document number {n + 1} and summarise its key points",
+            "item_id": item_ids[n % len(item_ids)],
+        }
+        for n in range(5)
+    ]
+    return json.dumps({"tasks": tasks})
+
+
+def _summaries_json_answer(prompt: str) -> str:
+    count = len(_DOCUMENT_RE.findall(prompt))
+    summaries = [
+        {"n": n, "summary": f"Document {n} describes the quarterly review and the follow-up assigned to operations."}
+        for n in range(1, count + 1)
+    ]
+    return json.dumps({"summaries": summaries})
+
+
+def _answer_for(prompt: str, fmt, config: FakeOllamaConfig) -> str:
+    if "task planner" in prompt:
+        return _plan_json_answer(prompt) if fmt else _plan_answer(prompt)
+    if fmt and "Summarize each document" in prompt:
+        return _summaries_json_answer(prompt)
+    words = [_ANSWER_WORDS[i % len(_ANSWER_WORDS)] for i in range(config.num_tokens)]
+    return " ".join(words)
+
+
+def _tokenize(answer: str) -> list[str]:
+    # Mantener los separadores para que la concatenación reproduzca el texto exacto
+    return re.findall(r"\S+\s*|\s+", answer)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "FakeOllama/0.1"
+    protocol_version = "HTTP/1.1"  # necesario para respuestas chunked (streaming)
+    config: FakeOllamaConfig
+
+    def log_message(self, format, *args):  # silenciar el log por petición
+        pass
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _send_json(self, payload: dict, status: int = 200) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.startswith("/pages/"):
+            page = self.path.rsplit("/", 1)[-1].split(".")[0]
+            paragraphs = "".join(
+                f"<p>Synthetic page {page}, paragraph {i}: " + " ".join(_ANSWER_WORDS) + "</p>"
+                for i in range(20)
+            )
+            body = f"<html><head><title>Page {page}</title></head><body>{paragraphs}</body></html>".encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif self.path == "/api/version":
+            self._send_json({"version": "0.0.0-fake"})
+        elif self.path == "/api/tags":
+            self._send_json({"models": [{"name": "gpt-oss:20b", "model": "gpt-oss:20b"}]})
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+    def do_POST(self):
+        request = self._read_json()
+        if self.path == "/api/generate":
+            self._generate(request, chat=False)
+        elif self.path == "/api/chat":
+            self._generate(request, chat=True)
+        elif self.path == "/api/embed":
+            inputs = request.get("input") or ""
+            inputs = [inputs] if isinstance(inputs, str) else inputs
+            self._send_json({
+                "model": request.get("model"),
+                "embeddings": [_fake_vector(t, self.config.embedding_dim) for t in inputs],
+            })
+        elif self.path == "/api/embeddings":
+            self._send_json({"embedding": _fake_vector(request.get("prompt", ""), self.config.embedding_dim)})
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+    def _generate(self, request: dict, chat: bool) -> None:
+        config = self.config
+        if chat:
+            prompt = "\n".join(m.get("content", "") for m in request.get("messages", []))
+        else:
+            prompt = request.get("prompt", "")
+        answer = _answer_for(prompt, request.get("format"), config)
+        tokens = _tokenize(answer)
+        model = request.get("model", "gpt-oss:20b")
+        started = time.perf_counter()
+
+        def _chunk(text: str, done: bool) -> dict:
+            chunk = {
+                "model": model,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "done": done,
+            }
+            if chat:
+                chunk["message"] = {"role": "assistant", "content": text}
+            else:
+                chunk["response"] = text
+            if done:
+                chunk.update({
+                    "done_reason": "stop",
+                    "total_duration": int((time.perf_counter() - started) * 1e9),
+                    "prompt_eval_count": len(prompt.split()),
+                    "eval_count": len(tokens),
+                })
+            return chunk
+
+        time.sleep(config.latency)
+        delay = 1.0 / config.tokens_per_second if config.tokens_per_second > 0 else 0.0
+
+        if not request.get("stream", True):
+            time.sleep(delay * len(tokens))
+            self._send_json(_chunk(answer, done=True))
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def _write(payload: dict) -> None:
+            data = (json.dumps(payload) + "\n").encode("utf-8")
+            self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+        for token in tokens:
+            _write(_chunk(token, done=False))
+            time.sleep(delay)
+        _write(_chunk("", done=True))
+        self.wfile.write(b"0\r\n\r\n")
+
+
+class FakeOllamaServer:
+    """Threaded fake Ollama server that can run in the background of a harness."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, config: FakeOllamaConfig | None = None):
+        handler = type("FakeOllamaHandler", (_Handler,), {"config": config or FakeOllamaConfig()})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeOllamaServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="fake-ollama", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=50)
+    parser.add_argument("--num-tokens", type=int, default=60)
+    args = parser.parse_args()
+
+    config = FakeOllamaConfig(
+        latency=args.latency,
+        tokens_per_second=args.tokens_per_second,
+        num_tokens=args.num_tokens,
+    )
+    server = FakeOllamaServer(args.host, args.port, config)
+    print(f"Fake Ollama listening on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
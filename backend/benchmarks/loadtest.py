@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""End-to-end load test for the Smart Brain API.
+
+Copyright (C) 2026 Smart Brain Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+Starts a fake Ollama server and the API (``benchmarks.serve``, with the
+deterministic fake embedder) against the PostgreSQL/pgvector database in
+DATABASE_URL, drives a seeded mixed workload and writes per-route throughput
+and p50/p95/p99 to a JSON file.
+
+    docker-compose up -d
+    python -m benchmarks.loadtest --duration 60 --concurrency 8 \\
+        --mix upload=2,url=1,chat=3,daily_plan=2,search=2,list=2 \\
+        --baseline benchmarks/results/baseline.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+from benchmarks.fake_ollama import FakeOllamaConfig, FakeOllamaServer
+from benchmarks.stats import compare, summarize
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+TEST_FILES_DIR = BACKEND_DIR / "static" / "test_files"
+UPLOAD_SUFFIXES = {".pdf", ".docx", ".odt", ".xlsx", ".txt", ".csv"}
+
+QUESTIONS = [
+    "What did the Aurora meeting decide?",
+    "Summarise the remote work memo",
+    "Which support incidents were reported in Q4 2024?",
+    "What are the terms of the Vigo office lease?",
+    "Who are the active suppliers?",
+    "What is the 2025 budget for Novatech?",
+]
+SEARCH_TERMS = ["aurora", "novatech", "contrato", "factura", "teletrabajo", "iot", "2024"]
+
+DEFAULT_MIX = "upload=2,url=1,chat=3,daily_plan=2,search=2,list=2"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _parse_mix(spec: str) -> dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name not in WORKLOADS:
+            raise SystemExit(f"Unknown workload '{name}'. Choose from: {', '.join(WORKLOADS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+# --- Workloads: cada una devuelve la respuesta HTTP ---
+
+async def _upload(client: httpx.AsyncClient, rng: random.Random, ctx: dict) -> httpx.Response:
+    path = rng.choice(ctx["upload_files"])
+    files = {"file": (path.name, path.read_bytes())}
+    return await client.post("/api/v1/items/files", files=files)
+
+
+async def _url(client: httpx.AsyncClient, rng: random.Random, ctx: dict) -> httpx.Response:
+    page = rng.randrange(10_000)
+    return await client.post("/api/v1/items/urls", json={"url": f"{ctx['ollama_url']}/pages/{page}.html"})
+
+
+async def _chat(client: httpx.AsyncClient, rng: random.Random, ctx: dict) -> httpx.Response:
+    return await client.post("/api/v1/chat", json={"message": rng.choice(QUESTIONS)})
+
+
+async def _daily_plan(client: httpx.AsyncClient, rng: random.Random, ctx: dict) -> httpx.Response:
+    return await client.get("/api/v1/daily-plan")
+
+
+async def _search(client: httpx.AsyncClient, rng: random.Random, ctx: dict) -> httpx.Response:
+    return await client.post("/api/v1/search", json={"query": rng.choice(SEARCH_TERMS)})
+
+
+async def _list(client: httpx.AsyncClient, rng: random.Random, ctx: dict) -> httpx.Response:
+    return await client.get("/api/v1/items")
+
+
+WORKLOADS = {
+    "upload": _upload,
+    "url": _url,
+    "chat": _chat,
+    "daily_plan": _daily_plan,
+    "search": _search,
+    "list": _list,
+}
+
+
+async def _wait_ready(client: httpx.AsyncClient, process: subprocess.Popen, timeout: float) -> float:
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        if process.poll() is not None:
+            raise SystemExit(f"API process exited with code {process.returncode}")
+        try:
+            response = await client.get("/api/v1/ready")
+            if response.status_code == 200:
+                return time.perf_counter() - started
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.1)
+    raise SystemExit(f"API was not ready after {timeout}s")
+
+
+async def _worker(
+    worker_id: int,
+    client: httpx.AsyncClient,
+    mix: dict[str, float],
+    ctx: dict,
+    seed: int,
+    deadline: float,
+    max_requests: int | None,
+    latencies: dict[str, list[float]],
+    errors: dict[str, int],
+    counter: list[int],
+) -> None:
+    rng = random.Random(seed + worker_id)
+    names, weights = list(mix), list(mix.values())
+    while time.perf_counter() < deadline:
+        if max_requests is not None:
+            if counter[0] >= max_requests:
+                return
+            counter[0] += 1
+        name = rng.choices(names, weights)[0]
+        started = time.perf_counter()
+        try:
+            response = await WORKLOADS[name](client, rng, ctx)
+            ok = response.status_code < 400 and not _is_soft_failure(name, response)
+        except httpx.HTTPError:
+            ok = False
+        elapsed = time.perf_counter() - started
+        if ok:
+            latencies[name].append(elapsed)
+        else:
+            errors[name] += 1
+
+
+def _is_soft_failure(name: str, response: httpx.Response) -> bool:
+    # La API responde 201 con status "failed" cuando falla la extracción
+    if name in ("upload", "url"):
+        return response.json().get("status") == "failed"
+    return False
+
+
+async def run(args: argparse.Namespace) -> dict:
+    mix = _parse_mix(args.mix)
+    fake = FakeOllamaServer(
+        port=args.ollama_port,
+        config=FakeOllamaConfig(
+            latency=args.ollama_latency,
+            tokens_per_second=args.ollama_tps,
+            num_tokens=args.ollama_tokens,
+        ),
+    ).start()
+
+    port = args.api_port or _free_port()
+    command = [
+        sys.executable, "-m", "benchmarks.serve",
+        "--port", str(port),
+        "--ollama-url", fake.url,
+        "--embed-seconds-per-chunk", str(args.embed_seconds_per_chunk),
+    ]
+    if args.real_embedder:
+        command.append("--real-embedder")
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=os.environ.copy())
+
+    base_url = f"http://127.0.0.1:{port}"
+    limits = httpx.Limits(max_connections=args.concurrency * 2)
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=args.request_timeout, limits=limits) as client:
+            startup_seconds = await _wait_ready(client, process, args.startup_timeout)
+
+            ctx = {
+                "ollama_url": fake.url,
+                "upload_files": sorted(
+                    p for p in TEST_FILES_DIR.iterdir()
+                    if p.suffix.lower() in UPLOAD_SUFFIXES and not p.name.startswith(".")
+                ),
+            }
+
+            latencies: dict[str, list[float]] = defaultdict(list)
+            errors: dict[str, int] = defaultdict(int)
+            counter = [0]
+            started = time.perf_counter()
+            deadline = started + args.duration
+            await asyncio.gather(*(
+                _worker(i, client, mix, ctx, args.seed, deadline, args.requests, latencies, errors, counter)
+                for i in range(args.concurrency)
+            ))
+            elapsed = time.perf_counter() - started
+
+            server_metrics = (await client.get("/metrics")).text
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        fake.stop()
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "startup_seconds": round(startup_seconds, 3),
+            "config": {
+                "duration": args.duration,
+                "requests": args.requests,
+                "concurrency": args.concurrency,
+                "mix": mix,
+                "seed": args.seed,
+                "ollama_latency": args.ollama_latency,
+                "ollama_tps": args.ollama_tps,
+                "ollama_tokens": args.ollama_tokens,
+                "embed_seconds_per_chunk": args.embed_seconds_per_chunk,
+                "real_embedder": args.real_embedder,
+            },
+        },
+        "total": summarize(all_latencies, sum(errors.values()), elapsed),
+        "routes": {
+            name: summarize(latencies.get(name, []), errors.get(name, 0), elapsed)
+            for name in mix
+        },
+        "server_metrics": server_metrics,
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=BACKEND_DIR, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to drive load")
+    parser.add_argument("--requests", type=int, default=None, help="Stop after this many requests")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Workload weights, e.g. chat=3,upload=1")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--api-port", type=int, default=None)
+    parser.add_argument("--ollama-port", type=int, default=0)
+    parser.add_argument("--ollama-latency", type=float, default=0.2, help="Fake Ollama seconds to first token")
+    parser.add_argument("--ollama-tps", type=float, default=50, help="Fake Ollama tokens per second")
+    parser.add_argument("--ollama-tokens", type=int, default=60, help="Fake Ollama answer length")
+    parser.add_argument("--embed-seconds-per-chunk", type=float, default=0.0)
+    parser.add_argument("--real-embedder", action="store_true")
+    parser.add_argument("--request-timeout", type=float, default=120)
+    parser.add_argument("--startup-timeout", type=float, default=120)
+    parser.add_argument("--out", type=Path, default=BACKEND_DIR / "benchmarks" / "results")
+    parser.add_argument("--baseline", type=Path, default=None, help="Previous result JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed regression fraction")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+
+    args.out.mkdir(parents=True, exist_ok=True)
+    out_file = args.out / f"load_{datetime.now(timezone.utc):%Y%m%d_%H%M%S}.json"
+    out_file.write_text(json.dumps(result, indent=2))
+
+    print(f"{'route':<12} {'count':>7} {'err':>5} {'rps':>8} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for name, stats in {**result["routes"], "TOTAL": result["total"]}.items():
+        print(
+            f"{name:<12} {stats['count']:>7} {stats['errors']:>5} {stats['throughput_rps']:>8} "
+            f"{stats['p50_ms']:>8}ms {stats['p95_ms']:>8}ms {stats['p99_ms']:>8}ms"
+        )
+    print(f"Results written to {out_file}")
+
+    if args.baseline:
+        regressions = compare(result, json.loads(args.baseline.read_text()), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
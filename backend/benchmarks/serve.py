@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Boot the FastAPI app for benchmarking, wired to the local stand-ins.
+
+Copyright (C) 2026 Smart Brain Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+Runs in its own process so the load generator does not share an event loop
+with the server. Uses the real database from DATABASE_URL.
+
+    python -m benchmarks.serve --port 5055 --ollama-url http://127.0.0.1:11435
+"""
+import argparse
+import os
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--ollama-url", required=True, help="Base URL of the (fake) Ollama server")
+    parser.add_argument("--embed-seconds-per-chunk", type=float, default=0.0,
+                        help="Simulated CPU cost of the fake embedder")
+    parser.add_argument("--real-embedder", action="store_true",
+                        help="Use the configured sentence-transformers model instead of the fake one")
+    args = parser.parse_args()
+
+    # El cliente de ollama lee OLLAMA_HOST al importarse: fijarlo antes de importar la app
+    os.environ["OLLAMA_HOST"] = args.ollama_url
+
+    import uvicorn
+
+    import main as app_module
+    from utils import embeddings
+
+    if not args.real_embedder:
+        from benchmarks.fake_embedder import FakeEmbeddingModel
+
+        embeddings.set_embedding_model(FakeEmbeddingModel(seconds_per_chunk=args.embed_seconds_per_chunk))
+
+    uvicorn.run(app_module.app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
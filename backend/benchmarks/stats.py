@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Latency statistics and regression comparison for benchmark results.
+
+Copyright (C) 2026 Smart Brain Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import math
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Linear-interpolated percentile (same definition as numpy's default)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100.0
+    low, high = math.floor(rank), math.ceil(rank)
+    if low == high:
+        return ordered[int(rank)]
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    """Summary for one route: latencies in seconds in, milliseconds out."""
+    count = len(latencies)
+    return {
+        "count": count,
+        "errors": errors,
+        "throughput_rps": round(count / elapsed, 3) if elapsed > 0 else 0.0,
+        "mean_ms": round(1000 * sum(latencies) / count, 2) if count else 0.0,
+        "p50_ms": round(1000 * percentile(latencies, 50), 2),
+        "p95_ms": round(1000 * percentile(latencies, 95), 2),
+        "p99_ms": round(1000 * percentile(latencies, 99), 2),
+        "max_ms": round(1000 * max(latencies), 2) if count else 0.0,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float = 0.2) -> list[str]:
+    """
+    List regressions between two result files.
+
+    A route regresses when its p95 grows, or its throughput drops, by more
+    than ``tolerance`` (fraction) relative to the baseline.
+    """
+    regressions = []
+    for route, base in baseline.get("routes", {}).items():
+        cur = current.get("routes", {}).get(route)
+        if not cur or not base.get("count"):
+            continue
+        if base["p95_ms"] and cur["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{route}: p95 {base['p95_ms']}ms -> {cur['p95_ms']}ms")
+        if base["throughput_rps"] and cur["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"{route}: throughput {base['throughput_rps']} -> {cur['throughput_rps']} req/s"
+            )
+    return regressions
+
+
+def recall_at_k(retrieved: list, relevant: list, k: int) -> float:
+    """Fraction of the true top-``k`` that appears in the first ``k`` retrieved ids."""
+    if k <= 0:
+        return 0.0
+    truth = set(relevant[:k])
+    if not truth:
+        return 0.0
+    return len(truth.intersection(retrieved[:k])) / len(truth)
@@ -17,95 +17,492 @@ GNU Affero General Public License for more details.
 You should have received a copy of the GNU Affero General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
+import logging
+import math
+import os
+import re
+from datetime import datetime
 from uuid import UUID
 from typing import Optional
 
 import asyncpg
 
+from utils.embeddings import EmbeddingModelSpec, get_active_model_id, get_model_spec
+from utils.metrics import VECTOR_SEARCH_SECONDS
+
+
+VECTOR_SEARCH_MODES = ("full", "halfvec", "binary")
+# Índice usado en la primera pasada de search_similar (ver EmbeddingModelDAO.ensure_index)
+VECTOR_SEARCH_MODE = os.getenv("VECTOR_SEARCH_MODE", "full")
+# Candidatos por resultado que se re-ordenan con la distancia exacta
+VECTOR_SEARCH_OVERFETCH = {
+    "halfvec": int(os.getenv("VECTOR_SEARCH_OVERFETCH_HALFVEC", "2")),
+    "binary": int(os.getenv("VECTOR_SEARCH_OVERFETCH_BINARY", "10")),
+}
+# Búsquedas acotadas a items (retrieval_scope): hasta este número de chunks se escanea exacto
+SCOPED_EXACT_MAX_CHUNKS = int(os.getenv("SCOPED_EXACT_MAX_CHUNKS", "5000"))
+SCOPED_MAX_EF_SEARCH = 1000  # máximo admitido por pgvector
+
+logger = logging.getLogger(__name__)
+
+
+def _vector_literal(embedding: list[float]) -> str:
+    # Convert list to pgvector string format: '[1.0, 2.0, 3.0]'
+    return '[' + ','.join(map(str, embedding)) + ']'
+
 
 class EmbeddingDAO:
-    """DAO for embeddings table."""
+    """DAO for embeddings table. Every row belongs to one embedding model (model_id)."""
     
     def __init__(self, pool: asyncpg.Pool):
         self.pool = pool
+        self._iterative_scan: Optional[bool] = None
     
-    async def create(self, item_id: UUID, chunk_index: int, chunk_text: str, embedding: list[float]) -> UUID:
-        """Insert new embedding chunk."""
+    async def create(
+        self,
+        item_id: UUID,
+        chunk_index: int,
+        chunk_text: str,
+        embedding: list[float],
+        model_id: Optional[str] = None,
+    ) -> UUID:
+        """Insert new embedding chunk (for the active model unless ``model_id`` is given)."""
         async with self.pool.acquire() as conn:
             query = """
-                INSERT INTO embeddings (item_id, chunk_index, chunk_text, embedding)
-                VALUES ($1, $2, $3, $4::vector)
-                ON CONFLICT (item_id, chunk_index) 
-                DO UPDATE SET chunk_text = $3, embedding = $4::vector
+                INSERT INTO embeddings (item_id, model_id, chunk_index, chunk_text, embedding)
+                VALUES ($1, $2, $3, $4, $5::vector)
+                ON CONFLICT (item_id, model_id, chunk_index) 
+                DO UPDATE SET chunk_text = $4, embedding = $5::vector
                 RETURNING id
             """
-            # Convert list to pgvector string format: '[1.0, 2.0, 3.0]'
-            embedding_str = '[' + ','.join(map(str, embedding)) + ']'
-            row = await conn.fetchrow(query, item_id, chunk_index, chunk_text, embedding_str)
+            row = await conn.fetchrow(
+                query, item_id, model_id or get_active_model_id(), chunk_index, chunk_text, _vector_literal(embedding)
+            )
             return row["id"]
     
-    async def get_by_item(self, item_id: UUID) -> list[dict]:
-        """Get all embedding chunks for an item."""
+    async def replace_for_item(
+        self,
+        item_id: UUID,
+        chunks: list[tuple[str, list[float]]],
+        model_id: Optional[str] = None,
+    ) -> int:
+        """
+        Atomically replace an item's chunks for one model.
+
+        Old rows of that model are deleted first so a shorter re-chunking does not
+        leave stale tail chunks; the other models' rows are untouched.
+        """
+        model_id = model_id or get_active_model_id()
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(
+                    "DELETE FROM embeddings WHERE item_id = $1 AND model_id = $2", item_id, model_id
+                )
+                await conn.executemany(
+                    """
+                    INSERT INTO embeddings (item_id, model_id, chunk_index, chunk_text, embedding)
+                    VALUES ($1, $2, $3, $4, $5::vector)
+                    """,
+                    [
+                        (item_id, model_id, index, chunk, _vector_literal(vector))
+                        for index, (chunk, vector) in enumerate(chunks)
+                    ],
+                )
+        return len(chunks)
+    
+    async def get_by_item(self, item_id: UUID, model_id: Optional[str] = None) -> list[dict]:
+        """Get all embedding chunks for an item (active model)."""
         async with self.pool.acquire() as conn:
             query = """
-                SELECT id, item_id, chunk_index, chunk_text, created_at
+                SELECT id, item_id, model_id, chunk_index, chunk_text, created_at
                 FROM embeddings
-                WHERE item_id = $1
+                WHERE item_id = $1 AND model_id = $2
                 ORDER BY chunk_index
             """
-            rows = await conn.fetch(query, item_id)
+            rows = await conn.fetch(query, item_id, model_id or get_active_model_id())
             return [dict(row) for row in rows]
     
-    async def count_by_item(self, item_id: UUID) -> int:
-        """Count embeddings for an item."""
+    async def get_chunks(self, keys: list[tuple[UUID, int]], model_id: Optional[str] = None) -> list[dict]:
+        """Fetch many (item_id, chunk_index) chunks of one model in a single query."""
+        if not keys:
+            return []
         async with self.pool.acquire() as conn:
-            query = "SELECT COUNT(*) as count FROM embeddings WHERE item_id = $1"
-            row = await conn.fetchrow(query, item_id)
+            query = """
+                SELECT e.item_id, e.chunk_index, e.chunk_text
+                FROM unnest($1::uuid[], $2::int[]) AS k(item_id, chunk_index)
+                JOIN embeddings e
+                  ON e.item_id = k.item_id
+                 AND e.model_id = $3
+                 AND e.chunk_index = k.chunk_index
+            """
+            rows = await conn.fetch(
+                query,
+                [item_id for item_id, _ in keys],
+                [chunk_index for _, chunk_index in keys],
+                model_id or get_active_model_id(),
+            )
+            return [dict(row) for row in rows]
+    
+    async def count_by_item(self, item_id: UUID, model_id: Optional[str] = None) -> int:
+        """Count embeddings for an item (active model)."""
+        async with self.pool.acquire() as conn:
+            query = "SELECT COUNT(*) as count FROM embeddings WHERE item_id = $1 AND model_id = $2"
+            row = await conn.fetchrow(query, item_id, model_id or get_active_model_id())
             return row["count"]
     
     async def delete_by_item(self, item_id: UUID) -> int:
-        """Delete all embeddings for an item."""
+        """Delete all embeddings for an item, for every model."""
         async with self.pool.acquire() as conn:
             query = "DELETE FROM embeddings WHERE item_id = $1"
             result = await conn.execute(query, item_id)
             return int(result.split()[-1]) if result else 0
     
-    async def get_items_without_embeddings(self, limit: int = 10) -> list[dict]:
-        """Get items that don't have any embeddings yet."""
+    async def delete_by_model(self, model_id: str) -> int:
+        """Delete every vector produced by a (retired) model."""
+        async with self.pool.acquire() as conn:
+            result = await conn.execute("DELETE FROM embeddings WHERE model_id = $1", model_id)
+            return int(result.split()[-1]) if result else 0
+    
+    async def get_items_without_embeddings(
+        self, limit: int = 10, model_id: Optional[str] = None, lane: Optional[str] = None
+    ) -> list[dict]:
+        """Items without embeddings for the (active) model, of one ``lane`` if given; items in backoff are skipped."""
         async with self.pool.acquire() as conn:
             query = """
-                SELECT i.id, i.title, i.extracted_text, i.source_type
+                SELECT i.id, i.title, i.extracted_text, i.source_type, i.embed_attempts
                 FROM items i
-                LEFT JOIN embeddings e ON i.id = e.item_id
-                WHERE e.id IS NULL 
-                  AND i.status = 'ready'
+                WHERE i.status = 'ready'
                   AND i.extracted_text IS NOT NULL
                   AND i.extracted_text != ''
+                  AND (i.embed_retry_at IS NULL OR i.embed_retry_at <= CURRENT_TIMESTAMP)
+                  AND ($3::text IS NULL OR i.embed_lane = $3)
+                  AND NOT EXISTS (
+                      SELECT 1 FROM embeddings e WHERE e.item_id = i.id AND e.model_id = $2
+                  )
                 ORDER BY i.created_at ASC
                 LIMIT $1
             """
-            rows = await conn.fetch(query, limit)
+            rows = await conn.fetch(query, limit, model_id or get_active_model_id(), lane)
             return [dict(row) for row in rows]
     
-    async def search_similar(self, query_embedding: list[float], limit: int = 5) -> list[dict]:
-        """Search for similar embeddings using cosine similarity."""
+    async def progress_counts(self, model_id: Optional[str] = None) -> dict:
+        """
+        Pending items per embed_lane, items embedded with the (active) model and dead-lettered items.
+
+        One pass over items; used to seed the in-memory progress counters,
+        not on every status poll.
+        """
         async with self.pool.acquire() as conn:
             query = """
+                SELECT embed_lane,
+                       COUNT(*) FILTER (WHERE embedded) AS done,
+                       COUNT(*) FILTER (WHERE NOT embedded AND status = 'ready' AND has_text) AS pending,
+                       COUNT(*) FILTER (WHERE status = 'failed' AND embed_attempts > 0) AS failed
+                FROM (
+                    SELECT i.embed_lane, i.status, i.embed_attempts,
+                           i.extracted_text IS NOT NULL AND i.extracted_text != '' AS has_text,
+                           EXISTS (SELECT 1 FROM embeddings e WHERE e.item_id = i.id AND e.model_id = $1) AS embedded
+                    FROM items i
+                ) t
+                GROUP BY embed_lane
+            """
+            rows = await conn.fetch(query, model_id or get_active_model_id())
+            return {
+                "pending": {row["embed_lane"]: row["pending"] for row in rows},
+                "done": sum(row["done"] for row in rows),
+                "failed": sum(row["failed"] for row in rows),
+            }
+
+    async def record_failure(self, item_id: UUID, error: str, retry_in: Optional[float]) -> None:
+        """
+        Count a failed embedding attempt.
+
+        With ``retry_in`` seconds the item stays queued but is not picked
+        again before then; with None it is dead-lettered (status 'failed').
+        The error is kept in error_message either way.
+        """
+        async with self.pool.acquire() as conn:
+            await conn.execute(
+                """
+                UPDATE items
+                SET embed_attempts = embed_attempts + 1,
+                    embed_retry_at = CURRENT_TIMESTAMP + make_interval(secs => COALESCE($3::float8, 0)),
+                    status = CASE WHEN $3::float8 IS NULL THEN 'failed' ELSE status END,
+                    error_message = $2
+                WHERE id = $1
+                """,
+                item_id,
+                error,
+                retry_in,
+            )
+
+    async def clear_failures(self, item_id: UUID) -> None:
+        """Reset the retry state of an item that was finally embedded."""
+        async with self.pool.acquire() as conn:
+            await conn.execute(
+                "UPDATE items SET embed_attempts = 0, embed_retry_at = NULL, error_message = NULL WHERE id = $1",
+                item_id,
+            )
+
+    async def list_dead_letters(self, limit: int = 100) -> list[dict]:
+        """Items that exhausted their embedding attempts, most recent failure first."""
+        async with self.pool.acquire() as conn:
+            query = """
+                SELECT id, title, source_type, embed_attempts, error_message, updated_at
+                FROM items
+                WHERE status = 'failed' AND embed_attempts > 0
+                ORDER BY updated_at DESC
+                LIMIT $1
+            """
+            rows = await conn.fetch(query, limit)
+            return [dict(row) for row in rows]
+
+    async def requeue(self, item_ids: Optional[list[UUID]] = None) -> list[dict]:
+        """
+        Put dead-lettered or backing-off items back in the queue with a fresh attempt budget.
+
+        Without ``item_ids`` every dead-lettered item is requeued. Items that
+        failed extraction (never attempted by the worker) are left alone.
+        Returns the requeued items with their ``embed_lane`` and ``previous_status``.
+        """
+        async with self.pool.acquire() as conn:
+            query = """
+                WITH target AS (
+                    SELECT id, status FROM items
+                    WHERE embed_attempts > 0
+                      AND ($1::uuid[] IS NULL OR id = ANY($1::uuid[]))
+                    FOR UPDATE
+                )
+                UPDATE items i
+                SET status = 'ready', embed_attempts = 0, embed_retry_at = NULL, error_message = NULL
+                FROM target t
+                WHERE i.id = t.id
+                RETURNING i.id, i.embed_lane, t.status AS previous_status
+            """
+            rows = await conn.fetch(query, item_ids)
+            return [dict(row) for row in rows]
+
+    async def get_items_for_backfill(
+        self,
+        model_id: str,
+        after_created_at: Optional[datetime],
+        after_id: Optional[UUID],
+        limit: int = 20,
+    ) -> list[dict]:
+        """
+        Next page of items to re-embed with ``model_id``, in (created_at, id) order.
+
+        Resumes strictly after the checkpointed cursor and skips items that
+        already have vectors for that model (e.g. embedded by the live worker).
+        """
+        async with self.pool.acquire() as conn:
+            query = """
+                SELECT i.id, i.created_at, i.title, i.extracted_text
+                FROM items i
+                WHERE i.status = 'ready'
+                  AND i.extracted_text IS NOT NULL
+                  AND i.extracted_text != ''
+                  AND ($2::timestamptz IS NULL OR (i.created_at, i.id) > ($2::timestamptz, $3::uuid))
+                  AND NOT EXISTS (
+                      SELECT 1 FROM embeddings e WHERE e.item_id = i.id AND e.model_id = $1
+                  )
+                ORDER BY i.created_at, i.id
+                LIMIT $4
+            """
+            rows = await conn.fetch(query, model_id, after_created_at, after_id, limit)
+            return [dict(row) for row in rows]
+    
+    async def _supports_iterative_scan(self, conn) -> bool:
+        """pgvector >= 0.8 can keep walking the HNSW graph until a filter yields enough rows."""
+        if self._iterative_scan is None:
+            version = await conn.fetchval("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+            parts = tuple(int(p) for p in re.findall(r"\d+", version or "0")[:2])
+            self._iterative_scan = parts >= (0, 8)
+        return self._iterative_scan
+    
+    async def _plan_scoped_search(self, conn, spec: EmbeddingModelSpec, item_ids: list[UUID]) -> tuple[str, float]:
+        """
+        Pick the strategy for a search restricted to ``item_ids``.
+
+        Returns (strategy, scope_fraction): ``empty`` when the scope has no
+        chunks, ``exact`` when it is small enough to scan every chunk, ``ann``
+        otherwise. The fraction of the model's chunks in scope sizes the
+        over-fetch when iterative index scans are not available.
+        """
+        scoped = await conn.fetchval(
+            "SELECT COUNT(*) FROM embeddings WHERE model_id = $1 AND item_id = ANY($2::uuid[])",
+            spec.id, item_ids,
+        )
+        if scoped == 0:
+            return "empty", 0.0
+        if scoped <= SCOPED_EXACT_MAX_CHUNKS:
+            return "exact", 1.0
+        # Estimación barata del total (todas las versiones de modelo): sobreestima, no infraestima
+        total = await conn.fetchval("SELECT reltuples::bigint FROM pg_class WHERE oid = 'embeddings'::regclass")
+        return "ann", min(1.0, scoped / total) if total and total > 0 else 1.0
+    
+    async def search_similar(
+        self,
+        query_embedding: list[float],
+        limit: int = 5,
+        spec: Optional[EmbeddingModelSpec] = None,
+        mode: Optional[str] = None,
+        overfetch: Optional[int] = None,
+        item_ids: Optional[list[UUID]] = None,
+    ) -> list[dict]:
+        """
+        Search for similar embeddings using cosine similarity, within one model.
+
+        ``mode`` selects the ANN index used for the first pass (default
+        ``VECTOR_SEARCH_MODE``):
+
+        - ``full``: HNSW over the float32 vectors, exact distances.
+        - ``halfvec``: HNSW over a half-precision copy (half the index size).
+        - ``binary``: HNSW over ``binary_quantize`` bit signatures with Hamming
+          distance (~1/32 of the index size).
+
+        The compact modes fetch ``limit * overfetch`` candidates and rerank them
+        with the exact cosine distance of the stored float32 vectors, so the
+        returned similarity is always exact.
+
+        ``item_ids`` restricts the search to those items (chat retrieval scope).
+        Small scopes (<= ``SCOPED_EXACT_MAX_CHUNKS`` chunks) are scanned exactly
+        without the index; larger ones filter inside the HNSW scan, with
+        iterative scans on pgvector >= 0.8 or an over-fetch sized by the scope's
+        share of the corpus otherwise. When that over-fetch would need an
+        ``hnsw.ef_search`` above ``SCOPED_MAX_EF_SEARCH`` the scope is scanned
+        exactly instead (``strategy="exact_capped"`` in the latency metric).
+
+        The casts and the model_id predicate are inlined as literals so the
+        planner matches that model's partial expression index (see
+        ``EmbeddingModelDAO.ensure_index``); both come from the validated registry.
+        """
+        spec = spec or get_model_spec()
+        mode = mode or VECTOR_SEARCH_MODE
+        if mode not in VECTOR_SEARCH_MODES:
+            raise ValueError(f"Unknown vector search mode '{mode}', use one of {VECTOR_SEARCH_MODES}")
+        dim = int(spec.dimension)
+        embedding_str = _vector_literal(query_embedding)
+        exact_distance = f"(c.embedding::vector({dim})) <=> $1::vector({dim})"
+
+        async with self.pool.acquire() as conn:
+            strategy, fraction = ("ann", 1.0)
+            if item_ids:
+                strategy, fraction = await self._plan_scoped_search(conn, spec, item_ids)
+            if strategy == "empty":
+                return []
+
+            if mode == "full":
+                candidates = limit
+            else:
+                candidates = limit * (overfetch or VECTOR_SEARCH_OVERFETCH[mode])
+            iterative = bool(item_ids) and await self._supports_iterative_scan(conn)
+            # Sin escaneo iterativo, HNSW devuelve como mucho ef_search filas antes del filtro:
+            # ampliarlo en proporción inversa a la fracción del corpus que cubre el ámbito
+            ef_search = candidates if iterative else math.ceil(candidates / fraction)
+            if strategy == "ann" and item_ids and ef_search > SCOPED_MAX_EF_SEARCH:
+                # Con el tope, el índice devolvería menos de ``candidates`` filas del ámbito
+                # y el rerank trabajaría sobre una lista corta: mejor el escaneo exacto
+                logger.info(
+                    "Scoped search needs ef_search above the pgvector limit, scanning exactly",
+                    extra={"model_id": spec.id, "ef_search": ef_search, "scope_fraction": round(fraction, 4)},
+                )
+                strategy = "exact_capped"
+            elif ef_search > SCOPED_MAX_EF_SEARCH:
+                logger.warning(
+                    "Vector search candidates capped by hnsw.ef_search, recall may drop",
+                    extra={"model_id": spec.id, "candidates": candidates, "ef_search": SCOPED_MAX_EF_SEARCH},
+                )
+            ef_search = max(40, min(ef_search, SCOPED_MAX_EF_SEARCH))
+
+            if strategy in ("exact", "exact_capped"):
+                # MATERIALIZED: escanear solo los chunks del ámbito, sin pasar por el índice HNSW
+                query = f"""
+                    WITH c AS MATERIALIZED (
+                        SELECT e.id, e.item_id, e.chunk_index, e.chunk_text, e.embedding
+                        FROM embeddings e
+                        WHERE e.model_id = '{spec.id}'
+                          AND e.item_id = ANY($3::uuid[])
+                    )
+                    SELECT 
+                        c.id,
+                        c.item_id,
+                        c.chunk_index,
+                        c.chunk_text,
+                        i.title,
+                        i.source_type,
+                        i.url,
+                        1 - ({exact_distance}) as similarity
+                    FROM c
+                    JOIN items i ON c.item_id = i.id
+                    WHERE i.status = 'ready'
+                    ORDER BY {exact_distance}
+                    LIMIT $2
+                """
+                with VECTOR_SEARCH_SECONDS.time(mode="exact", strategy=strategy):
+                    rows = await conn.fetch(query, embedding_str, limit, item_ids)
+                return [dict(row) for row in rows]
+
+            if mode == "full" and not item_ids:
+                query = f"""
+                    SELECT 
+                        e.id,
+                        e.item_id,
+                        e.chunk_index,
+                        e.chunk_text,
+                        i.title,
+                        i.source_type,
+                        i.url,
+                        1 - ((e.embedding::vector({dim})) <=> $1::vector({dim})) as similarity
+                    FROM embeddings e
+                    JOIN items i ON e.item_id = i.id
+                    WHERE e.model_id = '{spec.id}'
+                      AND i.status = 'ready'
+                    ORDER BY (e.embedding::vector({dim})) <=> $1::vector({dim})
+                    LIMIT $2
+                """
+                with VECTOR_SEARCH_SECONDS.time(mode=mode, strategy="ann"):
+                    rows = await conn.fetch(query, embedding_str, limit)
+                return [dict(row) for row in rows]
+
+            if mode == "full":
+                candidate_order = f"(e.embedding::vector({dim})) <=> $1::vector({dim})"
+            elif mode == "halfvec":
+                candidate_order = f"(e.embedding::halfvec({dim})) <=> $1::halfvec({dim})"
+            else:
+                candidate_order = f"binary_quantize(e.embedding)::bit({dim}) <~> binary_quantize($1::vector({dim}))"
+
+            scope_filter = "AND e.item_id = ANY($4::uuid[])" if item_ids else ""
+
+            query = f"""
                 SELECT 
-                    e.id,
-                    e.item_id,
-                    e.chunk_text,
+                    c.id,
+                    c.item_id,
+                    c.chunk_index,
+                    c.chunk_text,
                     i.title,
                     i.source_type,
                     i.url,
-                    1 - (e.embedding <=> $1::vector) as similarity
-                FROM embeddings e
-                JOIN items i ON e.item_id = i.id
+                    1 - ({exact_distance}) as similarity
+                FROM (
+                    SELECT e.id, e.item_id, e.chunk_index, e.chunk_text, e.embedding
+                    FROM embeddings e
+                    WHERE e.model_id = '{spec.id}'
+                      {scope_filter}
+                    ORDER BY {candidate_order}
+                    LIMIT $3
+                ) c
+                JOIN items i ON c.item_id = i.id
                 WHERE i.status = 'ready'
-                ORDER BY e.embedding <=> $1::vector
+                ORDER BY {exact_distance}
                 LIMIT $2
             """
-            # Convert list to pgvector string format
-            embedding_str = '[' + ','.join(map(str, query_embedding)) + ']'
-            rows = await conn.fetch(query, embedding_str, limit)
-            return [dict(row) for row in rows]
+            args = (embedding_str, limit, candidates, item_ids) if item_ids else (embedding_str, limit, candidates)
+            async with conn.transaction():
+                await conn.execute(f"SET LOCAL hnsw.ef_search = {ef_search}")
+                if iterative:
+                    # relaxed_order: el orden final lo fija el rerank exacto de fuera
+                    await conn.execute("SET LOCAL hnsw.iterative_scan = relaxed_order")
+                with VECTOR_SEARCH_SECONDS.time(mode=mode, strategy="ann_filtered" if item_ids else "ann"):
+                    rows = await conn.fetch(query, *args)
+        return [dict(row) for row in rows]
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Data Access Object for the embedding model registry and re-embedding checkpoints.
+
+Copyright (C) 2026 Smart Brain Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import re
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+import asyncpg
+
+from utils.embeddings import EmbeddingModelSpec
+
+
+# Expresión indexada por tipo de índice; search_similar usa exactamente la misma
+HNSW_INDEX_EXPRESSIONS = {
+    "full": "(embedding::vector({dim})) vector_cosine_ops",
+    "halfvec": "(embedding::halfvec({dim})) halfvec_cosine_ops",
+    "binary": "(binary_quantize(embedding)::bit({dim})) bit_hamming_ops",
+}
+
+
+def hnsw_index_name(model_id: str, kind: str = "full") -> str:
+    """Name of a partial HNSW index of a model (the ``full`` one must match schemas/init.sql)."""
+    slug = re.sub(r"[^a-z0-9]+", "_", model_id.lower()).strip("_")
+    prefix = "idx_embeddings_hnsw_" if kind == "full" else f"idx_embeddings_hnsw_{kind}_"
+    return f"{prefix}{slug}"[:63]
+
+
+class EmbeddingModelDAO:
+    """DAO for embedding_models table."""
+
+    def __init__(self, pool: asyncpg.Pool):
+        self.pool = pool
+
+    async def ensure_registered(self, spec: EmbeddingModelSpec) -> None:
+        """Insert the model row if missing (status 'registered')."""
+        async with self.pool.acquire() as conn:
+            await conn.execute(
+                """
+                INSERT INTO embedding_models (id, model_name, dimension)
+                VALUES ($1, $2, $3)
+                ON CONFLICT (id) DO NOTHING
+                """,
+                spec.id, spec.model_name, spec.dimension,
+            )
+
+    async def get(self, model_id: str) -> Optional[dict]:
+        async with self.pool.acquire() as conn:
+            row = await conn.fetchrow("SELECT * FROM embedding_models WHERE id = $1", model_id)
+            return dict(row) if row else None
+
+    async def get_active(self) -> Optional[dict]:
+        """The model currently used for queries, if any."""
+        async with self.pool.acquire() as conn:
+            row = await conn.fetchrow("SELECT * FROM embedding_models WHERE status = 'active'")
+            return dict(row) if row else None
+
+    async def list_all(self) -> list[dict]:
+        """All models with their number of stored vectors."""
+        async with self.pool.acquire() as conn:
+            query = """
+                SELECT m.*,
+                       (SELECT COUNT(DISTINCT e.item_id) FROM embeddings e WHERE e.model_id = m.id) AS items_embedded
+                FROM embedding_models m
+                ORDER BY m.created_at
+            """
+            rows = await conn.fetch(query)
+            return [dict(row) for row in rows]
+
+    async def has_vectors(self, model_id: str) -> bool:
+        """Whether any vector of ``model_id`` is stored (they may have been deleted after retiring it)."""
+        async with self.pool.acquire() as conn:
+            return await conn.fetchval("SELECT EXISTS (SELECT 1 FROM embeddings WHERE model_id = $1)", model_id)
+
+    async def list_backfilling(self) -> list[dict]:
+        """Models with an unfinished re-embedding (to resume after a restart)."""
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch("SELECT * FROM embedding_models WHERE status = 'backfilling'")
+            return [dict(row) for row in rows]
+
+    async def start_backfill(self, model_id: str) -> bool:
+        """Mark a registered/retired model as backfilling; the checkpoint is kept."""
+        async with self.pool.acquire() as conn:
+            result = await conn.execute(
+                """
+                UPDATE embedding_models SET status = 'backfilling'
+                WHERE id = $1 AND status IN ('registered', 'retired', 'backfilling')
+                """,
+                model_id,
+            )
+            return result.split()[-1] != "0"
+
+    async def update_checkpoint(
+        self, model_id: str, cursor_created_at: datetime, cursor_id: UUID, items_done: int
+    ) -> None:
+        """Persist the (created_at, id) of the last re-embedded item."""
+        async with self.pool.acquire() as conn:
+            await conn.execute(
+                """
+                UPDATE embedding_models
+                SET backfill_cursor_created_at = $2,
+                    backfill_cursor_id = $3,
+                    backfill_items_done = backfill_items_done + $4
+                WHERE id = $1
+                """,
+                model_id, cursor_created_at, cursor_id, items_done,
+            )
+
+    async def activate(self, model_id: str) -> Optional[str]:
+        """
+        Make ``model_id`` the active model and retire the previous one, atomically.
+
+        Returns the id of the retired model (None if there was none).
+        """
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                previous = await conn.fetchval(
+                    "SELECT id FROM embedding_models WHERE status = 'active' FOR UPDATE"
+                )
+                if previous == model_id:
+                    return None
+                if previous:
+                    await conn.execute(
+                        "UPDATE embedding_models SET status = 'retired' WHERE id = $1", previous
+                    )
+                await conn.execute(
+                    """
+                    UPDATE embedding_models
+                    SET status = 'active', activated_at = CURRENT_TIMESTAMP
+                    WHERE id = $1
+                    """,
+                    model_id,
+                )
+                return previous
+
+    async def ensure_index(self, spec: EmbeddingModelSpec, kind: str = "full") -> str:
+        """
+        Build a partial HNSW index of a model without blocking writes.
+
+        ``kind`` is ``full`` (float32), ``halfvec`` or ``binary`` (see
+        ``EmbeddingDAO.search_similar``). CREATE INDEX CONCURRENTLY cannot run
+        inside a transaction, so it uses a plain connection; id and dimension
+        come from the validated registry. A failed or cancelled concurrent build
+        leaves an INVALID index that IF NOT EXISTS would accept, so that one is
+        dropped and rebuilt.
+        """
+        if kind not in HNSW_INDEX_EXPRESSIONS:
+            raise ValueError(f"Unknown index kind '{kind}', use one of {tuple(HNSW_INDEX_EXPRESSIONS)}")
+        name = hnsw_index_name(spec.id, kind)
+        expression = HNSW_INDEX_EXPRESSIONS[kind].format(dim=int(spec.dimension))
+        async with self.pool.acquire() as conn:
+            valid = await conn.fetchval(
+                """
+                SELECT x.indisvalid
+                FROM pg_index x
+                JOIN pg_class c ON c.oid = x.indexrelid
+                WHERE c.relname = $1 AND x.indrelid = 'embeddings'::regclass
+                """,
+                name,
+            )
+            if valid is False:
+                await conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+            await conn.execute(
+                f"""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON embeddings
+                USING hnsw ({expression})
+                WHERE model_id = '{spec.id}'
+                """
+            )
+        return name
+
+    async def drop_index(self, spec: EmbeddingModelSpec, kind: str) -> str:
+        """Drop one of a model's HNSW indexes (e.g. the float32 one once a compact mode serves)."""
+        if kind not in HNSW_INDEX_EXPRESSIONS:
+            raise ValueError(f"Unknown index kind '{kind}', use one of {tuple(HNSW_INDEX_EXPRESSIONS)}")
+        name = hnsw_index_name(spec.id, kind)
+        async with self.pool.acquire() as conn:
+            await conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+        return name
+
+    async def index_sizes(self, model_id: str) -> dict[str, Optional[int]]:
+        """On-disk size in bytes of each HNSW index of a model (None if it does not exist)."""
+        names = {kind: hnsw_index_name(model_id, kind) for kind in HNSW_INDEX_EXPRESSIONS}
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(
+                """
+                SELECT c.relname, pg_relation_size(c.oid) AS size
+                FROM pg_class c
+                WHERE c.relkind = 'i' AND c.relname = ANY($1::text[])
+                """,
+                list(names.values()),
+            )
+        sizes = {row["relname"]: row["size"] for row in rows}
+        return {kind: sizes.get(name) for kind, name in names.items()}
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Data Access Object for the folder sync manifest (one row per synced file).
+
+Copyright (C) 2026 Smart Brain Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from typing import Optional
+from uuid import UUID
+
+import asyncpg
+
+from utils.folder_sync import manifest_like_pattern
+
+
+class FolderManifestDAO:
+    """DAO for folder_manifest table."""
+
+    def __init__(self, pool: asyncpg.Pool):
+        self.pool = pool
+
+    async def get_for_root(self, root: str) -> dict[str, dict]:
+        """
+        Manifest rows of every file under ``root``, by path.
+
+        Matched by path prefix, not by the ``root`` column: files first synced
+        through a parent or a subfolder of ``root`` are known here too.
+        """
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(
+                """
+                SELECT path, mtime_ns, size, content_hash, item_id
+                FROM folder_manifest
+                WHERE path LIKE $1 ESCAPE '\\'
+                """,
+                manifest_like_pattern(root),
+            )
+            return {row["path"]: dict(row) for row in rows}
+
+    async def upsert_many(self, root: str, entries: list[tuple[str, int, int, Optional[str], Optional[UUID]]]) -> None:
+        """Insert or replace (path, mtime_ns, size, content_hash, item_id) rows."""
+        if not entries:
+            return
+        async with self.pool.acquire() as conn:
+            await conn.executemany(
+                """
+                INSERT INTO folder_manifest (path, root, mtime_ns, size, content_hash, item_id)
+                VALUES ($1, $6, $2, $3, $4, $5)
+                ON CONFLICT (path) DO UPDATE
+                SET root = EXCLUDED.root,
+                    mtime_ns = EXCLUDED.mtime_ns,
+                    size = EXCLUDED.size,
+                    content_hash = EXCLUDED.content_hash,
+                    item_id = EXCLUDED.item_id,
+                    synced_at = CURRENT_TIMESTAMP
+                """,
+                [(*entry, root) for entry in entries],
+            )
+
+    async def delete_paths(self, paths: list[str]) -> int:
+        """Forget files that no longer exist."""
+        if not paths:
+            return 0
+        async with self.pool.acquire() as conn:
+            result = await conn.execute("DELETE FROM folder_manifest WHERE path = ANY($1::text[])", paths)
+            return int(result.split()[-1])
@@ -23,6 +23,19 @@ from datetime import datetime
 
 import asyncpg
 
+# Columnas que se pueden pedir en los listados (GET /api/v1/items?fields=...)
+LIST_FIELDS = (
+    "id", "source_type", "title", "status", "summary", "url", "filename", "tags",
+    "error_message", "extracted_text", "created_at", "updated_at",
+)
+DEFAULT_LIST_FIELDS = ("id", "source_type", "title", "status", "summary", "created_at")
+
+# Filtro de tags: todas (contención) o alguna (solapamiento); ambos usan idx_items_tags
+TAG_MATCH_OPERATORS = {"all": "@>", "any": "&&"}
+
+# Por debajo de este tamaño estimado COUNT(*) es barato y se devuelve el total exacto
+EXACT_COUNT_BELOW = 10000
+
 
 class ItemDAO:
     """DAO for items table."""
@@ -34,8 +47,8 @@ class ItemDAO:
         """Insert new item and return ID."""
         async with self.pool.acquire() as conn:
             query = """
-                INSERT INTO items (source_type, title, url, file_path, filename, tags, extracted_text, status)
-                VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+                INSERT INTO items (source_type, title, url, file_path, filename, tags, extracted_text, status, embed_lane)
+                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
                 RETURNING id
             """
             row = await conn.fetchrow(
@@ -47,7 +60,8 @@ class ItemDAO:
                 item_data.get("filename"),
                 item_data.get("tags", []),
                 item_data.get("extracted_text"),
-                item_data.get("status", "ready")
+                item_data.get("status", "ready"),
+                item_data.get("embed_lane", "interactive"),
             )
             return row["id"]
     
@@ -62,7 +76,7 @@ class ItemDAO:
         """List all items with pagination."""
         async with self.pool.acquire() as conn:
             query = """
-                SELECT id, source_type, title, status, created_at
+                SELECT id, source_type, title, status, summary, created_at
                 FROM items
                 ORDER BY created_at DESC
                 LIMIT $1 OFFSET $2
@@ -70,11 +84,66 @@ class ItemDAO:
             rows = await conn.fetch(query, limit, offset)
             return [dict(row) for row in rows]
     
+    async def list_page(
+        self,
+        limit: int = 50,
+        after: Optional[tuple[datetime, UUID]] = None,
+        fields: tuple[str, ...] = DEFAULT_LIST_FIELDS,
+        search_term: Optional[str] = None,
+    ) -> list[dict]:
+        """
+        One page of items, newest first, using keyset pagination on (created_at, id).
+
+        ``after`` is the (created_at, id) of the last row of the previous page.
+        The redundant ``created_at <= $n`` bound lets idx_items_created_at
+        jump straight to the page instead of scanning the skipped rows like
+        OFFSET does. ``fields`` must come from LIST_FIELDS.
+        """
+        unknown = set(fields).difference(LIST_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown item fields: {sorted(unknown)}")
+        columns = ", ".join(dict.fromkeys(("id", "created_at", *fields)))
+
+        conditions, params = [], []
+        if after is not None:
+            params.extend(after)
+            conditions.append(f"created_at <= ${len(params) - 1} AND (created_at, id) < (${len(params) - 1}, ${len(params)})")
+        if search_term:
+            params.append(f"%{search_term}%")
+            conditions.append(f"(LOWER(title) LIKE LOWER(${len(params)}) OR LOWER(extracted_text) LIKE LOWER(${len(params)}))")
+        params.append(limit)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        async with self.pool.acquire() as conn:
+            query = f"""
+                SELECT {columns}
+                FROM items
+                {where}
+                ORDER BY created_at DESC, id DESC
+                LIMIT ${len(params)}
+            """
+            rows = await conn.fetch(query, *params)
+            return [dict(row) for row in rows]
+    
+    async def count_estimate(self) -> tuple[int, bool]:
+        """
+        Total number of items and whether it is exact.
+
+        Uses the planner statistics (pg_class.reltuples, kept up to date by
+        autovacuum/ANALYZE) for large tables; below EXACT_COUNT_BELOW, or
+        before the table was ever analyzed, counts exactly.
+        """
+        async with self.pool.acquire() as conn:
+            estimate = await conn.fetchval("SELECT reltuples::bigint FROM pg_class WHERE oid = 'items'::regclass")
+            if estimate is not None and estimate >= EXACT_COUNT_BELOW:
+                return int(estimate), False
+            return await conn.fetchval("SELECT COUNT(*) FROM items"), True
+    
     async def list_by_search(self, search_term: str, limit: int = 100) -> list[dict]:
         """Search items by title or extracted_text."""
         async with self.pool.acquire() as conn:
             query = """
-                SELECT id, source_type, title, status, created_at
+                SELECT id, source_type, title, status, summary, created_at
                 FROM items
                 WHERE LOWER(title) LIKE LOWER($1) OR LOWER(extracted_text) LIKE LOWER($1)
                 ORDER BY created_at DESC
@@ -84,8 +153,108 @@ class ItemDAO:
             rows = await conn.fetch(query, search_pattern, limit)
             return [dict(row) for row in rows]
     
-    async def list_by_tags(self, query: str, tags: list[str], limit: int = 5) -> list[dict]:
-        pass
+    async def list_by_tags(
+        self,
+        query: Optional[str],
+        tags: list[str],
+        limit: int = 5,
+        match: str = "all",
+    ) -> list[dict]:
+        """
+        Items carrying ``tags``, optionally also matching ``query`` in title or text.
+
+        ``match="all"`` requires every tag (``tags @> $1``), ``"any"`` at least
+        one (``tags && $1``); both operators are served by the GIN index
+        idx_items_tags.
+        """
+        if match not in TAG_MATCH_OPERATORS:
+            raise ValueError(f"Unknown tag match '{match}', use one of {tuple(TAG_MATCH_OPERATORS)}")
+        params: list = [tags]
+        conditions = [f"tags {TAG_MATCH_OPERATORS[match]} $1::text[]"]
+        if query:
+            params.append(f"%{query}%")
+            conditions.append("(LOWER(title) LIKE LOWER($2) OR LOWER(extracted_text) LIKE LOWER($2))")
+        params.append(limit)
+        async with self.pool.acquire() as conn:
+            sql = f"""
+                SELECT id, source_type, title, status, summary, tags, created_at
+                FROM items
+                WHERE {' AND '.join(conditions)}
+                ORDER BY created_at DESC
+                LIMIT ${len(params)}
+            """
+            rows = await conn.fetch(sql, *params)
+            return [dict(row) for row in rows]
+    
+    async def list_ids_by_tags(self, tags: list[str], match: str = "all") -> list[UUID]:
+        """IDs of the items carrying ``tags`` (to scope a vector search)."""
+        if match not in TAG_MATCH_OPERATORS:
+            raise ValueError(f"Unknown tag match '{match}', use one of {tuple(TAG_MATCH_OPERATORS)}")
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(f"SELECT id FROM items WHERE tags {TAG_MATCH_OPERATORS[match]} $1::text[]", tags)
+            return [row["id"] for row in rows]
+    
+    async def get_many(self, item_ids: list[UUID]) -> dict[UUID, dict]:
+        """List-view columns of several items by ID."""
+        if not item_ids:
+            return {}
+        async with self.pool.acquire() as conn:
+            query = """
+                SELECT id, source_type, title, status, summary, tags, created_at
+                FROM items
+                WHERE id = ANY($1::uuid[])
+            """
+            rows = await conn.fetch(query, item_ids)
+            return {row["id"]: dict(row) for row in rows}
+    
+    async def tag_facets(self, limit: int = 100, prefix: Optional[str] = None) -> list[dict]:
+        """Items per tag from the tag_counts aggregate (maintained by trigger), most used first."""
+        async with self.pool.acquire() as conn:
+            query = """
+                SELECT tag, item_count
+                FROM tag_counts
+                WHERE item_count > 0 AND ($1::text IS NULL OR starts_with(tag, $1))
+                ORDER BY item_count DESC, tag
+                LIMIT $2
+            """
+            rows = await conn.fetch(query, prefix, limit)
+            return [dict(row) for row in rows]
+    
+    async def list_unsummarized(self, limit: int = 10) -> list[dict]:
+        """Ready items with text and no summary yet, newest first."""
+        async with self.pool.acquire() as conn:
+            query = """
+                SELECT id, title, extracted_text
+                FROM items
+                WHERE summary IS NULL AND status = 'ready' AND COALESCE(extracted_text, '') <> ''
+                ORDER BY created_at DESC
+                LIMIT $1
+            """
+            rows = await conn.fetch(query, limit)
+            return [dict(row) for row in rows]
+    
+    async def get_summaries_by_hash(self, content_hashes: list[str]) -> dict[str, str]:
+        """Existing summaries of texts with these hashes: {content_hash: summary}."""
+        if not content_hashes:
+            return {}
+        async with self.pool.acquire() as conn:
+            query = """
+                SELECT DISTINCT ON (summary_hash) summary_hash, summary
+                FROM items
+                WHERE summary_hash = ANY($1::text[]) AND summary IS NOT NULL
+            """
+            rows = await conn.fetch(query, content_hashes)
+            return {row["summary_hash"]: row["summary"] for row in rows}
+    
+    async def set_summaries(self, summaries: list[tuple[UUID, str, str]]) -> None:
+        """Store (item_id, summary, content_hash) rows."""
+        if not summaries:
+            return
+        async with self.pool.acquire() as conn:
+            await conn.executemany(
+                "UPDATE items SET summary = $2, summary_hash = $3 WHERE id = $1",
+                summaries,
+            )
     
     async def delete(self, item_id: UUID) -> bool:
         """Delete item and cascade to embeddings."""
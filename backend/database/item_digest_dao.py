@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Data Access Object for item digests - short per-item summaries used to build the daily plan prompt.
+
+Copyright (C) 2026 Smart Brain Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from uuid import UUID
+
+import asyncpg
+
+
+class ItemDigestDAO:
+    """DAO for item_digests table."""
+
+    def __init__(self, pool: asyncpg.Pool):
+        self.pool = pool
+
+    async def list_missing(self, limit: int = 200) -> list[dict]:
+        """Ready items that have no digest yet, oldest first."""
+        async with self.pool.acquire() as conn:
+            query = """
+                SELECT i.id, i.source_type, i.title, i.summary, i.extracted_text, i.created_at
+                FROM items i
+                LEFT JOIN item_digests d ON d.item_id = i.id
+                WHERE d.item_id IS NULL AND i.status = 'ready'
+                ORDER BY i.created_at
+                LIMIT $1
+            """
+            rows = await conn.fetch(query, limit)
+            return [dict(row) for row in rows]
+
+    async def upsert_many(self, digests: list[dict]) -> None:
+        """Insert or refresh digests; keeps last_planned_at of existing rows."""
+        if not digests:
+            return
+        async with self.pool.acquire() as conn:
+            await conn.executemany(
+                """
+                INSERT INTO item_digests (item_id, source_type, title, summary, item_created_at)
+                VALUES ($1, $2, $3, $4, $5)
+                ON CONFLICT (item_id) DO UPDATE
+                SET source_type = EXCLUDED.source_type,
+                    title = EXCLUDED.title,
+                    summary = EXCLUDED.summary,
+                    updated_at = CURRENT_TIMESTAMP
+                """,
+                [
+                    (d["item_id"], d.get("source_type"), d.get("title"), d.get("summary"), d.get("item_created_at"))
+                    for d in digests
+                ],
+            )
+
+    async def upsert_for_item(self, item_id: UUID, summary: str) -> None:
+        """Create or refresh the digest of one stored item from its row in items."""
+        async with self.pool.acquire() as conn:
+            await conn.execute(
+                """
+                INSERT INTO item_digests (item_id, source_type, title, summary, item_created_at)
+                SELECT id, source_type, title, $2, created_at FROM items WHERE id = $1
+                ON CONFLICT (item_id) DO UPDATE
+                SET source_type = EXCLUDED.source_type,
+                    title = EXCLUDED.title,
+                    summary = EXCLUDED.summary,
+                    updated_at = CURRENT_TIMESTAMP
+                """,
+                item_id,
+                summary,
+            )
+
+    async def update_summaries(self, summaries: list[tuple[UUID, str]]) -> None:
+        """Replace the summary of existing digests with (item_id, summary) pairs."""
+        if not summaries:
+            return
+        async with self.pool.acquire() as conn:
+            await conn.executemany(
+                "UPDATE item_digests SET summary = $2, updated_at = CURRENT_TIMESTAMP WHERE item_id = $1",
+                summaries,
+            )
+
+    async def list_for_plan(self, limit: int = 200) -> list[dict]:
+        """Candidates for the plan prompt: items never sent to the planner, newest first."""
+        async with self.pool.acquire() as conn:
+            query = """
+                SELECT item_id, source_type, title, summary, last_planned_at
+                FROM item_digests
+                WHERE last_planned_at IS NULL
+                ORDER BY item_created_at DESC
+                LIMIT $1
+            """
+            rows = await conn.fetch(query, limit)
+            return [dict(row) for row in rows]
+
+    async def mark_planned(self, item_ids: list[UUID]) -> int:
+        """Record that these items were sent to the planner."""
+        if not item_ids:
+            return 0
+        async with self.pool.acquire() as conn:
+            result = await conn.execute(
+                "UPDATE item_digests SET last_planned_at = CURRENT_TIMESTAMP WHERE item_id = ANY($1::uuid[])",
+                item_ids,
+            )
+            return int(result.split()[-1])
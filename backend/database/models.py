@@ -29,12 +29,15 @@ class ItemDB(BaseModel):
     extracted_text: Optional[str] = None
     status: str = "pending"
     error_message: Optional[str] = None
+    summary: Optional[str] = None
+    summary_hash: Optional[str] = None  # SHA-256 of extracted_text when summarized
 
 
 class EmbeddingDB(BaseModel):
     """Database model for embeddings table."""
     id: UUID
     item_id: UUID
+    model_id: str  # Embedding model/version (embedding_models.id)
     chunk_index: int
     chunk_text: str
     embedding: list[float]  # Vector representation
@@ -114,15 +117,15 @@ class EmbeddingQueries:
     """SQL queries for embeddings table."""
     
     @staticmethod
-    async def insert_embeddings(conn, item_id: UUID, chunks: list[dict]):
-        """Insert multiple embeddings for an item."""
+    async def insert_embeddings(conn, item_id: UUID, model_id: str, chunks: list[dict]):
+        """Insert multiple embeddings for an item, produced by ``model_id``."""
         query = """
-            INSERT INTO embeddings (item_id, chunk_index, chunk_text, embedding)
-            VALUES ($1, $2, $3, $4::vector)
+            INSERT INTO embeddings (item_id, model_id, chunk_index, chunk_text, embedding)
+            VALUES ($1, $2, $3, $4, $5::vector)
         """
         await conn.executemany(
             query,
-            [(item_id, chunk["index"], chunk["text"], chunk["embedding"]) for chunk in chunks]
+            [(item_id, model_id, chunk["index"], chunk["text"], chunk["embedding"]) for chunk in chunks]
         )
     
     @staticmethod
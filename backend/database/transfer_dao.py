@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Data Access Object for bulk export/import of items and embeddings.
+
+Copyright (C) 2026 Smart Brain Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+import asyncpg
+
+from utils.transfer import ITEM_FIELDS
+
+_ITEM_COLUMNS = ", ".join(ITEM_FIELDS)
+_CHUNK_COLUMNS = ("item_id", "chunk_index", "chunk_text", "embedding")
+
+
+def _passthrough(value: bytes) -> bytes:
+    return value
+
+
+@asynccontextmanager
+async def _raw_vectors(conn):
+    """
+    Exchange ``vector`` values with this connection as raw pgvector binary.
+
+    Skips parsing/formatting decimal text on export and lets COPY send the
+    packed floats on import. The codec is reset before the connection goes
+    back to the pool, where the other DAOs expect the default text form.
+    """
+    await conn.set_type_codec("vector", schema="public", encoder=_passthrough, decoder=_passthrough, format="binary")
+    try:
+        yield conn
+    finally:
+        await conn.reset_type_codec("vector", schema="public")
+
+
+class TransferDAO:
+    """DAO for bulk export/import of items and embeddings."""
+
+    def __init__(self, pool: asyncpg.Pool):
+        self.pool = pool
+
+    async def export_items(
+        self, model_id: Optional[str], batch_size: int = 200
+    ) -> AsyncIterator[list[tuple[dict, list[dict]]]]:
+        """
+        Yield batches of (item, chunks of ``model_id``), oldest item first.
+
+        Reads through a server-side cursor inside one REPEATABLE READ
+        transaction: constant memory and a consistent snapshot, at the cost
+        of holding one pool connection for the whole export.
+        """
+        async with self.pool.acquire() as conn, _raw_vectors(conn):
+            async with conn.transaction(isolation="repeatable_read", readonly=True):
+                cursor = await conn.cursor(f"SELECT {_ITEM_COLUMNS} FROM items ORDER BY created_at, id")
+                while True:
+                    items = [dict(row) for row in await cursor.fetch(batch_size)]
+                    if not items:
+                        return
+                    chunks: dict = {item["id"]: [] for item in items}
+                    if model_id:
+                        rows = await conn.fetch(
+                            """
+                            SELECT item_id, chunk_index, chunk_text, embedding
+                            FROM embeddings
+                            WHERE model_id = $1 AND item_id = ANY($2::uuid[])
+                            ORDER BY item_id, chunk_index
+                            """,
+                            model_id,
+                            list(chunks),
+                        )
+                        for row in rows:
+                            chunks[row["item_id"]].append(dict(row))
+                    yield [(item, chunks[item["id"]]) for item in items]
+
+    async def import_batch(self, items: list[tuple], chunks: list[tuple], model_id: Optional[str]) -> tuple[int, int]:
+        """
+        COPY items (ITEM_FIELDS order) and chunks into staging tables and merge them.
+
+        Items whose id already exists are skipped, together with their chunks,
+        so re-running an import is a no-op. Returns (items inserted, chunks inserted).
+        """
+        async with self.pool.acquire() as conn, _raw_vectors(conn):
+            async with conn.transaction():
+                await conn.execute(
+                    "CREATE TEMP TABLE import_items (LIKE items INCLUDING DEFAULTS) ON COMMIT DROP"
+                )
+                await conn.copy_records_to_table("import_items", records=items, columns=list(ITEM_FIELDS))
+                inserted = await conn.fetch(
+                    f"""
+                    INSERT INTO items ({_ITEM_COLUMNS}, embed_lane)
+                    SELECT {_ITEM_COLUMNS}, 'sync' FROM import_items
+                    ON CONFLICT (id) DO NOTHING
+                    RETURNING id
+                    """
+                )
+                inserted_ids = [row["id"] for row in inserted]
+                if not chunks or not model_id or not inserted_ids:
+                    return len(inserted_ids), 0
+
+                await conn.execute(
+                    """
+                    CREATE TEMP TABLE import_chunks (
+                        item_id UUID, chunk_index INTEGER, chunk_text TEXT, embedding vector
+                    ) ON COMMIT DROP
+                    """
+                )
+                await conn.copy_records_to_table("import_chunks", records=chunks, columns=list(_CHUNK_COLUMNS))
+                result = await conn.execute(
+                    """
+                    INSERT INTO embeddings (item_id, model_id, chunk_index, chunk_text, embedding)
+                    SELECT item_id, $1, chunk_index, chunk_text, embedding
+                    FROM import_chunks
+                    WHERE item_id = ANY($2::uuid[])
+                    ON CONFLICT (item_id, model_id, chunk_index) DO NOTHING
+                    """,
+                    model_id,
+                    inserted_ids,
+                )
+                return len(inserted_ids), int(result.split()[-1])
@@ -16,21 +16,35 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+import time
+_IMPORT_STARTED = time.perf_counter()
+
 import asyncio
+import functools
 import io
 import json
+import logging
+import multiprocessing
+import os
+import threading
 import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Literal
+from typing import AsyncIterator, Literal
 from uuid import UUID
 
 from dotenv import load_dotenv
 load_dotenv()
 
-from fastapi import FastAPI, File, HTTPException, Query, UploadFile
+from utils.logging_config import configure_logging
+configure_logging()
+
+from fastapi import FastAPI, File, HTTPException, Query, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field, HttpUrl
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field, HttpUrl, ValidationError
 
 try:
     import ollama
@@ -39,30 +53,82 @@ except ImportError:
     OLLAMA_AVAILABLE = False
 
 from database.connection import db
-from database.item_dao import ItemDAO
+from database.item_dao import DEFAULT_LIST_FIELDS as DEFAULT_ITEM_LIST_FIELDS, LIST_FIELDS as ITEM_LIST_FIELDS, ItemDAO
 from database.task_dao import TaskDAO
-from database.embedding_dao import EmbeddingDAO
-from utils.embeddings import get_embedding_model, generate_embeddings_for_text
+from database.embedding_dao import VECTOR_SEARCH_MODE, EmbeddingDAO
+from database.embedding_model_dao import EmbeddingModelDAO
+from database.item_digest_dao import ItemDigestDAO
+from database.transfer_dao import TransferDAO
+from database.folder_manifest_dao import FolderManifestDAO
+from utils.embeddings import (
+    EMBEDDING_MODELS,
+    embedding_model_load_seconds,
+    generate_embeddings_for_text,
+    get_active_model_id,
+    get_embedding_model_async,
+    get_model_spec,
+    is_embedding_model_loaded,
+    set_active_model_id,
+    unload_embedding_model,
+)
 from models import (
     ChatMessageCreate,
     DailyPlanResponse,
     DailyTask,
     FocusView,
+    FolderSyncCreate,
+    EmbeddingRequeueRequest,
     LocalItemCreate,
+    PageItemCreate,
     SentimentCreate,
     SentimentResponse,
     StoredItemResponse,
     URLItemCreate,
     SearchRequest,
 )
-from utils.loader import (
-    get_docx_from_stream,
-    get_excel_from_stream,
-    get_odt_from_stream,
-    get_pdf_from_stream,
-    get_webpage_text,
-)
+from utils.loader import extract_text_from_stream, get_text_from_html, get_webpage_text, preload_extractors
+from utils.answer_cache import SemanticAnswerCache
 from utils.cleaner import clean_text
+from utils.embedding_progress import DEAD_LETTER, DONE, RETRY, EmbeddingProgress
+from utils.events import EventBus
+from utils.embedding_lanes import (
+    BACKFILL as EMBED_BACKFILL,
+    INTERACTIVE as EMBED_INTERACTIVE,
+    ITEM_LANES,
+    SYNC as EMBED_SYNC,
+    LaneScheduler,
+    parse_weights,
+)
+from utils.llm_scheduler import BACKGROUND, INTERACTIVE, LLMOverloaded, LLMScheduler
+from utils.digest import format_digest_line, select_for_prompt, summarize_text
+from utils.folder_sync import diff_manifest, folders_overlap, process_file, scan_folder
+from utils.pagination import decode_cursor, encode_cursor, parse_fields
+from utils.request_body import BodyTooLarge, decompress_body, read_body
+from utils.retry import next_retry
+from utils.plan_output import PLAN_SCHEMA, parse_plan_output
+from utils.singleflight import SingleFlight, normalize_message
+from utils.summarizer import SUMMARY_SCHEMA, build_summary_prompt, content_hash, parse_summaries
+from utils.transfer import export_ndjson, import_ndjson, iter_lines
+from utils.context import build_passages, estimate_tokens, format_context, neighbour_keys, pack_passages
+from utils.metrics import (
+    CACHE_REQUESTS,
+    COALESCED_REQUESTS,
+    CHUNKS_PER_ITEM,
+    CONTENT_TYPE as METRICS_CONTENT_TYPE,
+    EMBEDDING_FAILURES,
+    EXTRACTION_SECONDS,
+    FOLDER_SYNC_FILES,
+    HTTP_REQUEST_SECONDS,
+    ITEMS_SUMMARIZED,
+    OLLAMA_GENERATION_SECONDS,
+    OLLAMA_TTFT_SECONDS,
+    PIPELINE_STAGE_SECONDS,
+    REGISTRY as METRICS_REGISTRY,
+)
+from utils.profiling import SamplingProfiler, stop_tracemalloc, tracemalloc_report
+
+
+logger = logging.getLogger(__name__)
 
 
 app = FastAPI(
@@ -79,15 +145,154 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+# Profiling bajo demanda (solo con PROFILING_ENABLED=1)
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0") == "1"
+PROFILE_HEADER = "x-profile"
+PROFILES: OrderedDict[str, str] = OrderedDict()
+MAX_STORED_PROFILES = 20
+PROFILE_LOCK = asyncio.Lock()
+
+
+@app.middleware("http")
+async def profile_request(request: Request, call_next):
+    """
+    Capture a sampling CPU profile of a single request when it carries ``X-Profile: 1``.
+    The folded-stack file is kept in memory and its id returned in ``X-Profile-Id``.
+    """
+    if not PROFILING_ENABLED or request.headers.get(PROFILE_HEADER) != "1" or PROFILE_LOCK.locked():
+        return await call_next(request)
+
+    async with PROFILE_LOCK:
+        profiler = SamplingProfiler()
+        profiler.start()
+        try:
+            response = await call_next(request)
+        finally:
+            profiler.stop()
+
+    profile_id = uuid.uuid4().hex
+    PROFILES[profile_id] = profiler.to_folded()
+    while len(PROFILES) > MAX_STORED_PROFILES:
+        PROFILES.popitem(last=False)
+    response.headers["X-Profile-Id"] = profile_id
+    logger.info("Request profiled", extra={"profile_id": profile_id, "path": request.url.path})
+    return response
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Record request latency labelled by route template (not raw path)."""
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - started,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=str(status),
+        )
+
+STARTUP_IMPORT_SECONDS = round(time.perf_counter() - _IMPORT_STARTED, 3)
+
 # Database DAOs
 item_dao: ItemDAO | None = None
 task_dao: TaskDAO | None = None
 embedding_dao: EmbeddingDAO | None = None
+embedding_model_dao: EmbeddingModelDAO | None = None
+item_digest_dao: ItemDigestDAO | None = None
+transfer_dao: TransferDAO | None = None
+folder_manifest_dao: FolderManifestDAO | None = None
 
 # Background worker control
 embedding_worker_task: asyncio.Task | None = None
 embedding_worker_running = False
 
+# Carriles del worker de embeddings: subidas del usuario, sincronización/importación y re-embedding,
+# con turnos repartidos por pesos para que una subida no espere detrás de un backlog
+EMBEDDING_LANES = LaneScheduler(parse_weights(os.getenv("EMBED_LANE_WEIGHTS", "")))
+EMBEDDING_WAKE = {lane: asyncio.Event() for lane in ITEM_LANES}
+# Contadores de progreso: /api/v1/embeddings/status los lee sin consultar la BD
+EMBEDDING_PROGRESS = EmbeddingProgress()
+EMBED_PROGRESS_RESYNC_SECONDS = float(os.getenv("EMBED_PROGRESS_RESYNC_SECONDS", "300"))
+
+# Reintentos del worker de embeddings: backoff exponencial y dead-letter tras N intentos
+EMBED_MAX_ATTEMPTS = int(os.getenv("EMBED_MAX_ATTEMPTS", "5"))
+EMBED_RETRY_BASE_SECONDS = float(os.getenv("EMBED_RETRY_BASE_SECONDS", "30"))
+EMBED_RETRY_MAX_SECONDS = float(os.getenv("EMBED_RETRY_MAX_SECONDS", "3600"))
+
+# Resúmenes de items: lotes de baja prioridad hacia Ollama, nunca en el camino de la petición
+summary_worker_task: asyncio.Task | None = None
+SUMMARY_BATCH_SIZE = int(os.getenv("SUMMARY_BATCH_SIZE", "4"))
+SUMMARY_IDLE_SECONDS = float(os.getenv("SUMMARY_IDLE_SECONDS", "60"))
+
+# Páginas enviadas por la extensión: tamaño máximo ya descomprimido
+PAGE_MAX_BYTES = int(os.getenv("PAGE_MAX_BYTES", str(10 * 1024 * 1024)))
+
+# Sincronización de carpetas: extracción en procesos aparte, un job por carpeta a la vez
+FOLDER_SYNC_WORKERS = int(os.getenv("FOLDER_SYNC_WORKERS", "0")) or max(1, (os.cpu_count() or 2) - 1)
+FOLDER_SYNC_PATHS = [p.strip() for p in os.getenv("FOLDER_SYNC_PATHS", "").split(os.pathsep) if p.strip()]
+FOLDER_SYNC_INTERVAL_SECONDS = float(os.getenv("FOLDER_SYNC_INTERVAL_SECONDS", "0"))
+FOLDER_SYNC_DELETE_MISSING = os.getenv("FOLDER_SYNC_DELETE_MISSING", "0") == "1"
+FOLDER_SYNC_MANIFEST_BATCH = 200
+FOLDER_SYNC_JOBS_KEPT = 20
+FOLDER_SYNC_JOBS: OrderedDict[str, dict] = OrderedDict()  # job_id -> progreso
+FOLDER_SYNC_RUNNING: dict[str, dict] = {}  # carpeta -> job en curso
+FOLDER_SYNC_TASKS: dict[str, asyncio.Task] = {}  # job_id -> task
+folder_sync_executor: ProcessPoolExecutor | None = None
+folder_sync_task: asyncio.Task | None = None
+
+# Eventos en vivo (/api/v1/events): cola acotada por cliente, el que no la vacía se desconecta
+EVENTS = EventBus(
+    max_queue=int(os.getenv("EVENTS_QUEUE_SIZE", "256")),
+    history=int(os.getenv("EVENTS_HISTORY", "1024")),
+)
+EVENTS_KEEPALIVE_SECONDS = float(os.getenv("EVENTS_KEEPALIVE_SECONDS", "15"))
+
+# Re-embedding en segundo plano hacia un modelo nuevo: model_id -> task
+REEMBED_TASKS: dict[str, asyncio.Task] = {}
+REEMBED_BATCH_SIZE = int(os.getenv("REEMBED_BATCH_SIZE", "20"))
+REEMBED_SLEEP_SECONDS = float(os.getenv("REEMBED_SLEEP_SECONDS", "1.0"))
+search_index_task: asyncio.Task | None = None
+
+# Contexto RAG: chunks vecinos por acierto y presupuesto de tokens del prompt
+CONTEXT_NEIGHBOURS = int(os.getenv("CONTEXT_NEIGHBOURS", "1"))
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1500"))
+
+# Caché semántica de respuestas del chat
+ANSWER_CACHE = SemanticAnswerCache(
+    max_entries=int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "500")),
+    threshold=float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95")),
+    ttl_seconds=float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "86400")),
+)
+
+# Preguntas idénticas simultáneas comparten embedding, búsqueda y generación
+CHAT_FLIGHT = SingleFlight()
+
+# Cola única hacia Ollama: el chat pasa delante de la planificación en segundo plano
+LLM_SCHEDULER = LLMScheduler(
+    concurrency=int(os.getenv("OLLAMA_CONCURRENCY", "1")),
+    background_concurrency=int(os.getenv("OLLAMA_BACKGROUND_CONCURRENCY", "0")) or None,
+)
+LLM_PRIORITIES = {
+    "chat": INTERACTIVE,
+    "chat_simple": INTERACTIVE,
+    "daily_plan": BACKGROUND,
+    "summarize": BACKGROUND,
+}
+# Si la espera estimada + generación supera este tiempo, el chat se rechaza al momento
+CHAT_DEADLINE_SECONDS = float(os.getenv("CHAT_DEADLINE_SECONDS", "90"))
+# El plan se genera con salida JSON estructurada: solo se repite si no sale ninguna tarea válida
+PLAN_MAX_ATTEMPTS = 2
+# Prompt del plan: items aún no planificados primero, hasta este presupuesto (tokens aprox.)
+PLAN_PROMPT_TOKEN_BUDGET = int(os.getenv("PLAN_PROMPT_TOKEN_BUDGET", "1200"))
+PLAN_DIGEST_CANDIDATES = 500
+
 # Storage in-memory (sustituir por DB en producción)
 STORAGE: dict[str, dict] = {}
 SENTIMENTS_STORAGE: list[dict] = []
@@ -100,20 +305,61 @@ DAILY_PLAN_LOCK = asyncio.Lock()
 DAILY_PLAN_CACHE: DailyPlanResponse | None = None
 DAILY_PLAN_REGENERATING = False
 
+# Startup warm-up: STORAGE y PERSISTENT_TASKS se cargan desde la BD antes de servir el plan
+WARMUP_DONE = asyncio.Event()
+WARMUP_STATS: dict[str, object] = {
+    "duration_seconds": None,
+    "items_loaded": 0,
+    "tasks_loaded": 0,
+    "error": None,
+}
+warmup_task: asyncio.Task | None = None
+
+# Informe de arranque: extractores y modelo de embeddings se cargan en segundo plano
+STARTUP_REPORT: dict[str, object] = {
+    "import_seconds": STARTUP_IMPORT_SECONDS,
+    "startup_seconds": None,
+    "extractors_seconds": None,
+    "embedding_model_seconds": None,
+}
+model_warmup_task: asyncio.Task | None = None
+
 @app.on_event("startup")
 async def startup():
     """Initialize database connection on startup."""
-    global item_dao, task_dao, embedding_dao, embedding_worker_task, embedding_worker_running
+    global item_dao, task_dao, embedding_dao, embedding_model_dao, item_digest_dao, transfer_dao, folder_manifest_dao
+    global embedding_worker_task, embedding_worker_running
+    global warmup_task, model_warmup_task, summary_worker_task, folder_sync_task
+    startup_started = time.perf_counter()
     await db.connect()
     item_dao = ItemDAO(db.pool)
     task_dao = TaskDAO(db.pool)
     embedding_dao = EmbeddingDAO(db.pool)
-    print("✓ DAOs initialized")
+    embedding_model_dao = EmbeddingModelDAO(db.pool)
+    item_digest_dao = ItemDigestDAO(db.pool)
+    transfer_dao = TransferDAO(db.pool)
+    folder_manifest_dao = FolderManifestDAO(db.pool)
+    logger.info("DAOs initialized")
+
+    # Active embedding model comes from the DB; unfinished re-embeddings resume
+    await _sync_embedding_models()
+
+    # Warm up in-memory caches without blocking liveness checks
+    warmup_task = asyncio.create_task(_warm_up_caches())
+    model_warmup_task = asyncio.create_task(_warm_up_models())
     
     # Start embedding background worker
     embedding_worker_running = True
     embedding_worker_task = asyncio.create_task(_embedding_background_worker())
-    print("✓ Embedding background worker started")
+    logger.info("Embedding background worker started")
+
+    summary_worker_task = asyncio.create_task(_summary_background_worker())
+
+    if FOLDER_SYNC_PATHS and FOLDER_SYNC_INTERVAL_SECONDS > 0:
+        folder_sync_task = asyncio.create_task(_periodic_folder_sync())
+
+    STARTUP_REPORT["startup_seconds"] = round(time.perf_counter() - startup_started, 3)
+    logger.info("API startup finished", extra={"startup": STARTUP_REPORT})
 
 
 @app.on_event("shutdown")
@@ -121,6 +367,15 @@ async def shutdown():
     """Close database connection on shutdown."""
     global embedding_worker_running, embedding_worker_task
     
+    for task in (
+        warmup_task, model_warmup_task, search_index_task, summary_worker_task, folder_sync_task,
+        *REEMBED_TASKS.values(), *FOLDER_SYNC_TASKS.values(),
+    ):
+        if task and not task.done():
+            task.cancel()
+    if folder_sync_executor:
+        folder_sync_executor.shutdown(wait=False, cancel_futures=True)
+
     # Stop embedding worker
     embedding_worker_running = False
     if embedding_worker_task:
@@ -129,10 +384,10 @@ async def shutdown():
             await embedding_worker_task
         except asyncio.CancelledError:
             pass
-    print("✓ Embedding worker stopped")
+    logger.info("Embedding worker stopped")
     
     await db.disconnect()
-    print("✓ Database disconnected")
+    logger.info("Database disconnected")
 
 
 @app.get("/api/v1/health")
@@ -141,107 +396,676 @@ async def health() -> dict[str, str]:
     return {"status": "ok", "database": "connected" if db.pool else "disconnected"}
 
 
+@app.get("/metrics")
+async def metrics() -> PlainTextResponse:
+    """Prometheus text exposition of the application metrics."""
+    return PlainTextResponse(METRICS_REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+def _require_profiling() -> None:
+    if not PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiling endpoints are disabled")
+
+
+@app.get("/api/v1/admin/profiles/{profile_id}")
+async def get_profile(profile_id: str) -> Response:
+    """Download a captured CPU profile in folded format (flamegraph.pl / speedscope)."""
+    _require_profiling()
+    folded = PROFILES.get(profile_id)
+    if folded is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(
+        folded,
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.folded"'},
+    )
+
+
+@app.get("/api/v1/admin/tracemalloc")
+async def get_tracemalloc_snapshot(
+    limit: int = Query(default=25, ge=1, le=200),
+    key_type: Literal["lineno", "filename", "traceback"] = Query(default="lineno"),
+    frames: int = Query(default=1, ge=1, le=50, description="Frames per trace when starting"),
+) -> dict:
+    """
+    First call starts tracemalloc; later calls return the top allocation sites
+    and the growth since the previous snapshot.
+    """
+    _require_profiling()
+    # Snapshot y compare_to pueden tardar segundos con mucho heap: fuera del event loop
+    return await asyncio.to_thread(tracemalloc_report, limit=limit, key_type=key_type, frames=frames)
+
+
+@app.delete("/api/v1/admin/tracemalloc", status_code=204)
+async def delete_tracemalloc() -> None:
+    """Stop tracemalloc (tracing has a noticeable memory/CPU overhead)."""
+    _require_profiling()
+    await asyncio.to_thread(stop_tracemalloc)
+
+
+@app.get("/api/v1/ready")
+async def ready() -> JSONResponse:
+    """Readiness check: not ready until the startup cache warm-up has finished."""
+    is_ready = WARMUP_DONE.is_set() and WARMUP_STATS["error"] is None
+    return JSONResponse(
+        status_code=200 if is_ready else 503,
+        content={"status": "ready" if is_ready else "warming_up", "warmup": WARMUP_STATS},
+    )
+
+
+@app.get("/api/v1/llm/scheduler")
+async def llm_scheduler_status() -> dict:
+    """LLM queue: slots in use and waiting requests per priority, EWMA service times."""
+    return LLM_SCHEDULER.stats()
+
+
+@app.get("/api/v1/startup")
+async def startup_report() -> dict:
+    """Cold-start timings: module import, startup hook and background model warm-up."""
+    return {
+        **STARTUP_REPORT,
+        "embedding_model_loaded": is_embedding_model_loaded(),
+        "cache_warmup_seconds": WARMUP_STATS["duration_seconds"],
+    }
+
+
+@app.get("/api/v1/events")
+async def stream_events(
+    request: Request,
+    types: str | None = Query(
+        default=None, description="Tipos o prefijos separados por comas, p. ej. item,plan.regenerated"
+    ),
+) -> StreamingResponse:
+    """
+    Server-sent events with the state changes of items, embeddings, tasks and the daily plan.
+
+    Replaces polling: the client refetches only what an event says changed.
+    A client that reconnects with ``Last-Event-ID`` (EventSource does it on
+    its own) gets the events it missed, or a ``resync`` event when they are
+    no longer kept. A client too slow to drain its queue receives
+    ``dropped`` and the stream ends; reconnecting replays from its last id.
+    """
+    subscriber = EVENTS.subscribe(
+        [t.strip() for t in types.split(",") if t.strip()] if types else None,
+        last_event_id=request.headers.get("last-event-id") or None,
+    )
+
+    async def events() -> AsyncIterator[bytes]:
+        try:
+            # Reintento del navegador tras un corte (ms); también envía las cabeceras ya
+            yield b"retry: 3000\n\n"
+            async for chunk in subscriber.stream(EVENTS_KEEPALIVE_SECONDS):
+                yield chunk
+        finally:
+            EVENTS.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _warm_up_models() -> None:
+    """Import extractors and load the embedding model off the request path."""
+    started = time.perf_counter()
+    try:
+        await asyncio.to_thread(preload_extractors)
+    except ImportError:
+        logger.warning("Some extractor modules are not installed", exc_info=True)
+    STARTUP_REPORT["extractors_seconds"] = round(time.perf_counter() - started, 3)
+
+    await get_embedding_model_async()
+    STARTUP_REPORT["embedding_model_seconds"] = embedding_model_load_seconds()
+    logger.info("Model warm-up finished", extra={"startup": STARTUP_REPORT})
+
+
+def _item_cache_entry(row: dict) -> dict:
+    """Adapta una fila de items al formato de STORAGE."""
+    entry = {**row, "id": str(row["id"])}
+    if isinstance(entry.get("created_at"), datetime):
+        entry["created_at"] = entry["created_at"].isoformat()
+    if isinstance(entry.get("updated_at"), datetime):
+        entry["updated_at"] = entry["updated_at"].isoformat()
+    return entry
+
+
+def _task_cache_entry(row: dict) -> dict:
+    """Adapta una fila de tasks al formato de PERSISTENT_TASKS."""
+    generated_from_item = row.get("generated_from_item")
+    return {
+        "text": row["text"],
+        "completed": row.get("completed", False),
+        "generated_from_item": str(generated_from_item) if generated_from_item else None,
+        "generated_from_items": [str(i) for i in row.get("generated_from_items") or []],
+    }
+
+
+async def _warm_up_caches() -> None:
+    """
+    Load STORAGE and PERSISTENT_TASKS from the database concurrently.
+    The daily plan waits for this so a fresh deploy does not see zero tasks
+    and trigger a new LLM generation.
+    """
+    global DAILY_PLAN_CACHE
+
+    started = time.perf_counter()
+    try:
+        tasks, items = await asyncio.gather(
+            task_dao.get_all(),
+            item_dao.get_all_for_cache(),
+        )
+
+        # setdefault: no pisar lo que hayan escrito peticiones llegadas durante el warm-up
+        for item_id, row in items.items():
+            STORAGE.setdefault(item_id, _item_cache_entry(row))
+        for task_id, row in tasks.items():
+            PERSISTENT_TASKS.setdefault(task_id, _task_cache_entry(row))
+
+        WARMUP_STATS["items_loaded"] = len(items)
+        WARMUP_STATS["tasks_loaded"] = len(tasks)
+
+        # Con tareas activas el plan se construye sin llamar al LLM
+        if any(not t["completed"] for t in PERSISTENT_TASKS.values()):
+            async with DAILY_PLAN_LOCK:
+                if DAILY_PLAN_CACHE is None:
+                    DAILY_PLAN_CACHE = await _build_daily_plan_from_persistent()
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        WARMUP_STATS["error"] = str(e)
+        logger.exception("Cache warm-up failed")
+    finally:
+        WARMUP_STATS["duration_seconds"] = round(time.perf_counter() - started, 3)
+        WARMUP_DONE.set()
+
+    logger.info("Cache warm-up finished", extra={"warmup": WARMUP_STATS})
+
+
 @app.get("/api/v1/embeddings/status")
 async def get_embeddings_status() -> dict:
-    """Get status of embedding generation process."""
+    """
+    Progress of the embedding pipeline, from in-memory counters (no database query).
+
+    ``pending``/``processing``/``done``/``failed`` items, throughput over the
+    last minute, ETA of the backlog and seconds since each worker loop last
+    ran. ``items_pending`` is kept for older clients.
+    """
+    progress = EMBEDDING_PROGRESS.snapshot()
+    return {
+        "worker_running": embedding_worker_running,
+        "items_pending": progress["pending"],
+        **progress,
+        "model_id": get_active_model_id(),
+        "model_loaded": is_embedding_model_loaded(),
+        "lanes": EMBEDDING_LANES.stats(),
+    }
+
+
+@app.get("/api/v1/embeddings/dead-letter")
+async def list_embedding_dead_letters(limit: int = Query(default=100, ge=1, le=1000)) -> list[dict]:
+    """Items whose embedding failed EMBED_MAX_ATTEMPTS times, with the last error."""
     if not embedding_dao:
-        return {"error": "Embedding DAO not initialized"}
-    
+        raise HTTPException(status_code=503, detail="Database not initialized")
+    return await embedding_dao.list_dead_letters(limit)
+
+
+@app.post("/api/v1/embeddings/requeue")
+async def requeue_embeddings(payload: EmbeddingRequeueRequest) -> dict:
+    """Put dead-lettered items (all, or ``item_ids``) back in the embedding queue."""
+    if not embedding_dao:
+        raise HTTPException(status_code=503, detail="Database not initialized")
+    requeued = await embedding_dao.requeue(payload.item_ids or None)
+    for row in requeued:
+        item = STORAGE.get(str(row["id"]))
+        if item:
+            item.update(status="ready", error_message=None)
+        EMBEDDING_PROGRESS.requeued(row["embed_lane"], from_failed=row["previous_status"] == "failed")
+    for lane in ITEM_LANES:
+        _wake_embedding_worker(lane)
+    return {"requeued": len(requeued), "item_ids": [str(row["id"]) for row in requeued]}
+
+
+async def _sync_embedding_models() -> None:
+    """Register the configured models in the DB, adopt the active one and resume backfills."""
+    global search_index_task
+
     try:
-        items_without_embeddings = await embedding_dao.get_items_without_embeddings(limit=100)
-        return {
-            "worker_running": embedding_worker_running,
-            "items_pending": len(items_without_embeddings),
-            "model_loaded": get_embedding_model() is not None
-        }
-    except Exception as e:
-        return {"error": str(e)}
+        for spec in EMBEDDING_MODELS.values():
+            await embedding_model_dao.ensure_registered(spec)
+
+        active = await embedding_model_dao.get_active()
+        if active and active["id"] in EMBEDDING_MODELS:
+            set_active_model_id(active["id"])
+        elif active:
+            logger.error(
+                "Active embedding model is not configured in this build, keeping default",
+                extra={"model_id": active["id"]},
+            )
+
+        for row in await embedding_model_dao.list_backfilling():
+            if row["id"] in EMBEDDING_MODELS:
+                _start_reembed_task(row["id"])
+    except Exception:
+        logger.exception("Could not sync embedding model registry")
+        return
+
+    if VECTOR_SEARCH_MODE != "full":
+        # El índice compacto puede tardar en construirse: no bloquear el arranque
+        search_index_task = asyncio.create_task(_ensure_search_indexes(get_active_model_id()))
+
+
+async def _ensure_search_indexes(model_id: str) -> None:
+    """Create the float32 HNSW index of a model and the one VECTOR_SEARCH_MODE queries."""
+    spec = get_model_spec(model_id)
+    try:
+        for kind in dict.fromkeys(("full", VECTOR_SEARCH_MODE)):
+            name = await embedding_model_dao.ensure_index(spec, kind)
+            logger.info("HNSW index ready", extra={"model_id": model_id, "index": name})
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        logger.exception("Could not build HNSW index", extra={"model_id": model_id})
+
+
+def _start_reembed_task(model_id: str) -> None:
+    task = REEMBED_TASKS.get(model_id)
+    if task is None or task.done():
+        REEMBED_TASKS[model_id] = asyncio.create_task(_reembed_backfill(model_id))
+
+
+async def _reembed_backfill(model_id: str) -> None:
+    """
+    Re-embed every item with ``model_id`` while the active model keeps serving.
+
+    Works in small throttled batches in (created_at, id) order and checkpoints
+    the cursor after each batch, so a restart resumes where it stopped. When
+    no item is left the HNSW index is built and the model is activated.
+    """
+    spec = get_model_spec(model_id)
+    logger.info("Re-embedding started", extra={"model_id": model_id})
+    backfill_left = 0
+    try:
+        model = await get_embedding_model_async(model_id)
+        if model is None:
+            logger.error("Re-embedding aborted, model could not be loaded", extra={"model_id": model_id})
+            return
+
+        row = await embedding_model_dao.get(model_id)
+        cursor = (row["backfill_cursor_created_at"], row["backfill_cursor_id"])
+        backfill_left = max(0, await item_dao.count() - row["backfill_items_done"])
+        EMBEDDING_PROGRESS.enqueued(EMBED_BACKFILL, backfill_left)
+
+        while True:
+            batch = await embedding_dao.get_items_for_backfill(model_id, *cursor, limit=REEMBED_BATCH_SIZE)
+            if not batch:
+                break
+            for item in batch:
+                # Mismo texto que el worker: título + contenido
+                full_text = f"{item['title']}\n\n{item['extracted_text']}" if item["title"] else item["extracted_text"]
+                async with EMBEDDING_LANES.turn(EMBED_BACKFILL):
+                    EMBEDDING_PROGRESS.started(EMBED_BACKFILL)
+                    backfill_left -= 1
+                    embeddings_data = []
+                    try:
+                        embeddings_data = await generate_embeddings_for_text(full_text, model)
+                        if embeddings_data:
+                            await embedding_dao.replace_for_item(item["id"], embeddings_data, model_id)
+                            ANSWER_CACHE.invalidate_items([item["id"]])
+                    finally:
+                        EMBEDDING_PROGRESS.finished(EMBED_BACKFILL, DONE, len(embeddings_data))
+            cursor = (batch[-1]["created_at"], batch[-1]["id"])
+            await embedding_model_dao.update_checkpoint(model_id, *cursor, len(batch))
+            # Ceder CPU al worker de items nuevos y a las consultas
+            await asyncio.sleep(REEMBED_SLEEP_SECONDS)
+
+        # Los items creados durante el backfill ya tienen vectores del modelo activo;
+        # el worker los completa para este modelo en cuanto pase a ser el activo.
+        await _ensure_search_indexes(model_id)
+        previous = await embedding_model_dao.activate(model_id)
+        set_active_model_id(model_id)
+        if previous:
+            unload_embedding_model(previous)
+        # pending/done se refieren al modelo activo, que acaba de cambiar
+        await _resync_embedding_progress()
+        logger.info("Re-embedding finished, model activated", extra={"model_id": model_id, "retired": previous})
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        logger.exception("Re-embedding failed, will resume from checkpoint", extra={"model_id": model_id})
+    finally:
+        # Lo que quede del backfill ya no está en cola hasta que se reanude
+        EMBEDDING_PROGRESS.enqueued(EMBED_BACKFILL, -max(0, backfill_left))
+
+
+def _require_registered_model(model_id: str) -> None:
+    if not embedding_model_dao:
+        raise HTTPException(status_code=503, detail="Database not initialized")
+    if model_id not in EMBEDDING_MODELS:
+        raise HTTPException(status_code=404, detail=f"Embedding model '{model_id}' is not configured")
+
+
+@app.get("/api/v1/embeddings/models")
+async def list_embedding_models() -> list[dict]:
+    """Configured embedding models with status and re-embedding progress."""
+    if not embedding_model_dao:
+        raise HTTPException(status_code=503, detail="Database not initialized")
+    rows = await embedding_model_dao.list_all()
+    for row in rows:
+        task = REEMBED_TASKS.get(row["id"])
+        row["reembed_running"] = bool(task and not task.done())
+        row["index_bytes"] = await embedding_model_dao.index_sizes(row["id"])
+    return rows
+
+
+@app.post("/api/v1/embeddings/models/{model_id}/backfill", status_code=202)
+async def start_embedding_backfill(model_id: str) -> dict:
+    """Start (or resume) re-embedding the corpus with another model; activates it when done."""
+    _require_registered_model(model_id)
+    if model_id == get_active_model_id():
+        raise HTTPException(status_code=409, detail="Model is already active")
+    if not await embedding_model_dao.start_backfill(model_id):
+        raise HTTPException(status_code=409, detail="Model cannot be backfilled in its current state")
+    _start_reembed_task(model_id)
+    return {"model_id": model_id, "status": "backfilling"}
+
+
+@app.post("/api/v1/embeddings/models/{model_id}/activate")
+async def activate_embedding_model(model_id: str) -> dict:
+    """
+    Switch queries to a model right away (e.g. roll back to a retired one that still has vectors).
+
+    Only a retired model, or one whose backfill finished, can be activated,
+    and only while it still has vectors: anything else would serve empty or
+    partial retrieval.
+    """
+    _require_registered_model(model_id)
+    if model_id == get_active_model_id():
+        return {"model_id": model_id, "retired": None}
+    row = await embedding_model_dao.get(model_id)
+    task = REEMBED_TASKS.get(model_id)
+    if row["status"] == "backfilling":
+        if task and not task.done():
+            raise HTTPException(status_code=409, detail="Model is being backfilled")
+        remaining = await embedding_dao.get_items_for_backfill(
+            model_id, row["backfill_cursor_created_at"], row["backfill_cursor_id"], limit=1
+        )
+        if remaining:
+            raise HTTPException(status_code=409, detail="Model backfill has not finished")
+    elif row["status"] != "retired":
+        raise HTTPException(status_code=409, detail=f"Model cannot be activated in status '{row['status']}'")
+    if not await embedding_model_dao.has_vectors(model_id):
+        raise HTTPException(status_code=409, detail="Model has no stored vectors, backfill it first")
+
+    await _ensure_search_indexes(model_id)
+    previous = await embedding_model_dao.activate(model_id)
+    set_active_model_id(model_id)
+    if previous:
+        unload_embedding_model(previous)
+    # pending/done se refieren al modelo activo, que acaba de cambiar
+    await _resync_embedding_progress()
+    return {"model_id": model_id, "retired": previous}
+
+
+@app.delete("/api/v1/embeddings/models/{model_id}/vectors")
+async def delete_embedding_model_vectors(model_id: str) -> dict:
+    """Free the space of a retired model's vectors."""
+    _require_registered_model(model_id)
+    if model_id == get_active_model_id():
+        raise HTTPException(status_code=409, detail="Cannot delete the vectors of the active model")
+    task = REEMBED_TASKS.get(model_id)
+    if task and not task.done():
+        raise HTTPException(status_code=409, detail="Model is being backfilled")
+    deleted = await embedding_dao.delete_by_model(model_id)
+    unload_embedding_model(model_id)
+    return {"model_id": model_id, "deleted": deleted}
+
+
+async def _record_embedding_failure(item: dict, error: str) -> str:
+    """
+    Back off a failed item, or dead-letter it once it runs out of attempts, so it stops blocking the queue.
+
+    Returns the progress outcome (RETRY or DEAD_LETTER).
+    """
+    attempts = (item.get("embed_attempts") or 0) + 1
+    retry_in = next_retry(
+        attempts, EMBED_MAX_ATTEMPTS, EMBED_RETRY_BASE_SECONDS, EMBED_RETRY_MAX_SECONDS, jitter=0.2
+    )
+    try:
+        await embedding_dao.record_failure(item["id"], error[:1000], retry_in)
+    except Exception:
+        logger.exception("Could not record embedding failure", extra={"item_id": str(item["id"])})
+        return RETRY
+    item_id = str(item["id"])
+    if retry_in is None:
+        EMBEDDING_FAILURES.inc(outcome="dead_letter")
+        if item_id in STORAGE:
+            STORAGE[item_id].update(status="failed", error_message=error)
+        _publish_item_event("item.failed", item_id, {**item, "status": "failed", "error_message": error})
+        logger.error(
+            "Item dead-lettered after repeated embedding failures",
+            extra={"item_id": item_id, "attempts": attempts, "error": error},
+        )
+        return DEAD_LETTER
+    else:
+        EMBEDDING_FAILURES.inc(outcome="retry")
+        logger.warning(
+            "Embedding failed, retrying later",
+            extra={"item_id": item_id, "attempts": attempts, "retry_in": round(retry_in, 1)},
+        )
+        return RETRY
 
 
 async def _embedding_background_worker() -> None:
+    """Run one embedding loop per item lane; they share the encoder through EMBEDDING_LANES."""
+    logger.info("Embedding worker started, checking for items to process")
+    while not embedding_dao:
+        await asyncio.sleep(5)
+    await _resync_embedding_progress()
+    await asyncio.gather(
+        _embedding_progress_resync_loop(),
+        *(_embedding_lane_worker(lane) for lane in ITEM_LANES),
+    )
+    logger.info("Embedding worker stopped")
+
+
+def _wake_embedding_worker(lane: str = EMBED_INTERACTIVE) -> None:
+    """Avisar al worker de que hay items nuevos en ``lane`` en vez de esperar a su próxima vuelta."""
+    EMBEDDING_WAKE[lane].set()
+
+
+def _enqueue_for_embedding(lane: str = EMBED_INTERACTIVE, count: int = 1) -> None:
+    """Contar ``count`` items nuevos pendientes de embeddings y despertar a su carril."""
+    EMBEDDING_PROGRESS.enqueued(lane, count)
+    _wake_embedding_worker(lane)
+
+
+async def _resync_embedding_progress() -> None:
+    """Recalcular los contadores de progreso desde la BD (al arrancar y cada EMBED_PROGRESS_RESYNC_SECONDS)."""
+    try:
+        counts = await embedding_dao.progress_counts(get_active_model_id())
+        EMBEDDING_PROGRESS.seed(counts["pending"], counts["done"], counts["failed"])
+    except Exception:
+        logger.exception("Could not count embedding progress")
+
+
+async def _embedding_progress_resync_loop() -> None:
+    while embedding_worker_running:
+        await asyncio.sleep(EMBED_PROGRESS_RESYNC_SECONDS)
+        await _resync_embedding_progress()
+
+
+async def _embedding_lane_worker(lane: str) -> None:
     """
-    Background worker that continuously processes items without embeddings.
-    Runs every 30 seconds and processes up to 5 items per iteration.
+    Background worker that continuously processes items without embeddings of one lane.
+
+    Sleeps until woken by a new item (or 30 seconds) when the lane is empty and
+    processes up to 5 items per iteration, each one in a turn granted by
+    EMBEDDING_LANES, so a large sync backlog cannot delay an upload.
     """
     global embedding_dao, embedding_worker_running
     
-    print("🔄 Embedding worker started, checking for items to process...")
-    
-    # Pre-load the model to avoid loading it on every iteration
-    embedding_model = get_embedding_model()
-    
     while embedding_worker_running:
         try:
             if not embedding_dao:
                 await asyncio.sleep(5)
                 continue
             
+            # Always embed with the active model (it can change after a re-embedding);
+            # the model is cached after the first load
+            model_id = get_active_model_id()
+            embedding_model = await get_embedding_model_async(model_id)
+            
             # Get items without embeddings
-            items_to_process = await embedding_dao.get_items_without_embeddings(limit=5)
+            EMBEDDING_PROGRESS.beat(lane)
+            EMBEDDING_WAKE[lane].clear()
+            items_to_process = await embedding_dao.get_items_without_embeddings(
+                limit=5, model_id=model_id, lane=lane
+            )
             
             if not items_to_process:
-                # No items to process, wait longer
-                await asyncio.sleep(30)
+                # No items to process: wait for a new one, or recheck later (backoff expiry)
+                try:
+                    await asyncio.wait_for(EMBEDDING_WAKE[lane].wait(), timeout=30)
+                except asyncio.TimeoutError:
+                    pass
                 continue
             
-            print(f"📊 Found {len(items_to_process)} items to process for embeddings")
+            logger.info("Found items to process for embeddings", extra={"count": len(items_to_process), "lane": lane})
             
             for item in items_to_process:
                 if not embedding_worker_running:
                     break
-                
-                item_id = item["id"]
-                extracted_text = item.get("extracted_text", "")
-                title = item.get("title", "")
-                
-                if not extracted_text:
-                    print(f"⚠️  Item {item_id} has no text to embed, skipping")
-                    continue
-                
-                try:
-                    # Include title in the text for better context
-                    full_text = f"{title}\n\n{extracted_text}" if title else extracted_text
-                    
-                    # Generate embeddings
-                    print(f"🔮 Generating embeddings for item: {title[:50]}...")
-                    embeddings_data = await generate_embeddings_for_text(full_text, embedding_model)
-                    
-                    if not embeddings_data:
-                        print(f"⚠️  No embeddings generated for item {item_id}")
-                        continue
-                    
-                    # Store embeddings in database
-                    for chunk_index, (chunk_text, embedding_vector) in enumerate(embeddings_data):
-                        await embedding_dao.create(
-                            item_id=item_id,
-                            chunk_index=chunk_index,
-                            chunk_text=chunk_text,
-                            embedding=embedding_vector
-                        )
-                    
-                    print(f"✓ Stored {len(embeddings_data)} embeddings for item: {title[:50]}")
-                
-                except Exception as e:
-                    print(f"❌ Error generating embeddings for item {item_id}: {e}")
-                    continue
-            
-            # Wait before next iteration
-            await asyncio.sleep(10)
+                async with EMBEDDING_LANES.turn(lane):
+                    EMBEDDING_PROGRESS.started(lane)
+                    outcome, chunks = await _embed_item(item, embedding_model, model_id)
+                    EMBEDDING_PROGRESS.finished(lane, outcome, chunks)
+                EMBEDDING_PROGRESS.beat(lane)
         
         except asyncio.CancelledError:
-            print("🛑 Embedding worker cancelled")
+            logger.info("Embedding worker cancelled", extra={"lane": lane})
             break
         except Exception as e:
-            print(f"❌ Error in embedding worker: {e}")
+            logger.exception("Error in embedding worker", extra={"lane": lane})
             await asyncio.sleep(30)
+
+
+async def _embed_item(item: dict, embedding_model, model_id: str) -> tuple[str, int]:
+    """
+    Chunk, encode and store one item; failures go through the retry/dead-letter path.
+
+    Returns the progress outcome (DONE, RETRY or DEAD_LETTER) and the number of chunks stored.
+    """
+    item_id = item["id"]
+    extracted_text = item.get("extracted_text", "")
+    title = item.get("title", "")
     
-    print("✓ Embedding worker stopped")
+    if not extracted_text:
+        logger.warning("Item has no text to embed, skipping", extra={"item_id": str(item_id)})
+        return DONE, 0
+    
+    try:
+        # Include title in the text for better context
+        full_text = f"{title}\n\n{extracted_text}" if title else extracted_text
+        
+        # Generate embeddings
+        logger.debug("Generating embeddings for item %s", title[:50])
+        embeddings_data = await generate_embeddings_for_text(full_text, embedding_model)
+        
+        if not embeddings_data:
+            logger.warning("No embeddings generated for item", extra={"item_id": str(item_id)})
+            return await _record_embedding_failure(item, "No embeddings generated"), 0
+        
+        # Store embeddings in database
+        with PIPELINE_STAGE_SECONDS.time(stage="persist"):
+            await embedding_dao.replace_for_item(item_id, embeddings_data, model_id)
+        if item.get("embed_attempts"):
+            await embedding_dao.clear_failures(item_id)
+        ANSWER_CACHE.invalidate_items([item_id])
+        CHUNKS_PER_ITEM.observe(len(embeddings_data))
+        EVENTS.publish("embeddings.done", id=str(item_id), model_id=model_id, chunks=len(embeddings_data))
+        
+        logger.info(
+            "Stored embeddings for item",
+            extra={"item_id": str(item_id), "chunks": len(embeddings_data)},
+        )
+        return DONE, len(embeddings_data)
+    
+    except Exception as e:
+        logger.exception("Error generating embeddings for item", extra={"item_id": str(item_id)})
+        return await _record_embedding_failure(item, f"{type(e).__name__}: {e}"), 0
+
+
+async def _summarize_items(rows: list[dict]) -> int:
+    """
+    Summarize a batch of items and store the results; returns how many were stored.
+
+    Texts already summarized elsewhere (same content hash) reuse that summary.
+    The rest go to Ollama in a single background-priority call; documents the
+    model skipped get the extractive summary so they do not block the queue.
+    """
+    hashes = [content_hash(row["extracted_text"]) for row in rows]
+    known = await item_dao.get_summaries_by_hash(list(set(hashes)))
+    pending = [i for i, h in enumerate(hashes) if h not in known]
+
+    generated: dict[int, str] = {}
+    if pending:
+        batch = [rows[i] for i in pending]
+        response_text = await _ollama_generate(
+            "summarize",
+            model="gpt-oss:20b",
+            prompt=build_summary_prompt(batch),
+            format=SUMMARY_SCHEMA,
+            options={"temperature": 0.2},
+        )
+        parsed = parse_summaries(response_text, len(batch))
+        generated = {pending[pos]: summary for pos, summary in parsed.items()}
+
+    results = []
+    for i, (row, digest) in enumerate(zip(rows, hashes)):
+        if digest in known:
+            summary, source = known[digest], "hash_cache"
+        elif i in generated:
+            summary, source = generated[i], "llm"
+        else:
+            summary, source = summarize_text(row["extracted_text"]), "fallback"
+        ITEMS_SUMMARIZED.inc(source=source)
+        results.append((row["id"], summary, digest))
+
+    await item_dao.set_summaries(results)
+    await item_digest_dao.update_summaries([(item_id, summary) for item_id, summary, _ in results])
+    for item_id, summary, _ in results:
+        if str(item_id) in STORAGE:
+            STORAGE[str(item_id)]["summary"] = summary
+    return len(results)
+
+
+async def _summary_background_worker() -> None:
+    """Fill items.summary in small batches while Ollama is available."""
+    await WARMUP_DONE.wait()
+    logger.info("Summary worker started")
+    while True:
+        try:
+            rows = await item_dao.list_unsummarized(limit=SUMMARY_BATCH_SIZE) if OLLAMA_AVAILABLE else []
+            if not rows:
+                await asyncio.sleep(SUMMARY_IDLE_SECONDS)
+                continue
+            stored = await _summarize_items(rows)
+            logger.info("Stored item summaries", extra={"count": stored})
+        except asyncio.CancelledError:
+            logger.info("Summary worker cancelled")
+            raise
+        except Exception:
+            logger.exception("Error in summary worker")
+            await asyncio.sleep(SUMMARY_IDLE_SECONDS)
 
 
 async def _regenerate_daily_plan_background() -> None:
     """Regenera el plan diario en background solo si hay menos de 5 tareas no completadas."""
     global DAILY_PLAN_CACHE, DAILY_PLAN_REGENERATING
 
+    # Sin las tareas persistentes cargadas se generarían tareas duplicadas
+    await WARMUP_DONE.wait()
+
     async with DAILY_PLAN_LOCK:
         DAILY_PLAN_REGENERATING = True
         try:
@@ -254,9 +1078,10 @@ async def _regenerate_daily_plan_background() -> None:
 
             # Solo generar nuevas si hay menos de 5 activas
             if len(active_tasks) < 5:
-                prompt = await _generate_daily_plan_prompt()
-                new_tasks = await _call_ollama_for_plan(prompt)
+                prompt, item_ids = await _generate_daily_plan_prompt()
+                new_tasks = await _call_ollama_for_plan(prompt, item_ids) if prompt else None
                 if new_tasks:
+                    await _mark_planned_items(new_tasks, item_ids)
                     for task in new_tasks:
                         # Crear tarea en la base de datos
                         task_data = {
@@ -278,8 +1103,9 @@ async def _regenerate_daily_plan_background() -> None:
 
             # Construir respuesta con tareas actuales
             DAILY_PLAN_CACHE = await _build_daily_plan_from_persistent()
+            EVENTS.publish("plan.regenerated", tasks=len(DAILY_PLAN_CACHE.tasks))
         except Exception as e:
-            print(f"Error regenerating daily plan: {e}")
+            logger.exception("Error regenerating daily plan")
         finally:
             DAILY_PLAN_REGENERATING = False
 
@@ -300,10 +1126,11 @@ async def _build_daily_plan_from_persistent() -> DailyPlanResponse:
 
     # Si no hay tareas activas, intentar generar nuevas
     if not active_tasks and OLLAMA_AVAILABLE:
-        prompt = await _generate_daily_plan_prompt()
+        prompt, item_ids = await _generate_daily_plan_prompt()
         if prompt:
-            new_tasks = await _call_ollama_for_plan(prompt)
+            new_tasks = await _call_ollama_for_plan(prompt, item_ids)
             if new_tasks:
+                await _mark_planned_items(new_tasks, item_ids)
                 for task in new_tasks:
                     # Crear tarea en la base de datos
                     task_data = {
@@ -338,37 +1165,78 @@ async def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
+def _extract_text_from_stream(stream: io.BytesIO, suffix: str) -> str:
+    """Extrae el texto de un archivo según su extensión, midiendo el tiempo por formato."""
+    with EXTRACTION_SECONDS.time(format=suffix.lstrip(".")):
+        return extract_text_from_stream(stream, suffix)
+
+
+async def _store_item_digest(item_id: str, cleaned_text: str) -> None:
+    """Digest del item recién guardado para el prompt del plan; si falla, lo recupera _refresh_item_digests."""
+    if not item_digest_dao:
+        return
+    try:
+        await item_digest_dao.upsert_for_item(UUID(item_id), summarize_text(cleaned_text))
+    except Exception:
+        logger.exception("Could not store item digest", extra={"item_id": item_id})
+
+
+def _publish_item_event(event_type: str, item_id: str, item_data: dict) -> None:
+    """Publica el cambio de estado de un item en /api/v1/events (sin el texto extraído)."""
+    EVENTS.publish(
+        event_type,
+        id=item_id,
+        source_type=item_data.get("source_type"),
+        title=item_data.get("title"),
+        status=item_data.get("status"),
+        error_message=item_data.get("error_message"),
+    )
+
+
+async def _store_url_item(url: str, title: str, tags: list[str], cleaned_text: str) -> str:
+    """Crea el item de una página ya extraída y lo publica en STORAGE."""
+    item_data = {
+        "source_type": "url",
+        "title": title,
+        "url": url,
+        "tags": tags,
+        "extracted_text": cleaned_text,
+        "status": "ready"
+    }
+    
+    # Insert into database
+    item_id = await item_dao.create(item_data)
+    
+    # Also update in-memory cache for immediate availability
+    STORAGE[str(item_id)] = {**item_data, "id": str(item_id)}
+    await _store_item_digest(str(item_id), cleaned_text)
+    _publish_item_event("item.created", str(item_id), item_data)
+    if cleaned_text:
+        _enqueue_for_embedding()
+    return str(item_id)
+
+
 @app.post("/api/v1/items/urls", response_model=StoredItemResponse, status_code=201)
 async def create_item_from_url(payload: URLItemCreate) -> StoredItemResponse:
     if not item_dao:
         raise HTTPException(status_code=503, detail="Database not initialized")
     
     try:
-        extracted_text = get_webpage_text(str(payload.url))
-        cleaned_text = clean_text(extracted_text)
-        
-        item_data = {
-            "source_type": "url",
-            "title": payload.title or str(payload.url),
-            "url": str(payload.url),
-            "tags": payload.tags,
-            "extracted_text": cleaned_text,
-            "status": "ready"
-        }
-        
-        # Insert into database
-        item_id = await item_dao.create(item_data)
+        with EXTRACTION_SECONDS.time(format="html"):
+            extracted_text = get_webpage_text(str(payload.url))
+        with PIPELINE_STAGE_SECONDS.time(stage="clean"):
+            cleaned_text = clean_text(extracted_text)
         
-        # Also update in-memory cache for immediate availability
-        STORAGE[str(item_id)] = {**item_data, "id": str(item_id)}
+        title = payload.title or str(payload.url)
+        item_id = await _store_url_item(str(payload.url), title, payload.tags, cleaned_text)
         
         # Trigger background regeneration
         asyncio.create_task(_regenerate_daily_plan_background())
         
         return StoredItemResponse(
-            id=str(item_id),
+            id=item_id,
             source_type="url",
-            title=item_data["title"],
+            title=title,
             status="ready",
             extracted_text=cleaned_text[:500],
             youtube_url=(
@@ -378,7 +1246,7 @@ async def create_item_from_url(payload: URLItemCreate) -> StoredItemResponse:
             ),
         )
     except Exception as e:
-        print(f"Error creating URL item: {e}")
+        logger.exception("Error creating URL item", extra={"url": str(payload.url)})
         return StoredItemResponse(
             id="error",
             source_type="url",
@@ -388,6 +1256,88 @@ async def create_item_from_url(payload: URLItemCreate) -> StoredItemResponse:
         )
 
 
+@app.post("/api/v1/items/pages", response_model=StoredItemResponse, status_code=201)
+async def create_item_from_page(request: Request) -> StoredItemResponse:
+    """
+    Guarda una página que el navegador ya tiene renderizada, sin descargarla desde el servidor.
+
+    El cuerpo es un ``PageItemCreate`` en JSON, opcionalmente comprimido con
+    ``Content-Encoding: gzip`` o ``deflate``. Sirve también para páginas tras
+    login, que el servidor no podría descargar.
+    """
+    if not item_dao:
+        raise HTTPException(status_code=503, detail="Database not initialized")
+
+    try:
+        content_length = int(request.headers.get("content-length") or 0)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid Content-Length")
+    if content_length > PAGE_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Page larger than {PAGE_MAX_BYTES} bytes")
+    try:
+        # Sin Content-Length (chunked) el límite se aplica mientras se lee
+        raw = await read_body(request.stream(), PAGE_MAX_BYTES)
+        body = decompress_body(raw, request.headers.get("content-encoding"), PAGE_MAX_BYTES)
+        payload = PageItemCreate.model_validate_json(body)
+    except BodyTooLarge:
+        raise HTTPException(status_code=413, detail=f"Page larger than {PAGE_MAX_BYTES} bytes")
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not payload.html and not payload.text:
+        raise HTTPException(status_code=422, detail="Either html or text is required")
+
+    if payload.html:
+        # bs4 sobre una página grande tarda decenas de ms: fuera del event loop
+        with EXTRACTION_SECONDS.time(format="html"):
+            extracted_text = await asyncio.to_thread(get_text_from_html, payload.html)
+    else:
+        extracted_text = payload.text
+    with PIPELINE_STAGE_SECONDS.time(stage="clean"):
+        cleaned_text = clean_text(extracted_text)
+
+    title = payload.title or str(payload.url)
+    item_id = await _store_url_item(str(payload.url), title, payload.tags, cleaned_text)
+    asyncio.create_task(_regenerate_daily_plan_background())
+    return StoredItemResponse(
+        id=item_id,
+        source_type="url",
+        title=title,
+        status="ready",
+        extracted_text=cleaned_text[:500],
+    )
+
+
+async def _store_local_file_item(
+    file_path: Path, title: str, tags: list[str], cleaned_text: str, lane: str = EMBED_INTERACTIVE
+) -> str:
+    """Crea el item de un archivo local ya extraído, lo publica en STORAGE y lo encola en ``lane``."""
+    item_data = {
+        "source_type": "local_file",
+        "title": title,
+        "file_path": str(file_path),
+        "filename": file_path.name,
+        "tags": tags,
+        "extracted_text": cleaned_text,
+        "status": "ready",
+        "embed_lane": lane,
+    }
+    item_id = await item_dao.create(item_data)
+    item_id_str = str(item_id)
+    # Actualizar STORAGE para disponibilidad inmediata en frontend
+    STORAGE[item_id_str] = {
+        "id": item_id_str,
+        **item_data,
+        "created_at": datetime.utcnow().isoformat(),
+    }
+    await _store_item_digest(item_id_str, cleaned_text)
+    _publish_item_event("item.created", item_id_str, item_data)
+    if cleaned_text:
+        _enqueue_for_embedding(lane)
+    return item_id_str
+
+
 @app.post(
     "/api/v1/items/local-files", response_model=StoredItemResponse, status_code=201
 )
@@ -404,43 +1354,16 @@ async def create_item_from_local_file(payload: LocalItemCreate) -> StoredItemRes
         with open(file_path, "rb") as f:
             stream = io.BytesIO(f.read())
 
-        suffix = file_path.suffix.lower()
-        if suffix == ".pdf":
-            extracted_text = get_pdf_from_stream(stream)
-        elif suffix in [".docx"]:
-            extracted_text = get_docx_from_stream(stream)
-        elif suffix in [".odt"]:
-            extracted_text = get_odt_from_stream(stream)
-        elif suffix in [".xlsx", ".xls"]:
-            extracted_text = get_excel_from_stream(stream)
-        elif suffix in [".txt", ".csv"]:
-            extracted_text = stream.read().decode("utf-8")
-        else:
-            raise ValueError(f"Unsupported file type: {suffix}")
-
-        cleaned_text = clean_text(extracted_text)
-        item_data = {
-            "source_type": "local_file",
-            "title": payload.title or file_path.name,
-            "file_path": str(file_path),
-            "filename": file_path.name,
-            "tags": payload.tags,
-            "extracted_text": cleaned_text,
-            "status": "ready",
-        }
-        item_id = await item_dao.create(item_data)
-        item_id_str = str(item_id)
-        # Actualizar STORAGE para disponibilidad inmediata en frontend
-        STORAGE[item_id_str] = {
-            "id": item_id_str,
-            **item_data,
-            "created_at": datetime.utcnow().isoformat(),
-        }
+        extracted_text = _extract_text_from_stream(stream, file_path.suffix.lower())
+        with PIPELINE_STAGE_SECONDS.time(stage="clean"):
+            cleaned_text = clean_text(extracted_text)
+        title = payload.title or file_path.name
+        item_id_str = await _store_local_file_item(file_path, title, payload.tags, cleaned_text)
         asyncio.create_task(_regenerate_daily_plan_background())
         return StoredItemResponse(
             id=item_id_str,
             source_type="local_file",
-            title=item_data["title"],
+            title=title,
             status="ready",
             extracted_text=cleaned_text[:500],
         )
@@ -466,6 +1389,7 @@ async def create_item_from_local_file(payload: LocalItemCreate) -> StoredItemRes
             **item_data,
             "created_at": datetime.utcnow().isoformat(),
         }
+        _publish_item_event("item.failed", item_id_str, {**item_data, "error_message": str(e)})
         asyncio.create_task(_regenerate_daily_plan_background())
         return StoredItemResponse(
             id=item_id_str,
@@ -476,6 +1400,212 @@ async def create_item_from_local_file(payload: LocalItemCreate) -> StoredItemRes
         )
 
 
+def _folder_sync_pool() -> ProcessPoolExecutor:
+    """Pool de procesos para extraer (spawn: los hijos no heredan el loop ni el pool de la BD)."""
+    global folder_sync_executor
+    if folder_sync_executor is None:
+        folder_sync_executor = ProcessPoolExecutor(
+            max_workers=FOLDER_SYNC_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return folder_sync_executor
+
+
+def _start_folder_sync(root: str, recursive: bool, tags: list[str], delete_missing: bool) -> dict:
+    """
+    Lanza la sincronización de ``root``, o devuelve el job en curso de esa carpeta o de una
+    que la contiene o está dentro de ella (dos jobs sobre los mismos archivos duplicarían items).
+    """
+    for running in FOLDER_SYNC_RUNNING.values():
+        if folders_overlap(running["root"], root):
+            return running
+
+    job = {
+        "job_id": str(uuid.uuid4()),
+        "root": root,
+        "recursive": recursive,
+        "status": "scanning",
+        "total": 0,
+        "processed": 0,
+        "created": 0,
+        "updated": 0,
+        "unchanged": 0,
+        "deleted": 0,
+        "failed": 0,
+        "errors": [],
+        "error": None,
+        "started_at": datetime.utcnow().isoformat(),
+        "finished_at": None,
+        "seconds": None,
+    }
+    FOLDER_SYNC_JOBS[job["job_id"]] = job
+    while len(FOLDER_SYNC_JOBS) > FOLDER_SYNC_JOBS_KEPT:
+        oldest = next(iter(FOLDER_SYNC_JOBS))
+        if FOLDER_SYNC_JOBS[oldest]["finished_at"] is None:
+            break
+        FOLDER_SYNC_JOBS.popitem(last=False)
+    FOLDER_SYNC_RUNNING[root] = job
+    FOLDER_SYNC_TASKS[job["job_id"]] = asyncio.create_task(_run_folder_sync(job, tags, delete_missing))
+    return job
+
+
+async def _apply_synced_file(result: dict, stat: tuple[int, int], known: dict | None, tags: list[str], job: dict):
+    """Crea o reemplaza el item de un archivo procesado; devuelve su fila de manifiesto (None = reintentar)."""
+    path = result["path"]
+    item_id = known["item_id"] if known else None
+    job["processed"] += 1
+    EXTRACTION_SECONDS.observe(result["seconds"], format=Path(path).suffix.lower().lstrip("."))
+
+    if result["error"]:
+        job["failed"] += 1
+        if len(job["errors"]) < 20:
+            job["errors"].append({"path": path, "error": result["error"]})
+        FOLDER_SYNC_FILES.inc(result="failed")
+        # Con hash conocido no se reintenta hasta que el archivo cambie; si ni se pudo leer, sí
+        return (path, *stat, result["content_hash"], item_id) if result["content_hash"] else None
+
+    if result["text"] is None:
+        # Solo cambió el mtime: mismo contenido, mismo item
+        job["unchanged"] += 1
+        FOLDER_SYNC_FILES.inc(result="unchanged")
+        return (path, *stat, result["content_hash"], item_id)
+
+    file_path = Path(path)
+    new_item_id = await _store_local_file_item(file_path, file_path.name, tags, result["text"], lane=EMBED_SYNC)
+    if item_id:
+        await _delete_items([item_id])
+        job["updated"] += 1
+        FOLDER_SYNC_FILES.inc(result="updated")
+    else:
+        job["created"] += 1
+        FOLDER_SYNC_FILES.inc(result="created")
+    return (path, *stat, result["content_hash"], UUID(new_item_id))
+
+
+async def _run_folder_sync(job: dict, tags: list[str], delete_missing: bool) -> None:
+    """
+    Sincroniza una carpeta: stat del árbol, diff con el manifiesto y extracción en paralelo.
+
+    Los archivos sin cambios de (mtime, size) no se abren; el resto se
+    extrae en el pool de procesos con como mucho dos archivos por worker
+    en vuelo, así la memoria no crece con el tamaño de la carpeta.
+    """
+    root = job["root"]
+    started = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    manifest_rows: list[tuple] = []
+    try:
+        scanned = await asyncio.to_thread(scan_folder, root, job["recursive"])
+        manifest = await folder_manifest_dao.get_for_root(root)
+        if not job["recursive"]:
+            manifest = {path: row for path, row in manifest.items() if os.path.dirname(path) == root}
+        diff = diff_manifest(scanned, manifest)
+        job["unchanged"] = len(diff.unchanged)
+        FOLDER_SYNC_FILES.inc(len(diff.unchanged), result="unchanged")
+        to_process = iter(diff.new + diff.changed)
+        job["total"] = len(diff.new) + len(diff.changed)
+        job["status"] = "running"
+
+        pool = _folder_sync_pool()
+        pending: set[asyncio.Future] = set()
+        while True:
+            while len(pending) < 2 * FOLDER_SYNC_WORKERS:
+                path = next(to_process, None)
+                if path is None:
+                    break
+                known = manifest.get(path)
+                pending.add(loop.run_in_executor(pool, process_file, path, known["content_hash"] if known else None))
+            if not pending:
+                break
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                row = await _apply_synced_file(
+                    result, scanned[result["path"]], manifest.get(result["path"]), tags, job
+                )
+                if row:
+                    manifest_rows.append(row)
+            if len(manifest_rows) >= FOLDER_SYNC_MANIFEST_BATCH:
+                await folder_manifest_dao.upsert_many(root, manifest_rows)
+                manifest_rows.clear()
+
+        if diff.deleted and delete_missing:
+            item_ids = [manifest[path]["item_id"] for path in diff.deleted if manifest[path]["item_id"]]
+            job["deleted"] = await _delete_items(item_ids)
+            FOLDER_SYNC_FILES.inc(job["deleted"], result="deleted")
+            await folder_manifest_dao.delete_paths(diff.deleted)
+        job["status"] = "done"
+    except asyncio.CancelledError:
+        job["status"] = "cancelled"
+        raise
+    except Exception as e:
+        logger.exception("Folder sync failed", extra={"root": root})
+        job["status"] = "failed"
+        job["error"] = str(e)
+    finally:
+        # Los items ya creados deben quedar en el manifiesto aunque el job se corte
+        try:
+            await folder_manifest_dao.upsert_many(root, manifest_rows)
+        except Exception:
+            logger.exception("Could not save folder manifest", extra={"root": root})
+        FOLDER_SYNC_RUNNING.pop(root, None)
+        FOLDER_SYNC_TASKS.pop(job["job_id"], None)
+        job["finished_at"] = datetime.utcnow().isoformat()
+        job["seconds"] = round(time.perf_counter() - started, 3)
+        logger.info("Folder sync finished", extra={"folder_sync": {k: v for k, v in job.items() if k != "errors"}})
+        EVENTS.publish("folder_sync.finished", **{k: v for k, v in job.items() if k != "errors"})
+        if job["created"] or job["updated"] or job["deleted"]:
+            asyncio.create_task(_regenerate_daily_plan_background())
+
+
+async def _periodic_folder_sync() -> None:
+    """Resincroniza FOLDER_SYNC_PATHS cada FOLDER_SYNC_INTERVAL_SECONDS."""
+    while True:
+        for root in FOLDER_SYNC_PATHS:
+            root = os.path.abspath(root)
+            if os.path.isdir(root):
+                job = _start_folder_sync(root, True, [], FOLDER_SYNC_DELETE_MISSING)
+                if job["root"] != root:
+                    logger.info(
+                        "Folder sync skipped, overlapping sync running", extra={"root": root, "running": job["root"]}
+                    )
+            else:
+                logger.warning("Folder to sync not found", extra={"root": root})
+        await asyncio.sleep(FOLDER_SYNC_INTERVAL_SECONDS)
+
+
+@app.post("/api/v1/items/local-folders", status_code=202)
+async def sync_local_folder(payload: FolderSyncCreate) -> dict:
+    """
+    Sincroniza una carpeta local en segundo plano y devuelve el job para seguir su progreso.
+
+    Solo se extraen los archivos nuevos o modificados desde la última
+    sincronización; si la carpeta ya se está sincronizando se devuelve ese job.
+    """
+    if not item_dao or not folder_manifest_dao:
+        raise HTTPException(status_code=503, detail="Database not initialized")
+    root = os.path.abspath(payload.path)
+    if not os.path.isdir(root):
+        raise HTTPException(status_code=404, detail="Folder not found")
+    job = _start_folder_sync(root, payload.recursive, payload.tags, payload.delete_missing)
+    if job["root"] != root:
+        raise HTTPException(status_code=409, detail=f"Overlapping folder is being synced: {job['root']}")
+    return job
+
+
+@app.get("/api/v1/items/local-folders/jobs")
+async def list_folder_sync_jobs() -> list[dict]:
+    """Últimos jobs de sincronización, el más reciente primero."""
+    return list(reversed(FOLDER_SYNC_JOBS.values()))
+
+
+@app.get("/api/v1/items/local-folders/jobs/{job_id}")
+async def get_folder_sync_job(job_id: str) -> dict:
+    job = FOLDER_SYNC_JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
 @app.post("/api/v1/items/files", response_model=StoredItemResponse, status_code=201)
 async def create_item_from_uploaded_file(
     file: UploadFile = File(...),
@@ -490,20 +1620,9 @@ async def create_item_from_uploaded_file(
         filename = file.filename or "unknown"
         suffix = Path(filename).suffix.lower()
 
-        if suffix == ".pdf":
-            extracted_text = get_pdf_from_stream(stream)
-        elif suffix in [".docx"]:
-            extracted_text = get_docx_from_stream(stream)
-        elif suffix in [".odt"]:
-            extracted_text = get_odt_from_stream(stream)
-        elif suffix in [".xlsx", ".xls"]:
-            extracted_text = get_excel_from_stream(stream)
-        elif suffix in [".txt", ".csv"]:
-            extracted_text = content.decode("utf-8")
-        else:
-            raise ValueError(f"Unsupported file type: {suffix}")
-
-        cleaned_text = clean_text(extracted_text)
+        extracted_text = _extract_text_from_stream(stream, suffix)
+        with PIPELINE_STAGE_SECONDS.time(stage="clean"):
+            cleaned_text = clean_text(extracted_text)
         item_data = {
             "source_type": "uploaded_file",
             "title": filename,
@@ -519,6 +1638,10 @@ async def create_item_from_uploaded_file(
             **item_data,
             "created_at": datetime.utcnow().isoformat(),
         }
+        await _store_item_digest(item_id_str, cleaned_text)
+        _publish_item_event("item.created", item_id_str, item_data)
+        if cleaned_text:
+            _enqueue_for_embedding()
         asyncio.create_task(_regenerate_daily_plan_background())
         return StoredItemResponse(
             id=item_id_str,
@@ -548,6 +1671,7 @@ async def create_item_from_uploaded_file(
             **item_data,
             "created_at": datetime.utcnow().isoformat(),
         }
+        _publish_item_event("item.failed", item_id_str, {**item_data, "error_message": str(e)})
         asyncio.create_task(_regenerate_daily_plan_background())
         return StoredItemResponse(
             id=item_id_str,
@@ -562,41 +1686,157 @@ async def create_item_from_uploaded_file(
 async def list_items(
     view: FocusView = Query(default=FocusView.ALL),
     q: str | None = Query(default=None, description="Filtro textual opcional"),
+    limit: int = Query(default=50, ge=1, le=500),
+    cursor: str | None = Query(default=None, description="next_cursor de la página anterior"),
+    fields: str | None = Query(
+        default=None,
+        description=f"Campos separados por comas ({', '.join(ITEM_LIST_FIELDS)})",
+    ),
 ) -> dict[str, object]:
+    """
+    Página de items (más recientes primero) con paginación por cursor sobre (created_at, id).
+
+    ``total`` es el número de items de la biblioteca (estimado en tablas
+    grandes, ver ``total_exact``); con ``q`` no se calcula.
+    """
     if not item_dao:
         raise HTTPException(status_code=503, detail="Database not initialized")
     
-    if q:
-        items = await item_dao.list_by_search(q)
-    else:
-        items = await item_dao.list_all()
-
-    # Simplificar respuesta (sin texto completo)
-    items_summary = [
-        {
-            "id": str(item["id"]),
-            "title": item.get("title"),
-            "source_type": item["source_type"],
-            "status": item["status"],
-            "created_at": item.get("created_at"),
-        }
-        for item in items
-    ]
+    try:
+        after = decode_cursor(cursor) if cursor else None
+        columns = parse_fields(fields, ITEM_LIST_FIELDS, DEFAULT_ITEM_LIST_FIELDS, required=("id", "created_at"))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    items = await item_dao.list_page(limit=limit, after=after, fields=tuple(columns), search_term=q)
+    total, total_exact = (None, False) if q else await item_dao.count_estimate()
+
+    next_cursor = None
+    if len(items) == limit:
+        last = items[-1]
+        next_cursor = encode_cursor(last["created_at"], last["id"])
 
     return {
         "view": view,
-        "total": len(items_summary),
-        "items": items_summary,
+        "total": total,
+        "total_exact": total_exact,
+        "items": [{**item, "id": str(item["id"])} for item in items],
+        "next_cursor": next_cursor,
     }
 
 
 @app.post("/api/v1/search")
 async def search_items(payload: SearchRequest) -> list[dict]:
+    """
+    Search items by text and/or tags; with ``semantic`` the query is matched
+    by embedding similarity, scoped to the items carrying the tags.
+    """
+    if not item_dao:
+        raise HTTPException(status_code=503, detail="Database not initialized")
+    
+    if payload.semantic and payload.query and embedding_dao:
+        items = await _semantic_search(payload)
+        if items is not None:
+            return items
+    
+    if payload.tags:
+        return await item_dao.list_by_tags(payload.query, payload.tags, limit=payload.limit, match=payload.tag_match)
+    return await item_dao.list_by_search(payload.query or "", limit=payload.limit)
+
+
+async def _semantic_search(payload: SearchRequest) -> list[dict] | None:
+    """Items ranked by their best chunk similarity; None if embeddings are unavailable."""
+    model_spec = get_model_spec()
+    embedding_model = await get_embedding_model_async(model_spec.id)
+    query_embeddings = await generate_embeddings_for_text(payload.query, embedding_model) if embedding_model else None
+    if not query_embeddings:
+        logger.warning("Semantic search unavailable, falling back to text search")
+        return None
+    
+    scope_ids = None
+    if payload.tags:
+        scope_ids = await item_dao.list_ids_by_tags(payload.tags, match=payload.tag_match)
+        if not scope_ids:
+            return []
+    
+    # Varios chunks pueden ser del mismo item: pedir de más y quedarse con el mejor de cada uno
+    hits = await embedding_dao.search_similar(
+        query_embeddings[0][1], limit=payload.limit * 3, spec=model_spec, item_ids=scope_ids
+    )
+    best: dict[UUID, float] = {}
+    for hit in hits:
+        best.setdefault(hit["item_id"], hit["similarity"])
+    ranked = list(best)[:payload.limit]
+    items = await item_dao.get_many(ranked)
+    return [{**items[i], "similarity": best[i]} for i in ranked if i in items]
+
+
+@app.get("/api/v1/export")
+async def export_brain(
+    model_id: str | None = Query(default=None, description="Modelo de los vectores exportados (por defecto el activo)"),
+    vectors: bool = Query(default=True, description="Incluir chunks y vectores"),
+) -> StreamingResponse:
+    """
+    Stream every item with its chunks and float32 vectors as NDJSON (see utils/transfer.py).
+    Memory stays constant: rows are read through a server-side cursor.
+    """
+    if not transfer_dao:
+        raise HTTPException(status_code=503, detail="Database not initialized")
+    
+    spec = None
+    if vectors:
+        try:
+            spec = get_model_spec(model_id)
+        except KeyError:
+            raise HTTPException(status_code=400, detail=f"Unknown embedding model '{model_id}'")
+    
+    filename = f"smartbrain-{datetime.utcnow():%Y%m%d-%H%M%S}.ndjson"
+    return StreamingResponse(
+        export_ndjson(transfer_dao, spec.id if spec else None, spec.dimension if spec else None),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@app.post("/api/v1/import")
+async def import_brain(request: Request) -> dict:
+    """
+    Bulk-load an NDJSON export (request body) with COPY.
+
+    Items that already exist (same id) are skipped. Vectors are stored as-is
+    when their model is configured here with the same dimension; otherwise
+    the embedding worker re-embeds the imported items. Batches are committed
+    as they go, so a failed import can simply be re-run.
+    """
+    if not transfer_dao:
+        raise HTTPException(status_code=503, detail="Database not initialized")
+    
+    try:
+        stats = await import_ndjson(transfer_dao, iter_lines(request.stream()))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid import: {e}")
+    
+    if stats["items_imported"]:
+        for item_id, row in (await item_dao.get_all_for_cache()).items():
+            STORAGE.setdefault(item_id, _item_cache_entry(row))
+        if not stats["vectors_reused"]:
+            _enqueue_for_embedding(EMBED_SYNC, stats["items_imported"])
+        EVENTS.publish("items.imported", items=stats["items_imported"], vectors_reused=stats["vectors_reused"])
+        asyncio.create_task(_regenerate_daily_plan_background())
+    logger.info("Import finished", extra={"import": stats})
+    return stats
+
+
+@app.get("/api/v1/tags")
+async def list_tags(
+    limit: int = Query(default=100, ge=1, le=1000),
+    prefix: str | None = Query(default=None, description="Solo tags que empiezan por este texto"),
+) -> dict[str, object]:
+    """Tag facets (items per tag), read from the incrementally maintained tag_counts table."""
     if not item_dao:
         raise HTTPException(status_code=503, detail="Database not initialized")
     
-    items = await item_dao.list_by_search(payload.query, payload.tags)
-    return items
+    return {"tags": await item_dao.tag_facets(limit=limit, prefix=prefix or None)}
 
 
 @app.get("/api/v1/items/{item_id}")
@@ -615,36 +1855,48 @@ async def get_item(item_id: str) -> dict:
     return STORAGE[item_id]
 
 
-@app.delete("/api/v1/items/{item_id}", status_code=204)
-async def delete_item(item_id: str) -> None:
-    if not item_dao or not task_dao:
-        raise HTTPException(status_code=503, detail="Database not initialized")
-    
-    try:
-        item_uuid = UUID(item_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid item ID format")
-    
+async def _delete_items(item_uuids: list[UUID]) -> int:
+    """Borra items con sus tareas y los saca de las cachés; devuelve cuántos existían."""
     # Delete from database
-    deleted = await item_dao.delete(item_uuid)
-    if not deleted:
-        raise HTTPException(status_code=404, detail="Item not found")
+    deleted_ids = [item_uuid for item_uuid in item_uuids if await item_dao.delete(item_uuid)]
+    if not deleted_ids:
+        return 0
+    item_ids = {str(item_uuid) for item_uuid in deleted_ids}
     
     # Delete associated tasks from database
-    await task_dao.delete_by_items([item_uuid])
+    await task_dao.delete_by_items(deleted_ids)
+    
+    # Cached chat answers built from these items are stale now
+    ANSWER_CACHE.invalidate_items(item_ids)
     
     # Also update in-memory cache
-    if item_id in STORAGE:
-        del STORAGE[item_id]
+    for item_id in item_ids:
+        STORAGE.pop(item_id, None)
+        EVENTS.publish("item.deleted", id=item_id)
     
     # Remove from persistent tasks cache
     tasks_to_remove = [
         tid
         for tid, data in PERSISTENT_TASKS.items()
-        if item_id in data.get("generated_from_items", [])
+        if item_ids.intersection(data.get("generated_from_items", []))
     ]
     for tid in tasks_to_remove:
         del PERSISTENT_TASKS[tid]
+    return len(deleted_ids)
+
+
+@app.delete("/api/v1/items/{item_id}", status_code=204)
+async def delete_item(item_id: str) -> None:
+    if not item_dao or not task_dao:
+        raise HTTPException(status_code=503, detail="Database not initialized")
+    
+    try:
+        item_uuid = UUID(item_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid item ID format")
+    
+    if not await _delete_items([item_uuid]):
+        raise HTTPException(status_code=404, detail="Item not found")
     
     asyncio.create_task(_regenerate_daily_plan_background())
 
@@ -660,12 +1912,15 @@ async def generate_daily_plan() -> DailyPlanResponse:
             detail="Ollama is not available. Install the 'ollama' Python package and ensure ollama service is running.",
         )
 
-    # Esperar a que termine la regeneración si está ocurriendo
+    # Esperar al warm-up y a que termine la regeneración si está ocurriendo
+    await WARMUP_DONE.wait()
     async with DAILY_PLAN_LOCK:
         if DAILY_PLAN_CACHE is not None:
+            CACHE_REQUESTS.inc(cache="daily_plan", result="hit")
             return DAILY_PLAN_CACHE
 
         # Si no hay caché, generar ahora
+        CACHE_REQUESTS.inc(cache="daily_plan", result="miss")
         DAILY_PLAN_CACHE = await _build_daily_plan_from_persistent()
         return DAILY_PLAN_CACHE
 
@@ -689,6 +1944,7 @@ async def complete_task(task_id: str) -> dict[str, bool]:
     # Also update in-memory cache
     if task_id in PERSISTENT_TASKS:
         PERSISTENT_TASKS[task_id]["completed"] = True
+    EVENTS.publish("task.completed", id=task_id)
     
     # Regenerate plan if less than 5 active tasks
     active_count = await task_dao.count_active()
@@ -698,24 +1954,56 @@ async def complete_task(task_id: str) -> dict[str, bool]:
     return {"completed": True}
 
 
-async def _generate_daily_plan_prompt() -> str:
-    """Sintetiza un prompt con todos los elementos almacenados desde la BD."""
-    if not item_dao:
-        return ""
-    
-    items_summary = []
-    all_items = await item_dao.list_all(limit=50)
+async def _refresh_item_digests(batch_size: int = 200) -> int:
+    """Catch-up: digest of every ready item that has none yet (imports, failed upserts); returns how many were added."""
+    added = 0
+    while True:
+        rows = await item_digest_dao.list_missing(limit=batch_size)
+        if not rows:
+            return added
+        await item_digest_dao.upsert_many([
+            {
+                "item_id": row["id"],
+                "source_type": row["source_type"],
+                "title": row["title"],
+                "summary": row["summary"] or summarize_text(row["extracted_text"]),
+                "item_created_at": row["created_at"],
+            }
+            for row in rows
+        ])
+        added += len(rows)
+        if len(rows) < batch_size:
+            return added
 
-    for item_data in all_items:
-        source_type = item_data.get("source_type", "unknown")
-        title = item_data.get("title", "Untitled")
-        item_id = str(item_data.get("id", "unknown"))
 
-        item_summary = f"<id>{item_id}</id> [{source_type}] {title}"
-        items_summary.append(item_summary)
+async def _mark_planned_items(new_tasks: list[DailyTask], item_ids: list[str]) -> None:
+    """Marca como planificados solo los items del prompt que alguna tarea referencia; el resto sigue siendo candidato."""
+    referenced = {task.generated_from for task in new_tasks if task.generated_from}
+    await item_digest_dao.mark_planned([UUID(i) for i in item_ids if i in referenced])
 
-    if not items_summary:
-        return ""
+
+async def _generate_daily_plan_prompt() -> tuple[str, list[str]]:
+    """
+    Sintetiza el prompt del plan desde los digests de items; devuelve también sus ids.
+
+    Solo entran items que nunca se han planificado (los más recientes
+    primero), hasta PLAN_PROMPT_TOKEN_BUDGET. Un item pasa a planificado
+    cuando una tarea lo referencia y ya no se vuelve a enviar, así no se
+    repiten tareas ni crece el prompt; los que ninguna tarea usó siguen
+    siendo candidatos.
+    """
+    if not item_digest_dao:
+        return "", []
+    
+    # Digests que no se crearon al guardar el item (importación, fallos)
+    await _refresh_item_digests()
+    candidates = await item_digest_dao.list_for_plan(limit=PLAN_DIGEST_CANDIDATES)
+    digests = select_for_prompt(candidates, PLAN_PROMPT_TOKEN_BUDGET)
+    if not digests:
+        return "", []
+
+    items_summary = [format_digest_line(d) for d in digests]
+    item_ids = [str(d["item_id"]) for d in digests]
 
     prompt = (
         "You are a task planner. Generate 4-6 specific daily tasks based EXCLUSIVELY on the stored items below.\n\n"
@@ -723,22 +2011,17 @@ async def _generate_daily_plan_prompt() -> str:
         "CRITICAL RULES:\n"
         "1. Every task MUST explicitly reference a stored item by its title or content\n"
         "2. NO generic tasks like 'Review stored resources' or 'Work on project'\n"
-        "3. Format: [Emoji] [Action verb] [item reference]\n"
-        "4. Examples:\n"
-        "   - ✅ '📄 Read memo_teletrabajo_2024.txt about remote work policy'\n"
-        "   - ✅ '📊 Analyze Q4 2024 support incidents from incidencias_soporte_Q4_2024.csv'\n"
-        "   - ❌ 'Review stored resources' (too generic)\n"
-        "   - ❌ 'Work on project' (no item reference)\n\n"
+        "3. Task text format: [Emoji] [Action verb] [item reference]\n"
+        "4. Put the id of the referenced item (the value inside <id></id>) in item_id, "
+        "or null if the task combines several items\n\n"
         "OUTPUT FORMAT:\n"
-        "Write ONE task per line. Start each task with an emoji.\n"
-        "Do NOT use JSON, code blocks, or markdown. Just plain text, one task per line.\n\n"
-        "Example output:\n"
-        "📄 Read memo_teletrabajo_2024.txt about remote work policy\n"
-        "📊 Analyze Q4 2024 support incidents\n\n"
+        "Answer with a JSON object only, for example:\n"
+        '{"tasks": [{"text": "📄 Read memo_teletrabajo_2024.txt about remote work policy", "item_id": "<id of that item>"}, '
+        '{"text": "📊 Analyze Q4 2024 support incidents", "item_id": null}]}\n\n'
         "Generate the tasks now:"
     )
     
-    return prompt
+    return prompt, item_ids
 
 
 @app.post("/api/v1/sentiments", response_model=SentimentResponse, status_code=201)
@@ -755,67 +2038,119 @@ async def list_sentiments() -> list[dict]:
     return SENTIMENTS_STORAGE
 
 
-@app.post("/api/v1/chat")
-async def chat_with_rag(payload: ChatMessageCreate) -> dict:
+async def _build_rag_context(similar_chunks: list[dict], model_id: str) -> str:
     """
-    Chat endpoint with RAG (Retrieval-Augmented Generation).
-    Retrieves relevant context from embeddings and generates response with Ollama.
+    Turn search hits into prompt context: each hit is extended with its
+    neighbouring chunks (one query), overlapping spans are merged, near
+    duplicates dropped and the result packed into CONTEXT_TOKEN_BUDGET.
     """
+    hits = []
+    for i, chunk in enumerate(similar_chunks, 1):
+        similarity = chunk.get('similarity', 0)
+        logger.debug("Chunk %d: %s (similarity: %.3f)", i, chunk['title'][:50], similarity)
+        if similarity > 0.2:  # Only use chunks with >20% similarity (lowered threshold)
+            hits.append(chunk)
+    if not hits:
+        return ""
+
+    keys = neighbour_keys(hits, CONTEXT_NEIGHBOURS)
+    rows = await embedding_dao.get_chunks([(UUID(item_id), index) for item_id, index in keys], model_id)
+    chunks = {(str(row["item_id"]), row["chunk_index"]): row["chunk_text"] for row in rows}
+    titles = {str(hit["item_id"]): hit["title"] for hit in hits}
+
+    passages = pack_passages(build_passages(hits, chunks, titles, CONTEXT_NEIGHBOURS), CONTEXT_TOKEN_BUDGET)
+    context_text = format_context(passages)
+    logger.debug(
+        "RAG context built",
+        extra={"hits": len(hits), "passages": len(passages), "tokens": estimate_tokens(context_text)},
+    )
+    return context_text
+
+
+def _chat_flight_key(payload: ChatMessageCreate) -> tuple:
+    """Requests with the same normalized message, scope and cache flag share one computation."""
+    return (
+        normalize_message(payload.message),
+        tuple(sorted(set(payload.retrieval_scope))),
+        payload.use_cache,
+    )
+
+
+def _chat_preflight(payload: ChatMessageCreate) -> tuple[dict | None, list[UUID]]:
+    """Checks shared by the chat endpoints: (error response or None, parsed retrieval scope)."""
     if not OLLAMA_AVAILABLE:
         return {
             "text": "⚠️ Ollama is not available. Please make sure the service is running.",
             "role": "ai"
-        }
+        }, []
     
     if not embedding_dao:
         return {
             "text": "⚠️ Embedding system is not initialized.",
             "role": "ai"
-        }
+        }, []
     
     try:
-        user_message = payload.message
-        
-        # Step 1: Generate embedding for user query
-        embedding_model = get_embedding_model()
-        if not embedding_model:
-            return {
-                "text": "⚠️ Embedding model not available. Responding without context...\n\n" + 
-                        await _call_ollama_simple(user_message),
-                "role": "ai"
-            }
-        
-        # Generate query embedding
-        query_embeddings = await generate_embeddings_for_text(user_message, embedding_model)
-        if not query_embeddings:
-            return {
-                "text": "⚠️ Could not generate embedding. Responding without context...\n\n" + 
-                        await _call_ollama_simple(user_message),
-                "role": "ai"
-            }
-        
-        query_vector = query_embeddings[0][1]  # First chunk's embedding
-        
-        # Step 2: Search for similar embeddings (RAG retrieval)
-        print(f"🔍 Searching for relevant context: {user_message[:50]}...")
-        similar_chunks = await embedding_dao.search_similar(query_vector, limit=5)
-        
-        # Step 3: Build context from retrieved chunks
-        context_parts = []
-        if similar_chunks:
-            print(f"✓ Found {len(similar_chunks)} relevant chunks")
-            for i, chunk in enumerate(similar_chunks, 1):
-                similarity = chunk.get('similarity', 0)
-                print(f"  - Chunk {i}: {chunk['title'][:50]}... (similarity: {similarity:.3f})")
-                if similarity > 0.2:  # Only use chunks with >20% similarity (lowered threshold)
-                    context_parts.append(
-                        f"[Source {i}: {chunk['title']}]\n{chunk['chunk_text']}\n"
-                    )
-        
-        # Step 4: Generate response with Ollama
-        if context_parts:
-            context_text = "\n---\n".join(context_parts)
-            prompt = f"""You are an intelligent assistant. Answer the user's question based on the provided context.
+        return None, [UUID(item_id) for item_id in payload.retrieval_scope]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid item ID format in retrieval_scope")
+
+
+async def _prepare_chat(payload: ChatMessageCreate, scope_ids: list[UUID]) -> dict:
+    """
+    Embedding, retrieval, answer cache and prompt (steps 1-3 of the chat).
+
+    Returns ``{"response": {...}}`` when the answer is already known (cache
+    hit, embeddings unavailable) or ``{"prompt": str, "cache": tuple}`` with
+    the arguments to store the generated answer in ANSWER_CACHE.
+    """
+    user_message = payload.message
+    
+    # Step 1: Generate embedding for user query (query and search must use the same model)
+    model_spec = get_model_spec()
+    embedding_model = await get_embedding_model_async(model_spec.id)
+    if not embedding_model:
+        return {"response": {
+            "text": "⚠️ Embedding model not available. Responding without context...\n\n" + 
+                    await _call_ollama_simple(user_message),
+            "role": "ai"
+        }}
+    
+    # Generate query embedding
+    query_embeddings = await generate_embeddings_for_text(user_message, embedding_model)
+    if not query_embeddings:
+        return {"response": {
+            "text": "⚠️ Could not generate embedding. Responding without context...\n\n" + 
+                    await _call_ollama_simple(user_message),
+            "role": "ai"
+        }}
+    
+    query_vector = query_embeddings[0][1]  # First chunk's embedding
+    
+    # Step 2: Search for similar embeddings (RAG retrieval)
+    logger.debug("Searching for relevant context: %s", user_message[:50])
+    similar_chunks = await embedding_dao.search_similar(
+        query_vector, limit=5, spec=model_spec, item_ids=scope_ids or None
+    )
+    
+    # Same question (by embedding) over the same retrieved chunks -> reuse the answer
+    chunk_ids = [chunk["id"] for chunk in similar_chunks]
+    source_item_ids = {chunk["item_id"] for chunk in similar_chunks}
+    if payload.use_cache:
+        cached_answer = ANSWER_CACHE.get(query_vector, chunk_ids, model_spec.id)
+        CACHE_REQUESTS.inc(cache="chat_answer", result="hit" if cached_answer else "miss")
+        if cached_answer:
+            return {"response": {
+                "text": cached_answer,
+                "role": "ai",
+                "cached": True
+            }}
+    
+    # Step 3: Build context from retrieved chunks (neighbours merged, within the token budget)
+    context_text = await _build_rag_context(similar_chunks, model_spec.id)
+    
+    if context_text:
+        prompt = f"""You are an intelligent assistant. Answer the user's question based on the provided context.
 
 RELEVANT CONTEXT:
 {context_text}
@@ -831,9 +2166,9 @@ INSTRUCTIONS:
 - Be conversational and friendly
 
 RESPONSE:"""
-        else:
-            print("⚠️  No relevant context found, responding generally")
-            prompt = f"""You are an intelligent assistant. Answer the user's question helpfully.
+    else:
+        logger.info("No relevant context found, responding generally")
+        prompt = f"""You are an intelligent assistant. Answer the user's question helpfully.
 
 USER QUESTION:
 {user_message}
@@ -841,19 +2176,43 @@ USER QUESTION:
 NOTE: I don't have access to specific information about this topic in my current knowledge base.
 
 RESPONSE:"""
+    
+    return {"prompt": prompt, "cache": (query_vector, chunk_ids, source_item_ids, model_spec.id)}
+
+
+def _llm_busy_response(error: LLMOverloaded) -> dict:
+    return {
+        "text": (
+            "⚠️ The assistant is busy right now "
+            f"(estimated wait ~{error.estimated_seconds:.0f}s). Please try again in a moment."
+        ),
+        "role": "ai",
+        "retry_after": round(error.estimated_seconds),
+    }
+
+
+CHAT_OLLAMA_OPTIONS = {
+    'temperature': 0.7,
+    'top_p': 0.9,
+}
+
+
+async def _answer_chat(payload: ChatMessageCreate, scope_ids: list[UUID]) -> dict:
+    """Full RAG answer for one chat message (run once per coalesced group)."""
+    try:
+        prepared = await _prepare_chat(payload, scope_ids)
+        if "response" in prepared:
+            return prepared["response"]
         
-        # Call Ollama
-        print(f"🤖 Calling Ollama (model: gpt-oss:20b)...")
-        response = ollama.generate(
+        # Step 4: Generate response with Ollama
+        logger.debug("Calling Ollama (model: gpt-oss:20b)")
+        ai_response = (await _ollama_generate(
+            "chat",
+            deadline=CHAT_DEADLINE_SECONDS,
             model='gpt-oss:20b',
-            prompt=prompt,
-            options={
-                'temperature': 0.7,
-                'top_p': 0.9,
-            }
-        )
-        
-        ai_response = response.get('response', '').strip()
+            prompt=prepared["prompt"],
+            options=CHAT_OLLAMA_OPTIONS,
+        )).strip()
         
         if not ai_response:
             return {
@@ -861,111 +2220,233 @@ RESPONSE:"""
                 "role": "ai"
             }
         
-        print(f"✓ Response generated ({len(ai_response)} characters)")
+        logger.info("Chat response generated", extra={"chars": len(ai_response)})
+        query_vector, chunk_ids, source_item_ids, model_id = prepared["cache"]
+        ANSWER_CACHE.put(query_vector, chunk_ids, source_item_ids, ai_response, model_id)
         
         return {
             "text": ai_response,
             "role": "ai"
         }
     
+    except LLMOverloaded as e:
+        logger.warning("Chat shed by LLM scheduler", extra={"estimated_seconds": round(e.estimated_seconds, 1)})
+        return _llm_busy_response(e)
+    
     except Exception as e:
-        print(f"❌ Error in chat: {e}")
+        logger.exception("Error in chat")
         return {
             "text": f"⚠️ Error processing your message: {str(e)}",
             "role": "ai"
         }
 
 
+async def _stream_chat_events(payload: ChatMessageCreate, scope_ids: list[UUID]) -> AsyncIterator[dict]:
+    """Chat answer as events: ``{"type": "token", "text"}``... then ``{"type": "done", "cached"}``."""
+    try:
+        prepared = await _prepare_chat(payload, scope_ids)
+        if "response" in prepared:
+            yield {"type": "token", "text": prepared["response"]["text"]}
+            yield {"type": "done", "cached": prepared["response"].get("cached", False)}
+            return
+        
+        parts = []
+        async for token in _ollama_stream(
+            "chat",
+            deadline=CHAT_DEADLINE_SECONDS,
+            model='gpt-oss:20b',
+            prompt=prepared["prompt"],
+            options=CHAT_OLLAMA_OPTIONS,
+        ):
+            parts.append(token)
+            yield {"type": "token", "text": token}
+        
+        ai_response = "".join(parts).strip()
+        if ai_response:
+            query_vector, chunk_ids, source_item_ids, model_id = prepared["cache"]
+            ANSWER_CACHE.put(query_vector, chunk_ids, source_item_ids, ai_response, model_id)
+        yield {"type": "done", "cached": False}
+    
+    except LLMOverloaded as e:
+        logger.warning("Chat shed by LLM scheduler", extra={"estimated_seconds": round(e.estimated_seconds, 1)})
+        yield {"type": "error", **_llm_busy_response(e)}
+    
+    except Exception as e:
+        logger.exception("Error in chat stream")
+        yield {"type": "error", "text": f"⚠️ Error processing your message: {str(e)}"}
+
+
+@app.post("/api/v1/chat")
+async def chat_with_rag(payload: ChatMessageCreate) -> dict:
+    """
+    Chat endpoint with RAG (Retrieval-Augmented Generation).
+    Retrieves relevant context from embeddings and generates response with Ollama.
+    Identical concurrent questions share one computation.
+    """
+    error, scope_ids = _chat_preflight(payload)
+    if error:
+        return error
+    
+    response, shared = await CHAT_FLIGHT.do(
+        _chat_flight_key(payload), lambda: _answer_chat(payload, scope_ids)
+    )
+    COALESCED_REQUESTS.inc(endpoint="chat", role="follower" if shared else "leader")
+    return dict(response)
+
+
+@app.post("/api/v1/chat/stream")
+async def chat_with_rag_stream(payload: ChatMessageCreate) -> StreamingResponse:
+    """
+    Streaming variant of /api/v1/chat: NDJSON events as Ollama generates.
+    Identical concurrent questions receive the same token stream.
+    """
+    error, scope_ids = _chat_preflight(payload)
+    
+    async def events() -> AsyncIterator[bytes]:
+        if error:
+            yield (json.dumps({"type": "token", "text": error["text"]}) + "\n").encode()
+            yield (json.dumps({"type": "done", "cached": False}) + "\n").encode()
+            return
+        stream, shared = CHAT_FLIGHT.stream(
+            _chat_flight_key(payload), lambda: _stream_chat_events(payload, scope_ids)
+        )
+        COALESCED_REQUESTS.inc(endpoint="chat_stream", role="follower" if shared else "leader")
+        async for event in stream:
+            yield (json.dumps(event, ensure_ascii=False) + "\n").encode()
+    
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+def _ollama_generate_sync(purpose: str, on_token=None, cancelled: threading.Event | None = None, **kwargs) -> str:
+    """
+    Stream an Ollama generation, recording time-to-first-token and total time.
+
+    Stops at the next token once ``cancelled`` is set (the reader went away).
+    """
+    started = time.perf_counter()
+    parts = []
+    stream = ollama.generate(stream=True, **kwargs)
+    try:
+        for chunk in stream:
+            if cancelled is not None and cancelled.is_set():
+                return "".join(parts)
+            if not parts:
+                OLLAMA_TTFT_SECONDS.observe(time.perf_counter() - started, purpose=purpose)
+            token = chunk.get("response", "")
+            parts.append(token)
+            if on_token and token:
+                on_token(token)
+    finally:
+        # Cerrar la respuesta HTTP para que Ollama deje de generar
+        close = getattr(stream, "close", None)
+        if close:
+            close()
+    OLLAMA_GENERATION_SECONDS.observe(time.perf_counter() - started, purpose=purpose)
+    return "".join(parts)
+
+
+async def _ollama_generate(purpose: str, deadline: float | None = None, **kwargs) -> str:
+    """
+    Run an Ollama generation in a worker thread so the event loop stays free.
+    Waits for a slot in LLM_SCHEDULER with the priority of ``purpose``; the
+    slot is held until the thread finishes, even if this call is cancelled.
+    """
+    return await LLM_SCHEDULER.run_in_thread(
+        functools.partial(_ollama_generate_sync, purpose, **kwargs), LLM_PRIORITIES[purpose], deadline
+    )
+
+
+async def _ollama_stream(purpose: str, deadline: float | None = None, **kwargs) -> AsyncIterator[str]:
+    """
+    Yield Ollama tokens as they arrive; the blocking client runs in a worker thread.
+
+    If the consumer stops early (client disconnected) the generation is told
+    to stop; its LLM_SCHEDULER slot is freed once the thread has returned.
+    """
+    loop = asyncio.get_running_loop()
+    tokens: asyncio.Queue = asyncio.Queue()
+    cancelled = threading.Event()
+    
+    def on_token(token: str) -> None:
+        loop.call_soon_threadsafe(tokens.put_nowait, token)
+    
+    generation = asyncio.ensure_future(LLM_SCHEDULER.run_in_thread(
+        functools.partial(_ollama_generate_sync, purpose, on_token, cancelled, **kwargs),
+        LLM_PRIORITIES[purpose],
+        deadline,
+    ))
+    getter = None
+    try:
+        while True:
+            getter = asyncio.ensure_future(tokens.get())
+            await asyncio.wait({getter, generation}, return_when=asyncio.FIRST_COMPLETED)
+            if getter.done():
+                yield getter.result()
+                continue
+            getter.cancel()
+            # Generación terminada: vaciar lo que quede en la cola
+            while not tokens.empty():
+                yield tokens.get_nowait()
+            generation.result()  # propaga errores de Ollama
+            return
+    finally:
+        # Consumidor cancelado o cerrado antes de tiempo: parar el hilo en el próximo token
+        cancelled.set()
+        if getter is not None:
+            getter.cancel()
+        if not generation.done():
+            generation.cancel()
+
+
 async def _call_ollama_simple(message: str) -> str:
     """Simple Ollama call without RAG context."""
     try:
-        response = ollama.generate(
+        response_text = await _ollama_generate(
+            "chat_simple",
+            deadline=CHAT_DEADLINE_SECONDS,
             model='gpt-oss:20b',
             prompt=f"Answer this question briefly: {message}",
             options={'temperature': 0.7}
         )
-        return response.get('response', 'Could not generate response.').strip()
+        return response_text.strip() or 'Could not generate response.'
     except Exception as e:
         return f"Error: {str(e)}"
         return f"Error: {str(e)}"
 
 
-async def _call_ollama_for_plan(prompt: str) -> list[DailyTask] | None:
-    """Llama a ollama para generar el plan diario, reintentando hasta 3 veces si el formato es inválido."""
+async def _call_ollama_for_plan(prompt: str, known_item_ids: list[str] | None = None) -> list[DailyTask] | None:
+    """
+    Llama a ollama para generar el plan diario con salida JSON restringida a PLAN_SCHEMA.
+
+    Las tareas válidas se aceptan aunque sean menos de MIN_TASKS (aceptación
+    parcial); solo se repite la generación si no sale ninguna utilizable.
+    """
     if not OLLAMA_AVAILABLE:
         return None
 
-    max_retries = 3
-
-    for attempt in range(1, max_retries + 1):
+    for attempt in range(1, PLAN_MAX_ATTEMPTS + 1):
         try:
-            print(f"Ollama attempt {attempt}/{max_retries}")
-
-            response = ollama.generate(
+            response_text = (await _ollama_generate(
+                "daily_plan",
                 model="gpt-oss:20b",
                 prompt=prompt,
-                stream=False,
-            )
-
-            response_text = response.get("response", "").strip()
-
-            # Imprimir prompt y respuesta para debugging
-            if attempt == 1:
-                print("Prompt sent to Ollama:")
-                print(prompt)
-            print(f"Raw response from Ollama (attempt {attempt}):")
-            print(response_text)
-
-            # Limpiar markdown si está presente
-            cleaned_text = response_text
-            if "```" in response_text:
-                # Eliminar bloques de código markdown
-                import re
-
-                cleaned_text = re.sub(
-                    r"```[^`]*```", "", response_text, flags=re.DOTALL
-                ).strip()
-
-            # Procesar líneas
-            lines = [line.strip() for line in cleaned_text.split("\n") if line.strip()]
-
-            # Filtrar líneas que parecen tareas (no vacías, no son cabeceras)
-            tasks = []
-            for line in lines:
-                # Ignorar líneas comunes que no son tareas
-                if any(
-                    skip in line.lower()
-                    for skip in ["output:", "tasks:", "example", "---", "==="]
-                ):
-                    continue
-                # Ignorar líneas que empiezan con - o * (lista markdown)
-                if line.startswith(("-", "*", "•")):
-                    line = line[1:].strip()
-                # Ignorar líneas numeradas como "1.", "2."
-                if len(line) > 2 and line[0].isdigit() and line[1] in ".)":
-                    line = line[2:].strip()
-
-                # Verificar que tenga contenido sustancial
-                if len(line) >= 10:  # Al menos 10 caracteres
-                    # Extraer ID del item si está presente en formato <id>...</id>
-                    item_id = None
-                    if "<id>" in line and "</id>" in line:
-                        import re
-
-                        id_match = re.search(r"<id>([^<]+)</id>", line)
-                        if id_match:
-                            item_id = id_match.group(1).strip()
-                            # Limpiar la línea del tag de ID
-                            line = re.sub(r"\s*<id>[^<]+</id>\s*", "", line).strip()
-
-                    tasks.append({"text": line, "item_id": item_id})
-
-            # Limitar a 6 tareas máximo
-            tasks = tasks[:6]
-
-            # Validar que tengamos al menos 3 tareas
-            if len(tasks) >= 3:
-                print(f"Successfully parsed {len(tasks)} tasks on attempt {attempt}")
+                format=PLAN_SCHEMA,
+                options={"temperature": 0.4},
+            )).strip()
+
+            # Volcar prompt y respuesta solo con DEBUG activo (evita formatear textos largos)
+            if logger.isEnabledFor(logging.DEBUG):
+                if attempt == 1:
+                    logger.debug("Prompt sent to Ollama", extra={"prompt": prompt})
+                logger.debug("Raw response from Ollama", extra={"attempt": attempt, "response": response_text})
+
+            parsed = parse_plan_output(response_text, known_item_ids)
+            if parsed.tasks:
+                log = logger.info if parsed.complete else logger.warning
+                log(
+                    "Parsed daily plan tasks",
+                    extra={"tasks": len(parsed.tasks), "rejected": parsed.rejected, "attempt": attempt},
+                )
                 return [
                     DailyTask(
                         id=str(idx),
@@ -973,20 +2454,16 @@ async def _call_ollama_for_plan(prompt: str) -> list[DailyTask] | None:
                         completed=False,
                         generated_from=task["item_id"],
                     )
-                    for idx, task in enumerate(tasks, 1)
+                    for idx, task in enumerate(parsed.tasks, 1)
                 ]
 
-            print(
-                f"Invalid format on attempt {attempt}: only found {len(tasks)} tasks (need at least 3)"
+            logger.warning(
+                "No valid tasks in plan output",
+                extra={"attempt": attempt, "rejected": parsed.rejected, "error": parsed.error},
             )
-            if attempt < max_retries:
-                print(f"Retrying...")
-                continue
 
         except Exception as e:
-            print(f"Error calling ollama on attempt {attempt}: {e}")
-            if attempt < max_retries:
-                continue
+            logger.exception("Error calling ollama", extra={"attempt": attempt})
 
-    print(f"Failed to generate valid tasks after {max_retries} attempts")
+    logger.error("Failed to generate valid tasks after %d attempts", PLAN_MAX_ATTEMPTS)
     return None
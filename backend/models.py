@@ -19,6 +19,8 @@
 from datetime import datetime
 from typing import Literal
 from enum import Enum
+from uuid import UUID
+
 from pydantic import BaseModel, Field, HttpUrl
 
 
@@ -33,12 +35,29 @@ class URLItemCreate(BaseModel):
     tags: list[str] = Field(default_factory=list)
 
 
+class PageItemCreate(BaseModel):
+    """Página ya renderizada por la extensión: se guarda sin volver a descargarla."""
+
+    url: HttpUrl
+    title: str | None = Field(default=None, max_length=200)
+    tags: list[str] = Field(default_factory=list)
+    html: str | None = Field(default=None, description="HTML renderizado (document.documentElement.outerHTML)")
+    text: str | None = Field(default=None, description="Texto ya extraído, si no se envía el HTML")
+
+
 class LocalItemCreate(BaseModel):
     file_path: str = Field(..., description="Ruta local del archivo")
     title: str | None = Field(default=None, max_length=200)
     tags: list[str] = Field(default_factory=list)
 
 
+class FolderSyncCreate(BaseModel):
+    path: str = Field(..., description="Carpeta local a sincronizar")
+    recursive: bool = True
+    tags: list[str] = Field(default_factory=list)
+    delete_missing: bool = Field(default=False, description="Borrar los items de archivos que ya no existen")
+
+
 class StoredItemResponse(BaseModel):
     id: str
     source_type: Literal["url", "local_file", "uploaded_file"]
@@ -60,6 +79,10 @@ class ChatMessageCreate(BaseModel):
         default_factory=list,
         description="IDs de items que el usuario pide eliminar desde el chat",
     )
+    use_cache: bool = Field(
+        default=True,
+        description="Reutilizar una respuesta cacheada para una pregunta equivalente",
+    )
 
 
 class ChatMessageResponse(BaseModel):
@@ -90,6 +113,16 @@ class SentimentResponse(BaseModel):
     generated_at: datetime = Field(default_factory=datetime.utcnow)
 
 
+class EmbeddingRequeueRequest(BaseModel):
+    item_ids: list[UUID] | None = Field(default=None, description="Items a reencolar; sin item_ids, todos los del dead-letter")
+
+
 class SearchRequest(BaseModel):
     query: str | None = None
     tags: list[str] = Field(default_factory=list)
+    tag_match: Literal["all", "any"] = Field(
+        default="all",
+        description="all: el item tiene todos los tags; any: al menos uno",
+    )
+    semantic: bool = Field(default=False, description="Búsqueda vectorial de query dentro de los tags")
+    limit: int = Field(default=100, ge=1, le=500)
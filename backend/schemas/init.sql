@@ -17,19 +17,45 @@ CREATE TABLE IF NOT EXISTS items (
     extracted_text TEXT,
     status VARCHAR(20) DEFAULT 'pending' CHECK (status IN ('pending', 'ready', 'failed')),
     error_message TEXT,
+    summary TEXT, -- Short LLM summary, filled in the background
+    summary_hash VARCHAR(64), -- SHA-256 of the extracted_text the summary was made from
+    embed_attempts INTEGER NOT NULL DEFAULT 0, -- Failed embedding attempts; at EMBED_MAX_ATTEMPTS the item goes to 'failed'
+    embed_retry_at TIMESTAMP WITH TIME ZONE, -- Not picked by the embedding worker before this time (backoff)
+    embed_lane VARCHAR(16) NOT NULL DEFAULT 'interactive' CHECK (embed_lane IN ('interactive', 'sync')), -- Embedding priority lane
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Embedding models registry: one row per (model, version) configured in utils/embeddings.py
+CREATE TABLE IF NOT EXISTS embedding_models (
+    id VARCHAR(100) PRIMARY KEY, -- e.g. 'all-MiniLM-L6-v2@1'
+    model_name TEXT NOT NULL,
+    dimension INTEGER NOT NULL CHECK (dimension > 0),
+    status VARCHAR(20) NOT NULL DEFAULT 'registered' CHECK (status IN ('registered', 'backfilling', 'active', 'retired')),
+    backfill_cursor_created_at TIMESTAMP WITH TIME ZONE, -- Checkpoint: last (created_at, id) re-embedded
+    backfill_cursor_id UUID,
+    backfill_items_done INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    activated_at TIMESTAMP WITH TIME ZONE
+);
+
+-- Only one model serves queries at a time
+CREATE UNIQUE INDEX IF NOT EXISTS idx_embedding_models_single_active ON embedding_models(status) WHERE status = 'active';
+
+INSERT INTO embedding_models (id, model_name, dimension, status, activated_at)
+VALUES ('all-MiniLM-L6-v2@1', 'sentence-transformers/all-MiniLM-L6-v2', 384, 'active', CURRENT_TIMESTAMP)
+ON CONFLICT (id) DO NOTHING;
+
 -- Embeddings table: stores vector embeddings for RAG
 CREATE TABLE IF NOT EXISTS embeddings (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     item_id UUID NOT NULL REFERENCES items(id) ON DELETE CASCADE,
+    model_id VARCHAR(100) NOT NULL REFERENCES embedding_models(id), -- Model/version that produced the vector
     chunk_index INTEGER NOT NULL, -- Order of chunk within the document
     chunk_text TEXT NOT NULL,
-    embedding vector(384), -- Dimension depends on embedding model (384 for all-MiniLM-L6-v2)
+    embedding vector, -- Untyped: dimension depends on model_id, indexed per model below
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-    UNIQUE(item_id, chunk_index)
+    CONSTRAINT embeddings_item_model_chunk_key UNIQUE (item_id, model_id, chunk_index)
 );
 
 -- Tasks table: stores persistent daily tasks
@@ -43,15 +69,58 @@ CREATE TABLE IF NOT EXISTS tasks (
     completed_at TIMESTAMP WITH TIME ZONE
 );
 
+-- Item digests: short per-item summary used to build the daily plan prompt incrementally
+CREATE TABLE IF NOT EXISTS item_digests (
+    item_id UUID PRIMARY KEY REFERENCES items(id) ON DELETE CASCADE,
+    source_type VARCHAR(50),
+    title VARCHAR(500),
+    summary TEXT,
+    item_created_at TIMESTAMP WITH TIME ZONE,
+    last_planned_at TIMESTAMP WITH TIME ZONE, -- NULL until the item is sent to the planner
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Tag facets: items per tag, maintained incrementally by the items_tag_counts trigger
+CREATE TABLE IF NOT EXISTS tag_counts (
+    tag TEXT PRIMARY KEY,
+    item_count INTEGER NOT NULL DEFAULT 0 CHECK (item_count >= 0)
+);
+
+-- Estado de cada archivo de las carpetas sincronizadas (solo se reprocesa lo que cambió)
+CREATE TABLE IF NOT EXISTS folder_manifest (
+    path TEXT PRIMARY KEY,
+    root TEXT NOT NULL,
+    mtime_ns BIGINT NOT NULL,
+    size BIGINT NOT NULL,
+    content_hash VARCHAR(64),
+    item_id UUID REFERENCES items(id) ON DELETE SET NULL,
+    synced_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Indexes for performance
 CREATE INDEX IF NOT EXISTS idx_items_source_type ON items(source_type);
 CREATE INDEX IF NOT EXISTS idx_items_status ON items(status);
 CREATE INDEX IF NOT EXISTS idx_items_created_at ON items(created_at DESC);
 CREATE INDEX IF NOT EXISTS idx_items_tags ON items USING GIN(tags);
+CREATE INDEX IF NOT EXISTS idx_items_unsummarized ON items(created_at DESC) WHERE summary IS NULL AND status = 'ready';
+CREATE INDEX IF NOT EXISTS idx_items_summary_hash ON items(summary_hash) WHERE summary_hash IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_items_embed_lane ON items(embed_lane, created_at) WHERE status = 'ready';
+CREATE INDEX IF NOT EXISTS idx_items_embed_dead_letter ON items(updated_at DESC) WHERE status = 'failed' AND embed_attempts > 0;
 
--- Vector similarity search index (HNSW for fast approximate nearest neighbor)
-CREATE INDEX IF NOT EXISTS idx_embeddings_vector ON embeddings USING hnsw (embedding vector_cosine_ops);
+-- Vector similarity search index (HNSW for fast approximate nearest neighbor).
+-- One partial expression index per model: the cast fixes the dimension for that model.
+-- The backend creates the index for new models (EmbeddingModelDAO.ensure_index).
+CREATE INDEX IF NOT EXISTS idx_embeddings_hnsw_all_minilm_l6_v2_1 ON embeddings
+    USING hnsw ((embedding::vector(384)) vector_cosine_ops) WHERE model_id = 'all-MiniLM-L6-v2@1';
 CREATE INDEX IF NOT EXISTS idx_embeddings_item_id ON embeddings(item_id);
+CREATE INDEX IF NOT EXISTS idx_embeddings_model_item ON embeddings(model_id, item_id);
+
+CREATE INDEX IF NOT EXISTS idx_item_digests_unplanned ON item_digests(item_created_at DESC) WHERE last_planned_at IS NULL;
+
+-- Búsqueda por prefijo de ruta (LIKE 'raíz/%'), cualquiera que sea la carpeta que sincronizó el archivo
+CREATE INDEX IF NOT EXISTS idx_folder_manifest_path_prefix ON folder_manifest(path text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_folder_manifest_item_id ON folder_manifest(item_id);
 
 CREATE INDEX IF NOT EXISTS idx_tasks_completed ON tasks(completed);
 CREATE INDEX IF NOT EXISTS idx_tasks_created_at ON tasks(created_at DESC);
@@ -69,6 +138,26 @@ $$ language 'plpgsql';
 CREATE TRIGGER update_items_updated_at BEFORE UPDATE ON items
 FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+-- Keep tag_counts in sync with items.tags (duplicated tags in one item count once)
+CREATE OR REPLACE FUNCTION update_tag_counts()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.tags IS NOT NULL THEN
+        UPDATE tag_counts SET item_count = item_count - 1
+        WHERE tag IN (SELECT DISTINCT unnest(OLD.tags));
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.tags IS NOT NULL THEN
+        INSERT INTO tag_counts (tag, item_count)
+        SELECT DISTINCT unnest(NEW.tags), 1
+        ON CONFLICT (tag) DO UPDATE SET item_count = tag_counts.item_count + 1;
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE TRIGGER items_tag_counts AFTER INSERT OR DELETE OR UPDATE OF tags ON items
+FOR EACH ROW EXECUTE FUNCTION update_tag_counts();
+
 -- Completed_at trigger for tasks
 CREATE OR REPLACE FUNCTION update_task_completed_at()
 RETURNS TRIGGER AS $$
@@ -88,5 +177,9 @@ COMMENT ON TABLE items IS 'Stores all knowledge base items (URLs, files, documen
 COMMENT ON TABLE embeddings IS 'Vector embeddings for semantic search and RAG';
 COMMENT ON TABLE tasks IS 'Persistent daily tasks generated from items';
 
-COMMENT ON COLUMN embeddings.embedding IS 'Vector embedding (384d for all-MiniLM-L6-v2, adjust based on model)';
+COMMENT ON TABLE embedding_models IS 'Registry of embedding models/versions, active model and re-embedding checkpoints';
+COMMENT ON COLUMN embeddings.embedding IS 'Vector embedding, dimension given by embedding_models.dimension for model_id';
+COMMENT ON TABLE item_digests IS 'Per-item digest for the daily plan prompt, with the last time the item was planned';
+COMMENT ON TABLE tag_counts IS 'Items per tag for the tag sidebar, maintained by the items_tag_counts trigger';
+COMMENT ON TABLE folder_manifest IS 'mtime/size/hash of every file under a synced folder and the item created from it';
 COMMENT ON COLUMN tasks.generated_from_items IS 'Snapshot of all item IDs present when task was generated';
@@ -0,0 +1,50 @@
+-- Registro de modelos de embeddings y embeddings versionados por modelo.
+-- Idempotente: se puede aplicar sobre una BD creada con un init.sql antiguo o nuevo.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS embedding_models (
+    id VARCHAR(100) PRIMARY KEY,
+    model_name TEXT NOT NULL,
+    dimension INTEGER NOT NULL CHECK (dimension > 0),
+    status VARCHAR(20) NOT NULL DEFAULT 'registered' CHECK (status IN ('registered', 'backfilling', 'active', 'retired')),
+    backfill_cursor_created_at TIMESTAMP WITH TIME ZONE,
+    backfill_cursor_id UUID,
+    backfill_items_done INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    activated_at TIMESTAMP WITH TIME ZONE
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_embedding_models_single_active ON embedding_models(status) WHERE status = 'active';
+
+INSERT INTO embedding_models (id, model_name, dimension, status, activated_at)
+VALUES ('all-MiniLM-L6-v2@1', 'sentence-transformers/all-MiniLM-L6-v2', 384, 'active', CURRENT_TIMESTAMP)
+ON CONFLICT (id) DO NOTHING;
+
+-- Los embeddings existentes son de all-MiniLM-L6-v2
+ALTER TABLE embeddings ADD COLUMN IF NOT EXISTS model_id VARCHAR(100) REFERENCES embedding_models(id);
+UPDATE embeddings SET model_id = 'all-MiniLM-L6-v2@1' WHERE model_id IS NULL;
+ALTER TABLE embeddings ALTER COLUMN model_id SET NOT NULL;
+
+ALTER TABLE embeddings DROP CONSTRAINT IF EXISTS embeddings_item_id_chunk_index_key;
+ALTER TABLE embeddings DROP CONSTRAINT IF EXISTS embeddings_item_model_chunk_key;
+ALTER TABLE embeddings ADD CONSTRAINT embeddings_item_model_chunk_key UNIQUE (item_id, model_id, chunk_index);
+
+-- Columna sin dimensión fija + un índice HNSW parcial por modelo
+DROP INDEX IF EXISTS idx_embeddings_vector;
+ALTER TABLE embeddings ALTER COLUMN embedding TYPE vector;
+CREATE INDEX IF NOT EXISTS idx_embeddings_hnsw_all_minilm_l6_v2_1 ON embeddings
+    USING hnsw ((embedding::vector(384)) vector_cosine_ops) WHERE model_id = 'all-MiniLM-L6-v2@1';
+CREATE INDEX IF NOT EXISTS idx_embeddings_model_item ON embeddings(model_id, item_id);
+
+COMMIT;
+
+-- Rollback (solo si no hay embeddings de otros modelos):
+-- DELETE FROM embeddings WHERE model_id <> 'all-MiniLM-L6-v2@1';
+-- DROP INDEX idx_embeddings_hnsw_all_minilm_l6_v2_1;
+-- ALTER TABLE embeddings ALTER COLUMN embedding TYPE vector(384);
+-- CREATE INDEX idx_embeddings_vector ON embeddings USING hnsw (embedding vector_cosine_ops);
+-- ALTER TABLE embeddings DROP CONSTRAINT embeddings_item_model_chunk_key;
+-- ALTER TABLE embeddings ADD CONSTRAINT embeddings_item_id_chunk_index_key UNIQUE (item_id, chunk_index);
+-- ALTER TABLE embeddings DROP COLUMN model_id;
+-- DROP TABLE embedding_models;
@@ -0,0 +1,24 @@
+-- Resumen por item para construir el prompt del plan diario de forma incremental.
+-- Las filas se crean desde el backend (ItemDigestDAO) para los items que aún no tienen.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS item_digests (
+    item_id UUID PRIMARY KEY REFERENCES items(id) ON DELETE CASCADE,
+    source_type VARCHAR(50),
+    title VARCHAR(500),
+    summary TEXT,
+    item_created_at TIMESTAMP WITH TIME ZONE,
+    last_planned_at TIMESTAMP WITH TIME ZONE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_item_digests_plan_order ON item_digests(last_planned_at ASC NULLS FIRST, item_created_at DESC);
+
+COMMENT ON TABLE item_digests IS 'Per-item digest for the daily plan prompt, with the last time the item was planned';
+
+COMMIT;
+
+-- Rollback:
+-- DROP TABLE IF EXISTS item_digests;
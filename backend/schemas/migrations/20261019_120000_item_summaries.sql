@@ -0,0 +1,17 @@
+-- Resúmenes de items generados en segundo plano, reutilizables por hash del contenido.
+
+BEGIN;
+
+ALTER TABLE items ADD COLUMN IF NOT EXISTS summary TEXT;
+ALTER TABLE items ADD COLUMN IF NOT EXISTS summary_hash VARCHAR(64);
+
+CREATE INDEX IF NOT EXISTS idx_items_unsummarized ON items(created_at DESC) WHERE summary IS NULL AND status = 'ready';
+CREATE INDEX IF NOT EXISTS idx_items_summary_hash ON items(summary_hash) WHERE summary_hash IS NOT NULL;
+
+COMMIT;
+
+-- Rollback:
+-- DROP INDEX IF EXISTS idx_items_summary_hash;
+-- DROP INDEX IF EXISTS idx_items_unsummarized;
+-- ALTER TABLE items DROP COLUMN summary_hash;
+-- ALTER TABLE items DROP COLUMN summary;
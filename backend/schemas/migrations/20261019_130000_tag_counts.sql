@@ -0,0 +1,46 @@
+-- Conteo de items por tag mantenido por trigger (facetas del buscador).
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS tag_counts (
+    tag TEXT PRIMARY KEY,
+    item_count INTEGER NOT NULL DEFAULT 0 CHECK (item_count >= 0)
+);
+
+CREATE OR REPLACE FUNCTION update_tag_counts()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.tags IS NOT NULL THEN
+        UPDATE tag_counts SET item_count = item_count - 1
+        WHERE tag IN (SELECT DISTINCT unnest(OLD.tags));
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.tags IS NOT NULL THEN
+        INSERT INTO tag_counts (tag, item_count)
+        SELECT DISTINCT unnest(NEW.tags), 1
+        ON CONFLICT (tag) DO UPDATE SET item_count = tag_counts.item_count + 1;
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+-- Bloquear escrituras en items mientras se rellena el conteo inicial
+LOCK TABLE items IN SHARE ROW EXCLUSIVE MODE;
+
+DROP TRIGGER IF EXISTS items_tag_counts ON items;
+CREATE TRIGGER items_tag_counts AFTER INSERT OR DELETE OR UPDATE OF tags ON items
+FOR EACH ROW EXECUTE FUNCTION update_tag_counts();
+
+TRUNCATE tag_counts;
+INSERT INTO tag_counts (tag, item_count)
+SELECT tag, COUNT(DISTINCT id)
+FROM items, unnest(tags) AS tag
+GROUP BY tag;
+
+COMMENT ON TABLE tag_counts IS 'Items per tag for the tag sidebar, maintained by the items_tag_counts trigger';
+
+COMMIT;
+
+-- Rollback:
+-- DROP TRIGGER IF EXISTS items_tag_counts ON items;
+-- DROP FUNCTION IF EXISTS update_tag_counts();
+-- DROP TABLE IF EXISTS tag_counts;
@@ -0,0 +1,24 @@
+-- Manifiesto de las carpetas sincronizadas: mtime/size/hash por archivo para que
+-- una nueva sincronización solo extraiga los archivos nuevos o modificados.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS folder_manifest (
+    path TEXT PRIMARY KEY,
+    root TEXT NOT NULL,
+    mtime_ns BIGINT NOT NULL,
+    size BIGINT NOT NULL,
+    content_hash VARCHAR(64),
+    item_id UUID REFERENCES items(id) ON DELETE SET NULL,
+    synced_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_folder_manifest_root ON folder_manifest(root);
+CREATE INDEX IF NOT EXISTS idx_folder_manifest_item_id ON folder_manifest(item_id);
+
+COMMENT ON TABLE folder_manifest IS 'mtime/size/hash of every file under a synced folder and the item created from it';
+
+COMMIT;
+
+-- Rollback:
+-- DROP TABLE IF EXISTS folder_manifest;
@@ -0,0 +1,17 @@
+-- Reintentos del worker de embeddings: contador de intentos y backoff por item.
+-- Tras EMBED_MAX_ATTEMPTS el item pasa a status 'failed' con el error en error_message
+-- (dead-letter) y sale de la cola hasta que se reencola con POST /api/v1/embeddings/requeue.
+
+BEGIN;
+
+ALTER TABLE items ADD COLUMN IF NOT EXISTS embed_attempts INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE items ADD COLUMN IF NOT EXISTS embed_retry_at TIMESTAMP WITH TIME ZONE;
+
+CREATE INDEX IF NOT EXISTS idx_items_embed_dead_letter ON items(updated_at DESC) WHERE status = 'failed' AND embed_attempts > 0;
+
+COMMIT;
+
+-- Rollback:
+-- DROP INDEX IF EXISTS idx_items_embed_dead_letter;
+-- ALTER TABLE items DROP COLUMN embed_retry_at;
+-- ALTER TABLE items DROP COLUMN embed_attempts;
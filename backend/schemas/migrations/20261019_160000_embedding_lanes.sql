@@ -0,0 +1,17 @@
+-- Carril de prioridad de cada item en el worker de embeddings: 'interactive' para lo que
+-- sube el usuario, 'sync' para sincronización de carpetas e importaciones masivas.
+-- Los items existentes pendientes quedan como 'sync' para no adelantarse a las subidas nuevas.
+
+BEGIN;
+
+ALTER TABLE items ADD COLUMN IF NOT EXISTS embed_lane VARCHAR(16) NOT NULL DEFAULT 'sync'
+    CHECK (embed_lane IN ('interactive', 'sync'));
+ALTER TABLE items ALTER COLUMN embed_lane SET DEFAULT 'interactive';
+
+CREATE INDEX IF NOT EXISTS idx_items_embed_lane ON items(embed_lane, created_at) WHERE status = 'ready';
+
+COMMIT;
+
+-- Rollback:
+-- DROP INDEX IF EXISTS idx_items_embed_lane;
+-- ALTER TABLE items DROP COLUMN embed_lane;
@@ -0,0 +1,12 @@
+-- El prompt del plan solo lee digests aún no planificados: índice parcial sobre esos.
+
+BEGIN;
+
+DROP INDEX IF EXISTS idx_item_digests_plan_order;
+CREATE INDEX IF NOT EXISTS idx_item_digests_unplanned ON item_digests(item_created_at DESC) WHERE last_planned_at IS NULL;
+
+COMMIT;
+
+-- Rollback:
+-- DROP INDEX IF EXISTS idx_item_digests_unplanned;
+-- CREATE INDEX IF NOT EXISTS idx_item_digests_plan_order ON item_digests(last_planned_at ASC NULLS FIRST, item_created_at DESC);
@@ -0,0 +1,13 @@
+-- El manifiesto se lee por prefijo de ruta y no por la columna root, para que
+-- sincronizar carpetas anidadas (/a y /a/b) no duplique items.
+
+BEGIN;
+
+DROP INDEX IF EXISTS idx_folder_manifest_root;
+CREATE INDEX IF NOT EXISTS idx_folder_manifest_path_prefix ON folder_manifest(path text_pattern_ops);
+
+COMMIT;
+
+-- Rollback:
+-- DROP INDEX IF EXISTS idx_folder_manifest_path_prefix;
+-- CREATE INDEX IF NOT EXISTS idx_folder_manifest_root ON folder_manifest(root);
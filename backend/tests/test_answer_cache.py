@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# Copyright (C) 2026 Smart Brain Contributors
+#
+# This file is part of Smart Brain.
+# See the LICENSE file at the project root for full terms.
+
+from utils.answer_cache import SemanticAnswerCache
+
+MODEL = "all-MiniLM-L6-v2@1"
+
+
+def test_hit_requires_similar_query_and_same_chunks():
+    """Prueba que solo se reutilice la respuesta con pregunta similar y mismos chunks."""
+    cache = SemanticAnswerCache(threshold=0.95)
+    cache.put([1.0, 0.0, 0.0], ["c1", "c2"], ["item-a"], "respuesta", MODEL)
+
+    assert cache.get([0.99, 0.05, 0.0], ["c2", "c1"], MODEL) == "respuesta"
+    assert cache.get([0.5, 0.5, 0.0], ["c1", "c2"], MODEL) is None
+    assert cache.get([1.0, 0.0, 0.0], ["c1", "c3"], MODEL) is None
+    assert cache.get([1.0, 0.0, 0.0], ["c1", "c2"], "otro-modelo@1") is None
+
+
+def test_invalidate_by_item():
+    """Prueba que borrar o re-embeber un item invalide sus respuestas."""
+    cache = SemanticAnswerCache()
+    cache.put([1.0, 0.0], ["c1"], ["item-a"], "a", MODEL)
+    cache.put([0.0, 1.0], ["c2"], ["item-b"], "b", MODEL)
+
+    assert cache.invalidate_items(["item-a"]) == 1
+    assert cache.get([1.0, 0.0], ["c1"], MODEL) is None
+    assert cache.get([0.0, 1.0], ["c2"], MODEL) == "b"
+    assert len(cache) == 1
+
+
+def test_put_replaces_equivalent_question():
+    """Prueba que una pregunta equivalente sustituya a la entrada anterior."""
+    cache = SemanticAnswerCache(threshold=0.9)
+    cache.put([1.0, 0.0], ["c1"], ["item-a"], "vieja", MODEL)
+    cache.put([1.0, 0.01], ["c1"], ["item-a"], "nueva", MODEL)
+
+    assert len(cache) == 1
+    assert cache.get([1.0, 0.0], ["c1"], MODEL) == "nueva"
+
+
+def test_lru_eviction_and_ttl():
+    """Prueba el límite de entradas (LRU) y la caducidad."""
+    cache = SemanticAnswerCache(max_entries=2)
+    cache.put([1.0, 0.0], ["c1"], ["a"], "uno", MODEL)
+    cache.put([1.0, 0.0], ["c2"], ["b"], "dos", MODEL)
+    assert cache.get([1.0, 0.0], ["c1"], MODEL) == "uno"  # c1 pasa a ser el más reciente
+    cache.put([1.0, 0.0], ["c3"], ["c"], "tres", MODEL)
+
+    assert len(cache) == 2
+    assert cache.get([1.0, 0.0], ["c2"], MODEL) is None
+    assert cache.get([1.0, 0.0], ["c1"], MODEL) == "uno"
+
+    expired = SemanticAnswerCache(ttl_seconds=-1)
+    expired.put([1.0, 0.0], ["c1"], ["a"], "uno", MODEL)
+    assert expired.get([1.0, 0.0], ["c1"], MODEL) is None
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# Copyright (C) 2026 Smart Brain Contributors
+#
+# This file is part of Smart Brain.
+# See the LICENSE file at the project root for full terms.
+
+import pytest
+
+from benchmarks.stats import compare, percentile, recall_at_k, summarize
+
+
+def test_percentile_interpolation():
+    """Prueba los percentiles interpolados sobre una muestra conocida."""
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == pytest.approx(50.5)
+    assert percentile(values, 99) == pytest.approx(99.01)
+    assert percentile([], 95) == 0.0
+    assert percentile([3.0], 95) == 3.0
+
+
+def test_summarize_reports_milliseconds_and_throughput():
+    """Prueba que el resumen convierta a milisegundos y calcule el throughput."""
+    summary = summarize([0.1, 0.2, 0.3], errors=1, elapsed=2.0)
+    assert summary["count"] == 3
+    assert summary["errors"] == 1
+    assert summary["throughput_rps"] == 1.5
+    assert summary["p50_ms"] == 200.0
+    assert summary["max_ms"] == 300.0
+
+
+def test_compare_flags_regressions_beyond_tolerance():
+    """Prueba que solo se marquen regresiones que superan la tolerancia."""
+    baseline = {"routes": {
+        "chat": {"count": 10, "p95_ms": 100.0, "throughput_rps": 10.0},
+        "list": {"count": 10, "p95_ms": 10.0, "throughput_rps": 50.0},
+    }}
+    current = {"routes": {
+        "chat": {"count": 10, "p95_ms": 150.0, "throughput_rps": 7.0},
+        "list": {"count": 10, "p95_ms": 11.0, "throughput_rps": 48.0},
+    }}
+    regressions = compare(current, baseline, tolerance=0.2)
+    assert len(regressions) == 2
+    assert all(line.startswith("chat:") for line in regressions)
+
+
+def test_recall_at_k():
+    """Prueba el recall@k con resultados parciales, desordenados y vacíos."""
+    truth = [1, 2, 3, 4, 5]
+    assert recall_at_k([5, 4, 3, 2, 1], truth, 5) == 1.0
+    assert recall_at_k([1, 9, 3, 8, 7], truth, 5) == pytest.approx(0.4)
+    assert recall_at_k([9, 1], truth, 1) == 0.0
+    assert recall_at_k([], [], 5) == 0.0
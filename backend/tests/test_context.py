@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# Copyright (C) 2026 Smart Brain Contributors
+#
+# This file is part of Smart Brain.
+# See the LICENSE file at the project root for full terms.
+
+from utils.context import (
+    ContextPassage,
+    build_passages,
+    estimate_tokens,
+    format_context,
+    join_overlapping,
+    neighbour_keys,
+    pack_passages,
+)
+from utils.embeddings import chunk_text
+
+
+def _hit(item_id, chunk_index, similarity, title="Doc"):
+    return {"item_id": item_id, "chunk_index": chunk_index, "similarity": similarity, "title": title}
+
+
+def test_neighbour_keys_window_and_dedup():
+    """Prueba que se pidan los vecinos de cada acierto sin repetir ni bajar de 0."""
+    keys = neighbour_keys([_hit("a", 0, 0.9), _hit("a", 1, 0.8), _hit("b", 5, 0.5)], window=1)
+    assert keys == [("a", 0), ("a", 1), ("a", 2), ("b", 4), ("b", 5), ("b", 6)]
+
+
+def test_join_overlapping_removes_shared_text():
+    """Prueba que al unir chunks consecutivos no se repita el solapamiento."""
+    assert join_overlapping("uno dos tres cuatro", "tres cuatro cinco") == "uno dos tres cuatro cinco"
+    assert join_overlapping("sin solape", "otra cosa") == "sin solape otra cosa"
+
+
+def test_join_overlapping_ignores_short_partial_matches():
+    """Prueba que una coincidencia corta a mitad de palabra no se tome por solapamiento."""
+    assert join_overlapping("...in the data", "and more") == "...in the data and more"
+    assert join_overlapping("Totals were 2024", "4 new items") == "Totals were 2024 4 new items"
+    assert join_overlapping("el informe anual", "anual de ventas") == "el informe anual de ventas"
+
+
+def test_join_overlapping_reconstructs_chunked_text():
+    """Prueba que los chunks de chunk_text se reconstruyan sin duplicados."""
+    text = " ".join(f"Frase número {i} del documento de prueba." for i in range(60))
+    chunks = chunk_text(text, max_chunk_size=200, overlap=50)
+    merged = chunks[0]
+    for chunk in chunks[1:]:
+        merged = join_overlapping(merged, chunk)
+    assert merged == text
+
+
+def test_build_passages_merges_adjacent_hits():
+    """Prueba que aciertos contiguos del mismo item formen un único pasaje."""
+    hits = [_hit("a", 1, 0.6), _hit("a", 3, 0.9), _hit("b", 0, 0.4, title="Otro")]
+    chunks = {("a", i): f"a{i}" for i in range(5)}
+    chunks[("b", 0)] = "b0"
+    chunks[("b", 1)] = "b1"
+
+    passages = build_passages(hits, chunks, {"a": "Doc", "b": "Otro"}, window=1)
+
+    by_item = {p.item_id: p for p in passages}
+    assert len(passages) == 2
+    assert (by_item["a"].first_chunk, by_item["a"].last_chunk) == (0, 4)
+    assert by_item["a"].score == 0.9
+    assert by_item["a"].text == "a0 a1 a2 a3 a4"
+    assert (by_item["b"].first_chunk, by_item["b"].last_chunk) == (0, 1)
+
+
+def test_pack_passages_budget_and_dedupe():
+    """Prueba que se respete el presupuesto y se descarten pasajes casi idénticos."""
+    text = "the quarterly meeting agreed to move the rollout to the next quarter " * 4
+    passages = [
+        ContextPassage("a", "A", 0, 0, text, 0.9),
+        ContextPassage("b", "B", 0, 0, text + "again", 0.8),
+        ContextPassage("c", "C", 0, 0, "completely different budget notes " * 20, 0.7),
+    ]
+    packed = pack_passages(passages, budget_tokens=estimate_tokens(text) + 60, min_tokens=50)
+
+    assert [p.item_id for p in packed] == ["a", "c"]
+    assert sum(estimate_tokens(p.text) for p in packed) <= estimate_tokens(text) + 61
+    assert packed[1].text.endswith("…")
+
+
+def test_format_context_numbers_sources():
+    """Prueba el formato de las fuentes en el prompt."""
+    output = format_context([ContextPassage("a", "Acta", 0, 1, "texto", 0.5)])
+    assert output == "[Source 1: Acta]\ntexto\n"
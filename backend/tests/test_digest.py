@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# Copyright (C) 2026 Smart Brain Contributors
+#
+# This file is part of Smart Brain.
+# See the LICENSE file at the project root for full terms.
+
+from utils.digest import format_digest_line, select_for_prompt, summarize_text
+
+
+def test_summarize_text_prefers_sentence_boundary():
+    """Prueba que el resumen corte al final de una frase y colapse espacios."""
+    text = "Primera frase del memo.   Segunda   frase con detalles. " + "relleno " * 50
+    assert summarize_text(text, max_chars=60) == "Primera frase del memo. Segunda frase con detalles."
+    assert summarize_text("corto") == "corto"
+    assert summarize_text(None) == ""
+
+
+def test_summarize_text_cuts_at_word_without_sentences():
+    """Prueba el corte por palabra cuando no hay final de frase."""
+    summary = summarize_text("palabra " * 40, max_chars=30)
+    assert summary.endswith("…") and len(summary) <= 31
+    assert "palab…" not in summary
+
+
+def test_format_digest_line():
+    """Prueba el formato de la línea con id, tipo, título y resumen."""
+    line = format_digest_line({"item_id": "abc", "source_type": "url", "title": "Memo", "summary": "Teletrabajo"})
+    assert line == "<id>abc</id> [url] Memo — Teletrabajo"
+    assert format_digest_line({"item_id": "abc", "source_type": None, "title": None}) == "<id>abc</id> [unknown] Untitled"
+
+
+def test_select_for_prompt_respects_budget_and_order():
+    """Prueba que se respete el presupuesto sin perder el orden de prioridad."""
+    digests = [
+        {"item_id": "nuevo", "title": "a" * 40},
+        {"item_id": "largo", "title": "b" * 400},
+        {"item_id": "viejo", "title": "c" * 40},
+    ]
+    selected = select_for_prompt(digests, budget_tokens=40)
+    assert [d["item_id"] for d in selected] == ["nuevo", "viejo"]
+    assert select_for_prompt(digests, budget_tokens=0) == []
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# Copyright (C) 2026 Smart Brain Contributors
+#
+# This file is part of Smart Brain.
+# See the LICENSE file at the project root for full terms.
+
+import asyncio
+from collections import Counter
+
+import pytest
+
+from utils.embedding_lanes import BACKFILL, INTERACTIVE, SYNC, LaneScheduler, parse_weights
+
+
+def test_pick_is_weighted_and_smooth():
+    """Prueba el reparto 8/2/1 de los turnos y que un carril no acapare turnos seguidos."""
+    scheduler = LaneScheduler({INTERACTIVE: 8, SYNC: 2, BACKFILL: 1})
+    picks = [scheduler.pick([INTERACTIVE, SYNC, BACKFILL]) for _ in range(110)]
+    assert Counter(picks) == {INTERACTIVE: 80, SYNC: 20, BACKFILL: 10}
+    assert BACKFILL in picks[:11] and SYNC in picks[:11]
+
+
+def test_waiting_upload_overtakes_backlog():
+    """Prueba que una subida en espera pase por delante de los turnos del backlog."""
+    async def worker(scheduler, lane, name, order):
+        async with scheduler.turn(lane):
+            order.append(name)
+            await asyncio.sleep(0.001)
+
+    async def main():
+        scheduler = LaneScheduler({INTERACTIVE: 8, SYNC: 2, BACKFILL: 1})
+        order = []
+        backlog = [asyncio.create_task(worker(scheduler, SYNC, f"sync-{i}", order)) for i in range(5)]
+        await asyncio.sleep(0)  # sync-0 tiene el turno, el resto espera
+        upload = asyncio.create_task(worker(scheduler, INTERACTIVE, "upload", order))
+        await asyncio.gather(upload, *backlog)
+        return order, scheduler
+
+    order, scheduler = asyncio.run(main())
+    assert order[:2] == ["sync-0", "upload"]
+    assert scheduler.stats()["active"] == 0
+
+
+def test_cancelled_waiter_does_not_block_the_queue():
+    """Prueba que cancelar una espera no deje el turno ocupado."""
+    async def main():
+        scheduler = LaneScheduler()
+        async with scheduler.turn(SYNC):
+            waiter = asyncio.create_task(scheduler.turn(BACKFILL).__aenter__())
+            await asyncio.sleep(0)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+        async with scheduler.turn(INTERACTIVE):
+            return scheduler.stats()
+
+    stats = asyncio.run(main())
+    assert stats["active"] == 1 and stats["waiting"] == {INTERACTIVE: 0, SYNC: 0, BACKFILL: 0}
+
+
+def test_parse_weights():
+    """Prueba la lectura de EMBED_LANE_WEIGHTS con valores por defecto y errores."""
+    assert parse_weights("") == {INTERACTIVE: 8, SYNC: 2, BACKFILL: 1}
+    assert parse_weights("sync=4, backfill=2") == {INTERACTIVE: 8, SYNC: 4, BACKFILL: 2}
+    with pytest.raises(ValueError):
+        parse_weights("bulk=3")
+    with pytest.raises(ValueError):
+        parse_weights("sync=0")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# Copyright (C) 2026 Smart Brain Contributors
+#
+# This file is part of Smart Brain.
+# See the LICENSE file at the project root for full terms.
+
+from utils.embedding_lanes import BACKFILL, INTERACTIVE, SYNC
+from utils.embedding_progress import DEAD_LETTER, DONE, RETRY, EmbeddingProgress
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_counters_follow_item_states():
+    """Prueba que los contadores sigan a los items entre pendiente, en proceso, hecho y fallido."""
+    progress = EmbeddingProgress(clock=FakeClock())
+    progress.seed({INTERACTIVE: 2, SYNC: 10}, done=5, failed=1)
+    progress.enqueued(INTERACTIVE)
+
+    progress.started(INTERACTIVE)
+    assert progress.snapshot()["processing"] == 1
+    progress.finished(INTERACTIVE, DONE, chunks=4)
+    progress.started(SYNC)
+    progress.finished(SYNC, RETRY)
+    progress.started(SYNC)
+    progress.finished(SYNC, DEAD_LETTER)
+    progress.requeued(SYNC, from_failed=True)
+
+    snapshot = progress.snapshot()
+    assert snapshot["pending_by_lane"] == {INTERACTIVE: 2, SYNC: 10, BACKFILL: 0}
+    assert (snapshot["pending"], snapshot["processing"], snapshot["done"], snapshot["failed"]) == (12, 0, 6, 1)
+
+
+def test_seed_discounts_items_in_progress():
+    """Prueba que al resincronizar no se cuenten como pendientes los items que se están procesando."""
+    progress = EmbeddingProgress(clock=FakeClock())
+    progress.seed({SYNC: 3}, done=0, failed=0)
+    progress.started(SYNC)
+    progress.seed({SYNC: 3}, done=0, failed=0)  # la BD aún lo ve pendiente
+    assert progress.snapshot()["pending_by_lane"][SYNC] == 2
+
+
+def test_throughput_eta_and_heartbeat():
+    """Prueba el ritmo en la ventana, la ETA del backlog y la edad del latido del worker."""
+    clock = FakeClock()
+    progress = EmbeddingProgress(window_seconds=60, clock=clock)
+    progress.seed({SYNC: 100}, done=0, failed=0)
+    progress.beat(SYNC)
+    for _ in range(20):
+        clock.now += 1
+        progress.started(SYNC)
+        progress.finished(SYNC, DONE, chunks=5)
+    clock.now += 3
+
+    snapshot = progress.snapshot()
+    assert snapshot["items_per_second"] == round(20 / 22, 3)
+    assert snapshot["chunks_per_second"] == round(100 / 22, 3)
+    assert snapshot["eta_seconds"] == round(80 / (20 / 22), 1)
+    assert snapshot["heartbeat_age_seconds"] == {SYNC: 23.0}
+
+    clock.now += 120  # fuera de la ventana: sin ritmo no hay ETA
+    assert progress.snapshot()["eta_seconds"] is None
+
+
+def test_backfill_counts_for_throughput_not_done():
+    """Prueba que el re-embedding cuente en el ritmo pero no en los items hechos del modelo activo."""
+    progress = EmbeddingProgress(clock=FakeClock())
+    progress.enqueued(BACKFILL, 2)
+    progress.started(BACKFILL)
+    progress.finished(BACKFILL, DONE, chunks=3)
+    progress.enqueued(BACKFILL, -5)
+    snapshot = progress.snapshot()
+    assert snapshot["done"] == 0 and snapshot["pending_by_lane"][BACKFILL] == 0
+    assert snapshot["chunks_per_second"] > 0
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# Copyright (C) 2026 Smart Brain Contributors
+#
+# This file is part of Smart Brain.
+# See the LICENSE file at the project root for full terms.
+
+import asyncio
+
+from utils.events import DROPPED, KEEPALIVE, RESYNC, EventBus, format_sse
+
+
+def _drain(subscriber) -> list:
+    events = []
+    while not subscriber.queue.empty():
+        events.append(subscriber.queue.get_nowait())
+    return events
+
+
+def test_format_sse():
+    """Prueba el formato de un evento SSE: id, tipo y datos JSON en una línea."""
+    assert format_sse("item.created", {"id": "a", "title": "ñ"}, "k2-7") == (
+        'id: k2-7\nevent: item.created\ndata: {"id":"a","title":"ñ"}\n\n'.encode("utf-8")
+    )
+    assert format_sse("dropped", {}) == b"event: dropped\ndata: {}\n\n"
+
+
+def test_publish_fans_out_by_type():
+    """Prueba que cada cliente reciba solo los tipos (o prefijos) que pidió."""
+    async def run():
+        bus = EventBus(max_queue=10)
+        everything = bus.subscribe()
+        items = bus.subscribe(["item"])
+        plan = bus.subscribe(["plan.regenerated"])
+        bus.publish("item.created", id="a")
+        bus.publish("plan.regenerated", tasks=3)
+        return [[e.type for e in _drain(s)] for s in (everything, items, plan)]
+
+    assert asyncio.run(run()) == [
+        ["item.created", "plan.regenerated"],
+        ["item.created"],
+        ["plan.regenerated"],
+    ]
+
+
+def test_slow_consumer_is_dropped_without_blocking():
+    """Prueba que un cliente con la cola llena se desconecte sin frenar a los demás."""
+    async def run():
+        bus = EventBus(max_queue=2)
+        slow = bus.subscribe()
+        fast = bus.subscribe()
+        for i in range(3):
+            bus.publish("item.created", id=str(i))
+            if i < 2:
+                _drain(fast)
+        return bus, slow, fast
+
+    bus, slow, fast = asyncio.run(run())
+    assert slow.dropped and [e.type for e in _drain(slow)] == [DROPPED]
+    assert not fast.dropped and [e.data["id"] for e in _drain(fast)] == ["2"]
+    assert len(bus) == 1
+
+
+def test_reconnect_replays_missed_events():
+    """Prueba que al reconectar con Last-Event-ID se repitan los eventos perdidos."""
+    async def run():
+        bus = EventBus(max_queue=10, history=3, epoch="a")
+        for i in range(5):
+            bus.publish("item.created", id=str(i))
+        replay = [e.id for e in _drain(bus.subscribe(last_event_id="a-3"))]
+        too_old = [e.type for e in _drain(bus.subscribe(last_event_id="a-1"))]
+        ahead = [e.type for e in _drain(bus.subscribe(last_event_id="a-99"))]
+        garbage = [e.type for e in _drain(bus.subscribe(last_event_id="5"))]
+        up_to_date = _drain(bus.subscribe(last_event_id="a-5"))
+        return replay, too_old, ahead, garbage, up_to_date
+
+    assert asyncio.run(run()) == (["a-4", "a-5"], [RESYNC], [RESYNC], [RESYNC], [])
+
+
+def test_reconnect_after_restart_resyncs():
+    """Prueba que un id de antes de reiniciar pida resync aunque el proceso nuevo ya vaya más allá."""
+    async def run():
+        old = EventBus(epoch="a")
+        for i in range(5):
+            old.publish("item.created", id=str(i))
+        bus = EventBus(epoch="b")
+        for i in range(10):
+            bus.publish("item.created", id=str(i))
+        events = _drain(bus.subscribe(last_event_id=old.last_id))
+        return [(e.type, e.id, e.data) for e in events]
+
+    assert asyncio.run(run()) == [(RESYNC, "b-10", {"last_id": "b-10"})]
+
+
+def test_stream_sends_keepalive_and_ends_after_drop():
+    """Prueba que el stream mande keepalive si no hay eventos y termine tras ``dropped``."""
+    async def run():
+        bus = EventBus(max_queue=1)
+        subscriber = bus.subscribe()
+        chunks = []
+        async for chunk in subscriber.stream(keepalive_seconds=0.01):
+            chunks.append(chunk)
+            if chunk == KEEPALIVE:
+                bus.publish("item.created", id="a")
+                bus.publish("item.created", id="b")
+        return chunks
+
+    chunks = asyncio.run(run())
+    assert chunks[0] == KEEPALIVE
+    assert chunks[-1].startswith(b"event: dropped\n")
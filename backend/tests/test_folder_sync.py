@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# Copyright (C) 2026 Smart Brain Contributors
+#
+# This file is part of Smart Brain.
+# See the LICENSE file at the project root for full terms.
+
+import hashlib
+import os
+
+from utils.folder_sync import diff_manifest, folders_overlap, manifest_like_pattern, process_file, scan_folder
+
+
+def test_scan_folder_filters_and_recurses(tmp_path):
+    """Prueba que el escaneo solo devuelva extensiones soportadas, sin ocultos, con mtime y tamaño."""
+    (tmp_path / "notas.txt").write_text("hola", encoding="utf-8")
+    (tmp_path / "foto.png").write_bytes(b"\x89PNG")
+    (tmp_path / ".oculto.txt").write_text("x", encoding="utf-8")
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "datos.CSV").write_text("a,b", encoding="utf-8")
+
+    found = scan_folder(str(tmp_path))
+    assert set(found) == {str(tmp_path / "notas.txt"), str(tmp_path / "sub" / "datos.CSV")}
+    stat = os.stat(tmp_path / "notas.txt")
+    assert found[str(tmp_path / "notas.txt")] == (stat.st_mtime_ns, 4)
+
+    assert set(scan_folder(str(tmp_path), recursive=False)) == {str(tmp_path / "notas.txt")}
+
+
+def test_diff_manifest():
+    """Prueba la clasificación en nuevos, modificados, sin cambios y borrados."""
+    scanned = {"/d/a.txt": (10, 1), "/d/b.txt": (20, 2), "/d/c.txt": (30, 3)}
+    manifest = {
+        "/d/a.txt": {"mtime_ns": 10, "size": 1},
+        "/d/b.txt": {"mtime_ns": 21, "size": 2},
+        "/d/gone.txt": {"mtime_ns": 1, "size": 1},
+    }
+    diff = diff_manifest(scanned, manifest)
+    assert diff.new == ["/d/c.txt"]
+    assert diff.changed == ["/d/b.txt"]
+    assert diff.unchanged == ["/d/a.txt"]
+    assert diff.deleted == ["/d/gone.txt"]
+
+
+def test_process_file_extracts_and_skips_known_hash(tmp_path):
+    """Prueba que se extraiga el texto y que con el mismo hash no se vuelva a extraer."""
+    path = tmp_path / "memo.txt"
+    path.write_text("Reunión   el lunes", encoding="utf-8")
+    digest = hashlib.sha256(path.read_bytes()).hexdigest()
+
+    result = process_file(str(path))
+    assert result["content_hash"] == digest
+    assert "Reunión" in result["text"] and result["error"] is None
+
+    again = process_file(str(path), known_hash=digest)
+    assert again["content_hash"] == digest and again["text"] is None
+
+
+def test_process_file_reports_errors(tmp_path):
+    """Prueba que un archivo ilegible devuelva el error en vez de lanzar."""
+    result = process_file(str(tmp_path / "missing.txt"))
+    assert result["error"].startswith("FileNotFoundError")
+    assert result["content_hash"] is None and result["text"] is None
+
+
+def test_manifest_like_pattern_escapes_wildcards():
+    """Prueba que el patrón LIKE cubra la carpeta por prefijo sin tratar % y _ como comodines."""
+    assert manifest_like_pattern("/docs/2024_q1") == "/docs/2024\\_q1/%"
+    assert manifest_like_pattern("/a%b/") == "/a\\%b/%"
+    assert manifest_like_pattern("/") == "/%"
+
+
+def test_folders_overlap():
+    """Prueba que se detecten carpetas anidadas sin confundir prefijos de nombre."""
+    assert folders_overlap("/a", "/a/b")
+    assert folders_overlap("/a/b", "/a")
+    assert folders_overlap("/a", "/a/")
+    assert not folders_overlap("/a", "/ab")
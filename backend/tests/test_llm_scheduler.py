@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# Copyright (C) 2026 Smart Brain Contributors
+#
+# This file is part of Smart Brain.
+# See the LICENSE file at the project root for full terms.
+
+import asyncio
+import threading
+
+import pytest
+
+from utils.llm_scheduler import BACKGROUND, INTERACTIVE, LLMOverloaded, LLMScheduler
+
+
+async def _run(scheduler, priority, name, order, seconds=0.01):
+    async with scheduler.slot(priority):
+        order.append(name)
+        await asyncio.sleep(seconds)
+
+
+def test_interactive_goes_before_waiting_background():
+    """Prueba que los chats en espera adelanten a las tareas de segundo plano."""
+    async def main():
+        scheduler = LLMScheduler(concurrency=1)
+        order = []
+        first = asyncio.create_task(_run(scheduler, BACKGROUND, "plan-1", order))
+        await asyncio.sleep(0)  # plan-1 ocupa el único hueco
+        queued = [
+            asyncio.create_task(_run(scheduler, BACKGROUND, "plan-2", order)),
+            asyncio.create_task(_run(scheduler, INTERACTIVE, "chat-1", order)),
+            asyncio.create_task(_run(scheduler, INTERACTIVE, "chat-2", order)),
+        ]
+        await asyncio.gather(first, *queued)
+        return order, scheduler
+
+    order, scheduler = asyncio.run(main())
+    assert order == ["plan-1", "chat-1", "chat-2", "plan-2"]
+    assert scheduler.active == 0
+
+
+def test_concurrency_and_background_limit():
+    """Prueba el límite de huecos y el máximo de generaciones de segundo plano."""
+    peak = {"total": 0, BACKGROUND: 0}
+
+    async def main():
+        scheduler = LLMScheduler(concurrency=2, background_concurrency=1)
+
+        async def run(priority):
+            async with scheduler.slot(priority):
+                peak["total"] = max(peak["total"], scheduler.active)
+                peak[BACKGROUND] = max(peak[BACKGROUND], scheduler.stats()["active"][BACKGROUND])
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(run(BACKGROUND) for _ in range(3)), *(run(INTERACTIVE) for _ in range(3)))
+
+    asyncio.run(main())
+    assert peak == {"total": 2, BACKGROUND: 1}
+
+
+def test_deadline_sheds_when_queue_is_too_long():
+    """Prueba que se rechace un chat cuya espera estimada supere el plazo."""
+    async def main():
+        scheduler = LLMScheduler(concurrency=1)
+        order = []
+        # Sin historial no hay estimación: nunca se rechaza
+        await _run(scheduler, INTERACTIVE, "warm-up", order, seconds=0.05)
+        running = asyncio.create_task(_run(scheduler, INTERACTIVE, "busy", order, seconds=0.05))
+        await asyncio.sleep(0)
+        with pytest.raises(LLMOverloaded) as excinfo:
+            async with scheduler.slot(INTERACTIVE, deadline=0.06):
+                pass
+        # Con un plazo holgado sí espera su turno
+        async with scheduler.slot(INTERACTIVE, deadline=10):
+            order.append("patient")
+        await running
+        return order, excinfo.value
+
+    order, error = asyncio.run(main())
+    assert order == ["warm-up", "busy", "patient"]
+    assert error.estimated_seconds > error.deadline_seconds
+
+
+def test_cancelled_waiter_frees_its_place():
+    """Prueba que cancelar una petición en cola no bloquee a las siguientes."""
+    async def main():
+        scheduler = LLMScheduler(concurrency=1)
+        order = []
+        running = asyncio.create_task(_run(scheduler, INTERACTIVE, "first", order))
+        await asyncio.sleep(0)
+        waiting = asyncio.create_task(_run(scheduler, INTERACTIVE, "cancelled", order))
+        later = asyncio.create_task(_run(scheduler, INTERACTIVE, "later", order))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        await asyncio.gather(running, later, return_exceptions=True)
+        return order, scheduler.stats()
+
+    order, stats = asyncio.run(main())
+    assert order == ["first", "later"]
+    assert stats["waiting"] == {INTERACTIVE: 0, BACKGROUND: 0}
+    assert stats["active"] == {INTERACTIVE: 0, BACKGROUND: 0}
+
+
+def test_run_in_thread_keeps_slot_until_thread_returns():
+    """Prueba que cancelar al que espera no libere el hueco mientras el hilo sigue generando."""
+    async def main():
+        scheduler = LLMScheduler(concurrency=1)
+        finish = threading.Event()
+        caller = asyncio.create_task(scheduler.run_in_thread(lambda: finish.wait(5) and "done"))
+        await asyncio.sleep(0.01)
+        caller.cancel()
+        await asyncio.sleep(0.01)
+        held_after_cancel = scheduler.active
+        next_job = asyncio.create_task(scheduler.run_in_thread(lambda: "next"))
+        await asyncio.sleep(0.01)
+        started_early = next_job.done()
+        finish.set()
+        return held_after_cancel, started_early, await next_job, scheduler.active
+
+    assert asyncio.run(main()) == (1, False, "next", 0)
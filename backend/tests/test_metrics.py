@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# Copyright (C) 2026 Smart Brain Contributors
+#
+# This file is part of Smart Brain.
+# See the LICENSE file at the project root for full terms.
+
+import pytest
+
+from utils.metrics import MetricsRegistry
+
+
+def test_counter_render():
+    """Prueba que un contador con etiquetas se exporte en formato Prometheus."""
+    registry = MetricsRegistry()
+    hits = registry.counter("cache_total", "Cache lookups.", ("cache", "result"))
+    hits.inc(cache="daily_plan", result="hit")
+    hits.inc(2, cache="daily_plan", result="hit")
+
+    output = registry.render()
+    assert "# TYPE cache_total counter" in output
+    assert 'cache_total{cache="daily_plan",result="hit"} 3' in output
+
+
+def test_counter_rejects_negative_and_wrong_labels():
+    """Prueba que los contadores no decrezcan y validen sus etiquetas."""
+    registry = MetricsRegistry()
+    counter = registry.counter("events_total", "Events.", ("kind",))
+    with pytest.raises(ValueError):
+        counter.inc(-1, kind="a")
+    with pytest.raises(ValueError):
+        counter.inc(other="a")
+
+
+def test_histogram_buckets_are_cumulative():
+    """Prueba que los buckets del histograma sean acumulativos e incluyan +Inf, sum y count."""
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5)
+
+    output = registry.render()
+    assert 'latency_seconds_bucket{le="0.1"} 1' in output
+    assert 'latency_seconds_bucket{le="1"} 2' in output
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in output
+    assert "latency_seconds_sum 5.55" in output
+    assert "latency_seconds_count 3" in output
+
+
+def test_histogram_time_context_manager():
+    """Prueba que ``time()`` registre una observación por bloque."""
+    registry = MetricsRegistry()
+    stage = registry.histogram("stage_seconds", "Stage time.", ("stage",))
+    with stage.time(stage="clean"):
+        pass
+    assert stage.count(stage="clean") == 1
+
+
+def test_gauge_and_duplicate_registration():
+    """Prueba el gauge y que no se puedan registrar dos métricas con el mismo nombre."""
+    registry = MetricsRegistry()
+    depth = registry.gauge("queue_depth", "Queue depth.")
+    depth.set(10)
+    depth.dec(3)
+    assert depth.value() == 7
+    assert "queue_depth 7" in registry.render()
+    with pytest.raises(ValueError):
+        registry.gauge("queue_depth", "Again.")
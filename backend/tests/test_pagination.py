@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# Copyright (C) 2026 Smart Brain Contributors
+#
+# This file is part of Smart Brain.
+# See the LICENSE file at the project root for full terms.
+
+from datetime import datetime, timezone
+from uuid import UUID
+
+import pytest
+
+from utils.pagination import decode_cursor, encode_cursor, parse_fields
+
+ALLOWED = ("id", "title", "status", "summary", "created_at")
+
+
+def test_cursor_round_trip():
+    """Prueba que el cursor conserve fecha (con microsegundos y zona) e id."""
+    created_at = datetime(2026, 10, 19, 8, 30, 15, 123456, tzinfo=timezone.utc)
+    item_id = UUID("11111111-2222-3333-4444-555555555555")
+    cursor = encode_cursor(created_at, item_id)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, item_id)
+
+
+@pytest.mark.parametrize("cursor", ["", "no-es-base64!", "eyJjIjoxfQ", encode_cursor(datetime.now(), UUID(int=1))[:-4]])
+def test_invalid_cursor_raises_value_error(cursor):
+    """Prueba que un cursor manipulado se rechace con ValueError."""
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_parse_fields():
+    """Prueba la proyección: campos por defecto, obligatorios y desconocidos."""
+    assert parse_fields(None, ALLOWED, ("id", "title")) == ["id", "title"]
+    assert parse_fields("summary, title", ALLOWED, (), required=("id", "created_at")) == [
+        "id", "title", "summary", "created_at",
+    ]
+    with pytest.raises(ValueError):
+        parse_fields("title,password", ALLOWED, ())
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# Copyright (C) 2026 Smart Brain Contributors
+#
+# This file is part of Smart Brain.
+# See the LICENSE file at the project root for full terms.
+
+import json
+
+from utils.plan_output import MAX_TASKS, parse_plan_output
+
+ITEMS = ["11111111-1111-1111-1111-111111111111", "22222222-2222-2222-2222-222222222222"]
+
+
+def test_structured_plan_is_parsed():
+    """Prueba que la salida JSON se convierta en tareas con su item_id."""
+    answer = json.dumps({"tasks": [
+        {"text": "📄 Read memo_teletrabajo_2024.txt about remote work", "item_id": ITEMS[0]},
+        {"text": "📊 Analyze Q4 2024 support incidents", "item_id": ITEMS[1]},
+        {"text": "🗂️ Compare both documents and list open questions", "item_id": None},
+    ]})
+    result = parse_plan_output(answer, ITEMS)
+
+    assert result.complete and result.rejected == 0
+    assert [t["item_id"] for t in result.tasks] == [ITEMS[0], ITEMS[1], None]
+
+
+def test_partial_accept_drops_only_invalid_tasks():
+    """Prueba que las tareas inválidas se descarten una a una sin rechazar el plan."""
+    answer = json.dumps({"tasks": [
+        {"text": "📄 Read memo_teletrabajo_2024.txt about remote work", "item_id": "inventado"},
+        {"text": "corta", "item_id": None},
+        {"text": "Review stored resources", "item_id": None},
+        {"text": 42, "item_id": None},
+        {"text": "📄 read MEMO_teletrabajo_2024.txt about remote work", "item_id": None},
+    ]})
+    result = parse_plan_output(answer, ITEMS)
+
+    assert len(result.tasks) == 1 and not result.complete
+    assert result.tasks[0]["item_id"] is None  # id desconocido: se conserva la tarea sin vínculo
+    assert result.rejected == 4
+
+
+def test_legacy_id_tags_code_fences_and_limit():
+    """Prueba que se acepten <id> en el texto, bloques ```json y se limite el número de tareas."""
+    tasks = [{"text": f"📄 Review document number {n} <id>{ITEMS[0]}</id>", "item_id": None} for n in range(10)]
+    result = parse_plan_output("```json\n" + json.dumps({"tasks": tasks}) + "\n```", ITEMS)
+
+    assert len(result.tasks) == MAX_TASKS
+    assert result.tasks[0] == {"text": "📄 Review document number 0", "item_id": ITEMS[0]}
+
+
+def test_invalid_json_reports_error():
+    """Prueba que una respuesta que no es JSON no produzca tareas."""
+    result = parse_plan_output("📄 Read the memo\n📊 Analyze incidents", ITEMS)
+    assert result.tasks == [] and result.error
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# Copyright (C) 2026 Smart Brain Contributors
+#
+# This file is part of Smart Brain.
+# See the LICENSE file at the project root for full terms.
+
+import time
+
+from utils.profiling import SamplingProfiler, stop_tracemalloc, tracemalloc_report
+
+
+def _busy_loop(seconds: float) -> int:
+    total = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        total += 1
+    return total
+
+
+def test_sampling_profiler_folded_output():
+    """Prueba que el perfil se exporte en formato folded con la función caliente."""
+    profiler = SamplingProfiler(interval=0.001)
+    profiler.start()
+    _busy_loop(0.1)
+    profiler.stop()
+
+    folded = profiler.to_folded()
+    assert folded
+    for line in folded.splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) > 0
+        assert ";" in stack
+    assert "_busy_loop" in folded
+    assert "sampling-profiler" not in folded
+
+
+def test_tracemalloc_report_starts_then_reports_growth():
+    """Prueba que la primera llamada inicie tracemalloc y la segunda devuelva estadísticas."""
+    try:
+        first = tracemalloc_report()
+        assert first["status"] == "started"
+
+        retained = [bytearray(1024) for _ in range(1000)]
+        tracemalloc_report()
+        retained += [bytearray(1024) for _ in range(1000)]
+        report = tracemalloc_report(limit=5)
+
+        assert report["status"] == "tracing"
+        assert report["traced_current_bytes"] > 0
+        assert len(report["top"]) <= 5
+        assert report["growth"]
+    finally:
+        stop_tracemalloc()
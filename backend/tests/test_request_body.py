@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# Copyright (C) 2026 Smart Brain Contributors
+#
+# This file is part of Smart Brain.
+# See the LICENSE file at the project root for full terms.
+
+import asyncio
+import gzip
+import zlib
+
+import pytest
+
+from utils.request_body import BodyTooLarge, decompress_body, read_body
+
+PAGE = ('{"url": "https://example.com", "html": "' + "<p>Texto renderizado</p>" * 200 + '"}').encode("utf-8")
+
+
+def test_decompress_body_encodings():
+    """Prueba gzip, deflate (zlib) y cuerpo sin comprimir."""
+    assert decompress_body(gzip.compress(PAGE), "gzip", 1 << 20) == PAGE
+    assert decompress_body(zlib.compress(PAGE), "Deflate", 1 << 20) == PAGE
+    assert decompress_body(PAGE, None, 1 << 20) == PAGE
+
+
+def test_decompress_body_limits_expanded_size():
+    """Prueba que un cuerpo pequeño que se expande por encima del límite se rechace."""
+    bomb = gzip.compress(b"\0" * 5_000_000)
+    assert len(bomb) < 10_000
+    with pytest.raises(BodyTooLarge):
+        decompress_body(bomb, "gzip", 1_000_000)
+    with pytest.raises(BodyTooLarge):
+        decompress_body(PAGE, "identity", 10)
+
+
+def test_decompress_body_rejects_invalid_input():
+    """Prueba los errores por codificación desconocida, datos corruptos o truncados."""
+    with pytest.raises(ValueError, match="Unsupported"):
+        decompress_body(PAGE, "br", 1 << 20)
+    with pytest.raises(ValueError, match="Corrupt"):
+        decompress_body(b"no es gzip", "gzip", 1 << 20)
+    with pytest.raises(ValueError, match="Truncated"):
+        decompress_body(gzip.compress(PAGE)[:-20], "gzip", 1 << 20)
+
+
+def test_read_body_stops_at_limit():
+    """Prueba que el cuerpo leído por trozos se corte al superar el límite, sin Content-Length."""
+    async def chunks(n):
+        for _ in range(n):
+            yield b"x" * 10
+
+    assert asyncio.run(read_body(chunks(3), max_bytes=30)) == b"x" * 30
+    with pytest.raises(BodyTooLarge):
+        asyncio.run(read_body(chunks(4), max_bytes=30))
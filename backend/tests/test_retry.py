@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# Copyright (C) 2026 Smart Brain Contributors
+#
+# This file is part of Smart Brain.
+# See the LICENSE file at the project root for full terms.
+
+from utils.retry import backoff_seconds, next_retry
+
+
+def test_backoff_doubles_up_to_cap():
+    """Prueba que la espera se duplique en cada intento sin pasar del máximo."""
+    assert [backoff_seconds(n, base=30, cap=3600) for n in range(1, 6)] == [30, 60, 120, 240, 480]
+    assert backoff_seconds(20, base=30, cap=3600) == 3600
+
+
+def test_backoff_jitter_stays_in_range():
+    """Prueba que el jitter reparta la espera dentro del margen indicado."""
+    delays = {backoff_seconds(3, base=10, cap=1000, jitter=0.2) for _ in range(50)}
+    assert all(32 <= d <= 48 for d in delays)
+    assert len(delays) > 1
+
+
+def test_next_retry_dead_letters_after_max_attempts():
+    """Prueba que al agotar los intentos se devuelva None (dead-letter)."""
+    assert next_retry(1, max_attempts=3, base=5, cap=60) == 5
+    assert next_retry(2, max_attempts=3, base=5, cap=60) == 10
+    assert next_retry(3, max_attempts=3, base=5, cap=60) is None
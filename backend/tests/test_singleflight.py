@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# Copyright (C) 2026 Smart Brain Contributors
+#
+# This file is part of Smart Brain.
+# See the LICENSE file at the project root for full terms.
+
+import asyncio
+
+import pytest
+
+from utils.singleflight import SingleFlight, normalize_message
+
+
+def test_normalize_message():
+    """Prueba que mayúsculas, espacios y formas Unicode no cambien la clave."""
+    assert normalize_message("  ¿Qué decidió   la reunión\nAurora? ") == "¿qué decidió la reunión aurora?"
+    assert normalize_message("ﬁnanzas") == normalize_message("FINANZAS")
+
+
+def test_concurrent_calls_share_one_computation():
+    """Prueba que llamadas simultáneas con la misma clave ejecuten la función una sola vez."""
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"text": "respuesta"}
+
+    async def main():
+        flight = SingleFlight()
+        results = await asyncio.gather(*(flight.do("k", compute) for _ in range(5)))
+        assert flight.in_flight() == 0
+        # La clave se libera al terminar: una llamada posterior vuelve a calcular
+        await flight.do("k", compute)
+        return results
+
+    results = asyncio.run(main())
+    assert calls == 2
+    assert [shared for _, shared in results] == [False, True, True, True, True]
+    assert all(result == {"text": "respuesta"} for result, _ in results)
+
+
+def test_errors_reach_every_caller():
+    """Prueba que un error se propague a todos los que esperaban."""
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("ollama caído")
+
+    async def main():
+        flight = SingleFlight()
+        return await asyncio.gather(flight.do("k", fail), flight.do("k", fail), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_stream_fan_out_with_late_subscriber():
+    """Prueba que todos los suscriptores, también los tardíos, reciban el stream completo."""
+    started = 0
+
+    async def tokens():
+        nonlocal started
+        started += 1
+        for token in ["Hola", " ", "mundo"]:
+            await asyncio.sleep(0.01)
+            yield token
+
+    async def collect(stream):
+        return [token async for token in stream]
+
+    async def main():
+        flight = SingleFlight()
+        first, shared_first = flight.stream("k", tokens)
+        first_task = asyncio.create_task(collect(first))
+        await asyncio.sleep(0.015)  # ya se ha emitido el primer token
+        second, shared_second = flight.stream("k", tokens)
+        results = await asyncio.gather(first_task, collect(second))
+        return results, (shared_first, shared_second)
+
+    results, shared = asyncio.run(main())
+    assert started == 1
+    assert shared == (False, True)
+    assert results == [["Hola", " ", "mundo"], ["Hola", " ", "mundo"]]
+
+
+def test_stream_error_is_raised_to_subscribers():
+    """Prueba que un fallo del stream llegue a los suscriptores tras los tokens ya emitidos."""
+    async def broken():
+        yield "parcial"
+        raise RuntimeError("corte")
+
+    async def main():
+        flight = SingleFlight()
+        stream, _ = flight.stream("k", broken)
+        received = []
+        with pytest.raises(RuntimeError):
+            async for token in stream:
+                received.append(token)
+        return received
+
+    assert asyncio.run(main()) == ["parcial"]
+
+
+def test_stream_stops_when_last_subscriber_leaves():
+    """Prueba que el stream deje de generarse cuando se va el último suscriptor."""
+    produced = []
+
+    async def tokens():
+        try:
+            for i in range(5):
+                await asyncio.sleep(0.01)
+                produced.append(i)
+                yield i
+        finally:
+            produced.append("closed")
+
+    async def main():
+        flight = SingleFlight()
+        stream, _ = flight.stream("k", tokens)
+        first = await stream.__anext__()
+        await stream.aclose()
+        await asyncio.sleep(0.05)
+        return first, flight.in_flight()
+
+    assert asyncio.run(main()) == (0, 0)
+    assert produced[-1] == "closed" and len(produced) < 6
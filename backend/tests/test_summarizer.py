@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# Copyright (C) 2026 Smart Brain Contributors
+#
+# This file is part of Smart Brain.
+# See the LICENSE file at the project root for full terms.
+
+import json
+
+from utils.summarizer import build_summary_prompt, content_hash, parse_summaries
+
+
+def test_prompt_numbers_documents_and_truncates():
+    """Prueba que el prompt numere los documentos y recorte textos largos."""
+    items = [
+        {"title": "Memo", "extracted_text": "Teletrabajo dos días por semana."},
+        {"title": None, "extracted_text": "x" * 5000},
+    ]
+    prompt = build_summary_prompt(items, input_chars=100)
+    assert "### Document 1: Memo\nTeletrabajo" in prompt
+    assert "### Document 2: Untitled\n" + "x" * 100 + "\n" in prompt
+    assert "x" * 101 not in prompt
+
+
+def test_parse_summaries_ignores_invalid_entries():
+    """Prueba que solo se acepten resúmenes con número válido y texto no vacío."""
+    answer = json.dumps({"summaries": [
+        {"n": 2, "summary": "  Segundo   documento. "},
+        {"n": 7, "summary": "fuera de rango"},
+        {"n": 1, "summary": ""},
+        {"n": "1", "summary": "número como texto"},
+        {"n": 2, "summary": "duplicado"},
+    ]})
+    assert parse_summaries(answer, count=3) == {1: "Segundo documento."}
+    assert parse_summaries("no es json", count=3) == {}
+
+
+def test_content_hash_is_stable():
+    """Prueba que el hash dependa solo del texto."""
+    assert content_hash("texto") == content_hash("texto") != content_hash("texto ")
+    assert content_hash(None) == content_hash("")
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# SPDX-License-Identifier: AGPL-3.0-or-later
+# Copyright (C) 2026 Smart Brain Contributors
+#
+# This file is part of Smart Brain.
+# See the LICENSE file at the project root for full terms.
+
+import asyncio
+import json
+import struct
+from datetime import datetime, timezone
+from uuid import UUID
+
+import pytest
+
+from utils.transfer import (
+    ITEM_FIELDS,
+    b64_to_pgvector,
+    b64_to_vector,
+    export_ndjson,
+    import_ndjson,
+    iter_lines,
+    pgvector_to_b64,
+    vector_to_b64,
+)
+
+ITEM_ID = UUID("11111111-2222-3333-4444-555555555555")
+CREATED = datetime(2026, 10, 19, 9, 0, tzinfo=timezone.utc)
+
+
+def _pgvector(values):
+    return struct.pack(f">HH{len(values)}f", len(values), 0, *values)
+
+
+class MemoryTransfer:
+    """Doble en memoria de TransferDAO: mismo contrato, sin base de datos."""
+
+    def __init__(self, items=(), chunks=None):
+        self.items = list(items)
+        self.chunks = chunks or {}
+        self.batches = []
+
+    async def export_items(self, model_id, batch_size=200):
+        for start in range(0, len(self.items), batch_size):
+            batch = self.items[start:start + batch_size]
+            yield [(item, self.chunks.get(item["id"], []) if model_id else []) for item in batch]
+
+    async def import_batch(self, items, chunks, model_id):
+        self.batches.append((items[:], chunks[:], model_id))
+        return len(items), len(chunks)
+
+
+async def _collect(stream):
+    return [line async for line in stream]
+
+
+def test_vector_codecs_round_trip():
+    """Prueba la conversión float32 little-endian <-> formato binario de pgvector."""
+    values = [0.5, -1.25, 3.0]
+    encoded = vector_to_b64(values)
+
+    assert b64_to_pgvector(encoded) == _pgvector(values)
+    assert pgvector_to_b64(_pgvector(values)) == encoded
+    assert b64_to_vector(encoded) == values
+    with pytest.raises(ValueError):
+        b64_to_pgvector(encoded, dimension=384)
+
+
+def test_export_then_import_reuses_vectors():
+    """Prueba que una exportación se reimporte con sus vectores si el modelo coincide."""
+    item = {field: None for field in ITEM_FIELDS}
+    item.update(id=ITEM_ID, source_type="url", title="Memo", tags=["rrhh"], status="ready", created_at=CREATED)
+    chunks = {ITEM_ID: [{"chunk_index": 0, "chunk_text": "hola", "embedding": _pgvector([0.1] * 384)}]}
+    source = MemoryTransfer([item], chunks)
+
+    lines = asyncio.run(_collect(export_ndjson(source, "all-MiniLM-L6-v2@1", 384)))
+    assert json.loads(lines[0])["type"] == "header"
+    record = json.loads(lines[1])
+    assert record["id"] == str(ITEM_ID) and record["created_at"] == CREATED.isoformat()
+
+    async def replay():
+        for line in lines:
+            yield line
+
+    target = MemoryTransfer()
+    stats = asyncio.run(import_ndjson(target, replay()))
+    assert stats["vectors_reused"] and stats["items_imported"] == 1 and stats["chunks_imported"] == 1
+    (items, copied_chunks, model_id), = target.batches
+    assert model_id == "all-MiniLM-L6-v2@1"
+    assert items[0][ITEM_FIELDS.index("created_at")] == CREATED
+    assert copied_chunks[0][:3] == (ITEM_ID, 0, "hola")
+    assert copied_chunks[0][3] == _pgvector([0.1] * 384)
+
+
+def test_import_drops_vectors_of_unknown_model():
+    """Prueba que los vectores de un modelo desconocido se descarten (se re-embeben después)."""
+    async def lines():
+        yield json.dumps({"type": "header", "version": 1, "model_id": "otro@1", "dimension": 3})
+        yield json.dumps({"type": "item", "id": str(ITEM_ID), "source_type": "url",
+                          "chunks": [{"index": 0, "text": "x", "vector": vector_to_b64([1, 2, 3])}]})
+
+    target = MemoryTransfer()
+    stats = asyncio.run(import_ndjson(target, lines()))
+    assert not stats["vectors_reused"] and stats["chunks_imported"] == 0
+    assert target.batches[0][1:] == ([], None)
+
+
+def test_import_rejects_missing_header():
+    """Prueba que un fichero sin cabecera se rechace."""
+    async def lines():
+        yield json.dumps({"type": "item", "id": str(ITEM_ID)})
+
+    with pytest.raises(ValueError):
+        asyncio.run(import_ndjson(MemoryTransfer(), lines()))
+
+
+def test_iter_lines_splits_across_chunks():
+    """Prueba que las líneas partidas entre trozos del stream se reconstruyan."""
+    async def chunks():
+        for part in (b'{"a":', b'1}\n\n{"b"', b":2}"):
+            yield part
+
+    assert asyncio.run(_collect(iter_lines(chunks()))) == ['{"a":1}', '{"b":2}']
+
+
+def test_iter_lines_long_line_in_many_chunks():
+    """Prueba que una línea muy larga repartida en muchos trozos llegue entera."""
+    line = b"x" * 100_000
+
+    async def chunks():
+        data = line + b"\nfin"
+        for i in range(0, len(data), 7):
+            yield data[i:i + 7]
+
+    assert asyncio.run(_collect(iter_lines(chunks()))) == [line.decode(), "fin"]
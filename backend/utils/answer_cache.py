@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Semantic cache of chat answers, keyed by query embedding and retrieved chunks.
+
+Copyright (C) 2026 Smart Brain Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+
+def _normalize(vector: list[float]) -> list[float]:
+    norm = math.sqrt(sum(x * x for x in vector))
+    return [x / norm for x in vector] if norm else list(vector)
+
+
+def _dot(a: list[float], b: list[float]) -> float:
+    return sum(x * y for x, y in zip(a, b))
+
+
+@dataclass
+class _Entry:
+    vector: list[float]  # normalizado
+    answer: str
+    item_ids: frozenset[str]
+    created_at: float = field(default_factory=time.monotonic)
+
+
+class SemanticAnswerCache:
+    """
+    LRU cache of LLM answers for near-duplicate questions.
+
+    An entry is reused only when the new question retrieved exactly the same
+    chunks (same model) *and* its embedding has cosine similarity >=
+    ``threshold`` with the cached question: same evidence, same question in
+    other words. Entries are dropped when one of their source items is
+    deleted or re-embedded (``invalidate_items``), after ``ttl_seconds``, or
+    when the cache exceeds ``max_entries``.
+    """
+
+    def __init__(self, max_entries: int = 500, threshold: float = 0.95, ttl_seconds: float = 24 * 3600):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        # (model_id, chunk ids) -> entradas; orden LRU por bucket
+        self._buckets: OrderedDict[tuple, list[_Entry]] = OrderedDict()
+        self._by_item: dict[str, set[tuple]] = {}
+        self._size = 0
+
+    @staticmethod
+    def _key(model_id: str, chunk_ids: Iterable) -> tuple:
+        return (model_id, frozenset(str(chunk_id) for chunk_id in chunk_ids))
+
+    def __len__(self) -> int:
+        return self._size
+
+    def get(self, query_vector: list[float], chunk_ids: Iterable, model_id: str) -> Optional[str]:
+        """Cached answer for a similar question with the same retrieved chunks, or None."""
+        key = self._key(model_id, chunk_ids)
+        vector = _normalize(query_vector)
+        now = time.monotonic()
+        with self._lock:
+            entries = self._buckets.get(key)
+            if not entries:
+                return None
+            best, best_score = None, self.threshold
+            for entry in entries:
+                if now - entry.created_at > self.ttl_seconds:
+                    continue
+                score = _dot(vector, entry.vector)
+                if score >= best_score:
+                    best, best_score = entry, score
+            if best is None:
+                return None
+            self._buckets.move_to_end(key)
+            return best.answer
+
+    def put(
+        self,
+        query_vector: list[float],
+        chunk_ids: Iterable,
+        item_ids: Iterable,
+        answer: str,
+        model_id: str,
+    ) -> None:
+        """Store an answer; replaces an entry for an equivalent question."""
+        key = self._key(model_id, chunk_ids)
+        vector = _normalize(query_vector)
+        entry = _Entry(vector=vector, answer=answer, item_ids=frozenset(str(i) for i in item_ids))
+        with self._lock:
+            entries = self._buckets.setdefault(key, [])
+            kept = [e for e in entries if _dot(vector, e.vector) < self.threshold]
+            self._size -= len(entries) - len(kept)
+            kept.append(entry)
+            self._buckets[key] = kept
+            self._buckets.move_to_end(key)
+            self._size += 1
+            for item_id in entry.item_ids:
+                self._by_item.setdefault(item_id, set()).add(key)
+            while self._size > self.max_entries and self._buckets:
+                self._drop_bucket(next(iter(self._buckets)))
+
+    def _drop_bucket(self, key: tuple) -> None:
+        entries = self._buckets.pop(key, [])
+        self._size -= len(entries)
+        for entry in entries:
+            for item_id in entry.item_ids:
+                keys = self._by_item.get(item_id)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._by_item[item_id]
+
+    def invalidate_items(self, item_ids: Iterable) -> int:
+        """Drop every entry built from any of these items; returns how many were dropped."""
+        dropped = 0
+        with self._lock:
+            for item_id in item_ids:
+                for key in list(self._by_item.get(str(item_id), ())):
+                    dropped += len(self._buckets.get(key, ()))
+                    self._drop_bucket(key)
+        return dropped
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+            self._by_item.clear()
+            self._size = 0
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""RAG context assembly: neighbour chunks, span merging, de-duplication and token budget.
+
+Copyright (C) 2026 Smart Brain Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import math
+import re
+from dataclasses import dataclass
+
+# Aproximación sin tokenizer: ~4 caracteres por token en inglés/español
+CHARS_PER_TOKEN = 4
+# Solapes más cortos solo cuentan si son palabras enteras
+MIN_OVERLAP_CHARS = 20
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+@dataclass
+class ContextPassage:
+    """A contiguous run of chunks of one item, ready to go into the prompt."""
+    item_id: str
+    title: str
+    first_chunk: int
+    last_chunk: int
+    text: str
+    score: float
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def neighbour_keys(hits: list[dict], window: int) -> list[tuple[str, int]]:
+    """(item_id, chunk_index) of every hit and its ``window`` neighbours on each side."""
+    keys = {}
+    for hit in hits:
+        item_id = str(hit["item_id"])
+        for index in range(max(0, hit["chunk_index"] - window), hit["chunk_index"] + window + 1):
+            keys[(item_id, index)] = None
+    return list(keys)
+
+
+def join_overlapping(
+    left: str, right: str, max_overlap: int = 200, min_overlap: int = MIN_OVERLAP_CHARS
+) -> str:
+    """
+    Concatenate two consecutive chunks, dropping the text they share.
+
+    ``chunk_text`` overlaps consecutive chunks by ~50 characters but moves
+    the cut to sentence or word boundaries and strips whitespace, so the
+    shared part is found by matching the longest suffix of ``left`` that is
+    a prefix of ``right``. A match shorter than ``min_overlap`` is only
+    taken when it is made of whole words, so ``"2024"`` + ``"4 new"`` is not
+    merged into ``"2024 new"``.
+    """
+    limit = min(len(left), len(right), max_overlap)
+    for size in range(limit, 0, -1):
+        if not left.endswith(right[:size]):
+            continue
+        whole_words = (
+            (size == len(left) or not left[-size - 1].isalnum() or not left[-size].isalnum())
+            and (size == len(right) or not right[size].isalnum() or not right[size - 1].isalnum())
+        )
+        if size >= min_overlap or whole_words:
+            return left + right[size:]
+    return f"{left} {right}"
+
+
+def _shingles(text: str, size: int = 3) -> set[tuple[str, ...]]:
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < size:
+        return {tuple(words)} if words else set()
+    return {tuple(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def similarity(a: str, b: str) -> float:
+    """Jaccard similarity of word 3-gram shingles."""
+    shingles_a, shingles_b = _shingles(a), _shingles(b)
+    if not shingles_a or not shingles_b:
+        return 0.0
+    return len(shingles_a & shingles_b) / len(shingles_a | shingles_b)
+
+
+def _truncate(text: str, max_chars: int) -> str:
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind(" ", 0, max_chars)
+    return text[:cut if cut > max_chars // 2 else max_chars].rstrip() + " …"
+
+
+def build_passages(
+    hits: list[dict],
+    chunks: dict[tuple[str, int], str],
+    titles: dict[str, str],
+    window: int = 1,
+) -> list[ContextPassage]:
+    """
+    Merge hits and their fetched neighbours into per-item spans.
+
+    Chunks of the same item whose indexes touch or overlap end up in one
+    passage; its score is the best similarity among the hits it contains.
+    Missing neighbours (before the first chunk, after the last) are skipped.
+    """
+    best: dict[tuple[str, int], float] = {}
+    for hit in hits:
+        key = (str(hit["item_id"]), hit["chunk_index"])
+        best[key] = max(best.get(key, 0.0), hit["similarity"])
+
+    ranges: dict[str, list[list]] = {}
+    for (item_id, index), score in sorted(best.items()):
+        start, end = max(0, index - window), index + window
+        spans = ranges.setdefault(item_id, [])
+        if spans and start <= spans[-1][1] + 1:
+            spans[-1][1] = max(spans[-1][1], end)
+            spans[-1][2] = max(spans[-1][2], score)
+        else:
+            spans.append([start, end, score])
+
+    passages = []
+    for item_id, spans in ranges.items():
+        for start, end, score in spans:
+            indexes = [i for i in range(start, end + 1) if (item_id, i) in chunks]
+            if not indexes:
+                continue
+            text = chunks[(item_id, indexes[0])]
+            for previous, index in zip(indexes, indexes[1:]):
+                chunk = chunks[(item_id, index)]
+                text = join_overlapping(text, chunk) if index == previous + 1 else f"{text}\n…\n{chunk}"
+            passages.append(ContextPassage(
+                item_id=item_id,
+                title=titles.get(item_id, ""),
+                first_chunk=indexes[0],
+                last_chunk=indexes[-1],
+                text=text,
+                score=score,
+            ))
+    return passages
+
+
+def pack_passages(
+    passages: list[ContextPassage],
+    budget_tokens: int,
+    dedupe_threshold: float = 0.85,
+    min_tokens: int = 50,
+) -> list[ContextPassage]:
+    """
+    Choose passages by score until the token budget is spent.
+
+    Passages nearly identical to one already chosen (same document imported
+    twice, boilerplate) are dropped. The first passage that does not fit is
+    truncated if at least ``min_tokens`` remain; packing stops there.
+    """
+    packed: list[ContextPassage] = []
+    remaining = budget_tokens
+    for passage in sorted(passages, key=lambda p: p.score, reverse=True):
+        if any(similarity(passage.text, kept.text) >= dedupe_threshold for kept in packed):
+            continue
+        tokens = estimate_tokens(passage.text)
+        if tokens > remaining:
+            if remaining >= min_tokens:
+                passage.text = _truncate(passage.text, remaining * CHARS_PER_TOKEN)
+                packed.append(passage)
+            break
+        packed.append(passage)
+        remaining -= tokens
+    return packed
+
+
+def format_context(passages: list[ContextPassage]) -> str:
+    """Prompt text, one numbered source per passage."""
+    return "\n---\n".join(
+        f"[Source {i}: {passage.title}]\n{passage.text}\n" for i, passage in enumerate(passages, 1)
+    )
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Per-item digests for the daily plan prompt.
+
+Copyright (C) 2026 Smart Brain Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import re
+from typing import Optional
+
+from utils.context import estimate_tokens
+
+DIGEST_SUMMARY_CHARS = 200
+
+_SPACES_RE = re.compile(r"\s+")
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s")
+
+
+def summarize_text(text: Optional[str], max_chars: int = DIGEST_SUMMARY_CHARS) -> str:
+    """Leading sentences of ``text`` up to ``max_chars`` (cut at a word boundary if needed)."""
+    text = _SPACES_RE.sub(" ", text or "").strip()
+    if len(text) <= max_chars:
+        return text
+    head = text[:max_chars + 1]
+    # Preferir el final de una frase; si no hay ninguna razonable, cortar por palabra
+    ends = [m.start() for m in _SENTENCE_END_RE.finditer(head)]
+    if ends and ends[-1] >= max_chars // 2:
+        return head[:ends[-1]].strip()
+    cut = head.rfind(" ", 0, max_chars)
+    return (head[:cut] if cut > 0 else head[:max_chars]).rstrip(" ,;:") + "…"
+
+
+def format_digest_line(digest: dict) -> str:
+    """Prompt line of one item: id tag, source type, title and summary."""
+    line = f"<id>{digest['item_id']}</id> [{digest.get('source_type') or 'unknown'}] {digest.get('title') or 'Untitled'}"
+    if digest.get("summary"):
+        line += f" — {digest['summary']}"
+    return line
+
+
+def select_for_prompt(digests: list[dict], budget_tokens: int) -> list[dict]:
+    """
+    Digests that fit in ``budget_tokens``, in the given priority order.
+
+    Callers pass only items never sent to the planner, in priority order;
+    an item that does not fit is skipped so shorter ones after it can still
+    be included (and waits for a later plan).
+    """
+    selected, used = [], 0
+    for digest in digests:
+        cost = estimate_tokens(format_digest_line(digest)) + 1  # salto de línea
+        if used + cost > budget_tokens:
+            continue
+        selected.append(digest)
+        used += cost
+    return selected
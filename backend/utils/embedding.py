@@ -10,9 +10,13 @@
 # (at your option) any later version.
 # See the LICENSE file at the project root for full terms.
 
+import logging
+
 import ollama
 from typing import List
 
+logger = logging.getLogger(__name__)
+
 def split_text(text: str, chunk_size: int = 500, overlap: int = 50) -> List[str]:
     """
     Divida un texto en trozos (chunks) de tamaño fijo con solapamiento.
@@ -48,5 +52,5 @@ def get_embedding(text: str, model: str = "all-minilm") -> List[float]:
         response = ollama.embeddings(model=model, prompt=text)
         return response["embedding"]
     except Exception as e:
-        print(f"Error calculando embedding: {e}")
+        logger.exception("Error calculando embedding")
         return []
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Weighted-fair turns between the embedding lanes (interactive uploads, folder sync, re-embed backfill).
+
+Copyright (C) 2026 Smart Brain Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from utils.metrics import EMBEDDING_LANE_TURNS, EMBEDDING_LANE_WAIT_SECONDS
+
+INTERACTIVE = "interactive"
+SYNC = "sync"
+BACKFILL = "backfill"
+LANES = (INTERACTIVE, SYNC, BACKFILL)
+# Lanes whose pending items live in items.embed_lane (the backfill walks the corpus itself)
+ITEM_LANES = (INTERACTIVE, SYNC)
+DEFAULT_WEIGHTS = {INTERACTIVE: 8, SYNC: 2, BACKFILL: 1}
+
+
+def parse_weights(text: str) -> dict[str, int]:
+    """
+    ``"interactive=8,sync=2,backfill=1"`` -> weights; missing lanes keep their default.
+
+    Raises:
+        ValueError: unknown lane or a weight that is not a positive integer
+    """
+    weights = dict(DEFAULT_WEIGHTS)
+    for part in filter(None, (p.strip() for p in (text or "").split(","))):
+        lane, _, value = part.partition("=")
+        lane = lane.strip()
+        if lane not in weights:
+            raise ValueError(f"Unknown embedding lane '{lane}', use one of {LANES}")
+        if not value.strip().isdigit() or int(value) < 1:
+            raise ValueError(f"Weight of lane '{lane}' must be a positive integer")
+        weights[lane] = int(value)
+    return weights
+
+
+class LaneScheduler:
+    """
+    Hands out embedding turns (one item's chunking + encoding) to the lanes.
+
+    The encoder is CPU bound, so only ``concurrency`` turns run at once.
+    When several lanes are waiting the next turn goes by smooth weighted
+    round-robin: with weights 8/2/1 a backfill gets 1 turn in 11 while
+    uploads are waiting, and every turn when it is alone. No lane starves
+    and an upload waits at most for the turns already running.
+    """
+
+    def __init__(self, weights: dict[str, int] = DEFAULT_WEIGHTS, concurrency: int = 1):
+        self.weights = dict(weights)
+        self.concurrency = max(1, concurrency)
+        self._waiters: dict[str, deque[asyncio.Future]] = {lane: deque() for lane in self.weights}
+        self._credit = {lane: 0 for lane in self.weights}
+        self._active = 0
+
+    def stats(self) -> dict:
+        return {
+            "weights": dict(self.weights),
+            "active": self._active,
+            "waiting": {lane: len(queue) for lane, queue in self._waiters.items()},
+        }
+
+    def pick(self, lanes: list[str]) -> str:
+        """Next lane among ``lanes`` (those with someone waiting), smooth weighted round-robin."""
+        total = 0
+        for lane in lanes:
+            self._credit[lane] += self.weights[lane]
+            total += self.weights[lane]
+        chosen = max(lanes, key=lambda lane: self._credit[lane])
+        self._credit[chosen] -= total
+        return chosen
+
+    def _dispatch(self) -> None:
+        while self._active < self.concurrency:
+            for queue in self._waiters.values():
+                while queue and queue[0].cancelled():
+                    queue.popleft()
+            waiting = [lane for lane, queue in self._waiters.items() if queue]
+            if not waiting:
+                return
+            self._waiters[self.pick(waiting)].popleft().set_result(None)
+            self._active += 1
+
+    @asynccontextmanager
+    async def turn(self, lane: str) -> AsyncIterator[None]:
+        """Hold one embedding turn for ``lane`` for the duration of the block."""
+        if lane not in self._waiters:
+            raise ValueError(f"Unknown embedding lane '{lane}', use one of {tuple(self._waiters)}")
+        enqueued = time.perf_counter()
+        future = asyncio.get_running_loop().create_future()
+        self._waiters[lane].append(future)
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Se concedió el turno justo al cancelar: devolverlo
+                self._active -= 1
+                self._dispatch()
+            raise
+        EMBEDDING_LANE_WAIT_SECONDS.observe(time.perf_counter() - enqueued, lane=lane)
+        EMBEDDING_LANE_TURNS.inc(lane=lane)
+        try:
+            yield
+        finally:
+            self._active -= 1
+            self._dispatch()
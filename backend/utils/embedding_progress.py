@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""In-memory embedding progress counters, so status polls never touch the database.
+
+Copyright (C) 2026 Smart Brain Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import time
+from collections import deque
+from typing import Callable, Optional
+
+from utils.embedding_lanes import BACKFILL, LANES
+from utils.metrics import EMBEDDING_LANE_DEPTH, EMBEDDING_QUEUE_DEPTH
+
+DONE = "done"
+RETRY = "retry"
+DEAD_LETTER = "dead_letter"
+
+
+class EmbeddingProgress:
+    """
+    Pending/processing/done/failed counters of the embedding pipeline.
+
+    Seeded from one counting query when the worker starts (``seed``) and
+    then moved by the pipeline itself as items are queued, picked up and
+    finished, so reading them is free. Drift (e.g. a pending item deleted)
+    is corrected by re-seeding now and then. Throughput is measured over a
+    sliding ``window_seconds`` and gives the ETA of the current backlog.
+    """
+
+    def __init__(self, window_seconds: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        self.window_seconds = window_seconds
+        self._clock = clock
+        self.pending = {lane: 0 for lane in LANES}
+        self.processing = {lane: 0 for lane in LANES}
+        self.done = 0
+        self.failed = 0
+        self.seeded_at: Optional[float] = None
+        self._finished: deque[tuple[float, int]] = deque()  # (when, chunks)
+        self._heartbeats: dict[str, float] = {}
+
+    def seed(self, pending: dict[str, int], done: int, failed: int) -> None:
+        """Reset the counters from the database; items being processed right now are not pending."""
+        for lane in LANES:
+            if lane in pending:
+                self.pending[lane] = max(0, pending[lane] - self.processing[lane])
+        self.done = done
+        self.failed = failed
+        self.seeded_at = self._clock()
+        self._publish()
+
+    def enqueued(self, lane: str, count: int = 1) -> None:
+        """``count`` more items waiting in ``lane`` (negative when they leave without being processed)."""
+        self.pending[lane] = max(0, self.pending[lane] + count)
+        self._publish()
+
+    def started(self, lane: str) -> None:
+        self.pending[lane] = max(0, self.pending[lane] - 1)
+        self.processing[lane] += 1
+        self._publish()
+
+    def finished(self, lane: str, outcome: str = DONE, chunks: int = 0) -> None:
+        """
+        An item left processing: embedded, back in the queue for a retry, or dead-lettered.
+
+        Backfill items count towards throughput but not ``done``, which is
+        about the active model.
+        """
+        self.processing[lane] = max(0, self.processing[lane] - 1)
+        if outcome == DONE:
+            if lane != BACKFILL:
+                self.done += 1
+            self._finished.append((self._clock(), chunks))
+        elif outcome == RETRY:
+            self.pending[lane] += 1
+        else:
+            self.failed += 1
+        self._publish()
+
+    def requeued(self, lane: str, from_failed: bool) -> None:
+        if from_failed:
+            self.failed = max(0, self.failed - 1)
+            self.pending[lane] += 1
+            self._publish()
+
+    def beat(self, worker: str) -> None:
+        """Record that ``worker`` is alive (called on every loop of the worker)."""
+        self._heartbeats[worker] = self._clock()
+
+    def _rates(self) -> tuple[float, float]:
+        now = self._clock()
+        while self._finished and self._finished[0][0] < now - self.window_seconds:
+            self._finished.popleft()
+        if not self._finished:
+            return 0.0, 0.0
+        # Ventana completa, o desde el primer item si el worker acaba de empezar
+        span = min(self.window_seconds, max(now - self._finished[0][0], 1.0))
+        return len(self._finished) / span, sum(chunks for _, chunks in self._finished) / span
+
+    def _publish(self) -> None:
+        for lane in LANES:
+            EMBEDDING_LANE_DEPTH.set(self.pending[lane], lane=lane)
+        EMBEDDING_QUEUE_DEPTH.set(sum(self.pending.values()))
+
+    def snapshot(self) -> dict:
+        items_per_second, chunks_per_second = self._rates()
+        pending = sum(self.pending.values())
+        processing = sum(self.processing.values())
+        now = self._clock()
+        return {
+            "pending": pending,
+            "processing": processing,
+            "done": self.done,
+            "failed": self.failed,
+            "pending_by_lane": dict(self.pending),
+            "items_per_second": round(items_per_second, 3),
+            "chunks_per_second": round(chunks_per_second, 3),
+            "eta_seconds": round((pending + processing) / items_per_second, 1) if items_per_second else None,
+            "heartbeat_age_seconds": {worker: round(now - at, 1) for worker, at in self._heartbeats.items()},
+            "seeded_seconds_ago": round(now - self.seeded_at, 1) if self.seeded_at is not None else None,
+        }
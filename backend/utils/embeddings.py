@@ -18,34 +18,247 @@ You should have received a copy of the GNU Affero General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 import asyncio
-from typing import Optional
-from functools import lru_cache
+import importlib.util
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
 
-try:
+from utils.metrics import PIPELINE_STAGE_SECONDS
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+logger = logging.getLogger(__name__)
+
+# sentence-transformers arrastra torch: solo se comprueba que existe, se importa al primer uso
+SENTENCE_TRANSFORMERS_AVAILABLE = importlib.util.find_spec("sentence_transformers") is not None
+
+
+@dataclass(frozen=True)
+class EmbeddingModelSpec:
+    """A configured embedding model; ``id`` is what gets stored in embeddings.model_id."""
+    id: str
+    model_name: str
+    dimension: int
+
+
+_MODEL_ID_RE = re.compile(r"^[A-Za-z0-9._:@-]{1,100}$")
+
+# Registro de modelos configurados. Cambiar de modelo = añadir una entrada con id nuevo
+# y lanzar el re-embedding en segundo plano; nunca reutilizar un id con otro modelo.
+EMBEDDING_MODELS: dict[str, EmbeddingModelSpec] = {}
+
+
+def register_embedding_model(spec: EmbeddingModelSpec) -> EmbeddingModelSpec:
+    """Add a model to the registry (ids end up inlined in SQL, so they are validated)."""
+    if not _MODEL_ID_RE.match(spec.id):
+        raise ValueError(f"Invalid embedding model id '{spec.id}'")
+    if spec.dimension <= 0:
+        raise ValueError(f"Invalid embedding dimension {spec.dimension}")
+    EMBEDDING_MODELS[spec.id] = spec
+    return spec
+
+
+DEFAULT_EMBEDDING_MODEL = register_embedding_model(
+    EmbeddingModelSpec("all-MiniLM-L6-v2@1", "sentence-transformers/all-MiniLM-L6-v2", 384)
+)
+register_embedding_model(EmbeddingModelSpec(
+    "paraphrase-multilingual-MiniLM-L12-v2@1",
+    "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2",
+    384,
+))
+
+# Compatibilidad: modelo y dimensión por defecto
+EMBEDDING_MODEL_NAME = DEFAULT_EMBEDDING_MODEL.model_name
+EMBEDDING_DIMENSION = DEFAULT_EMBEDDING_MODEL.dimension
+
+EMBEDDING_BACKENDS = ("torch", "onnx")
+# Configuraciones de cuantización dinámica int8 soportadas por sentence-transformers/optimum
+ONNX_QUANTIZATION_CONFIGS = ("avx2", "avx512", "avx512_vnni", "arm64")
+
+_MODEL_LOCK = threading.Lock()
+# model_id -> {"model", "load_seconds"}
+_MODEL_STATE: dict[str, dict] = {}
+# Modelo usado para consultas y para los items nuevos; lo fija la BD al arrancar
+_ACTIVE_MODEL = {"id": os.getenv("EMBEDDING_MODEL_ID", DEFAULT_EMBEDDING_MODEL.id)}
+
+
+def get_model_spec(model_id: str | None = None) -> EmbeddingModelSpec:
+    """Spec for ``model_id`` (or the active model). Raises KeyError if not registered."""
+    return EMBEDDING_MODELS[model_id or _ACTIVE_MODEL["id"]]
+
+
+def get_active_model_id() -> str:
+    return _ACTIVE_MODEL["id"]
+
+
+def set_active_model_id(model_id: str) -> None:
+    if model_id not in EMBEDDING_MODELS:
+        raise KeyError(f"Embedding model '{model_id}' is not registered")
+    if model_id != _ACTIVE_MODEL["id"]:
+        logger.info("Active embedding model changed", extra={"model_id": model_id})
+    _ACTIVE_MODEL["id"] = model_id
+
+
+def _onnx_quantized_file_name(quantization_config: str) -> str:
+    # Mismo nombre que genera export_dynamic_quantized_onnx_model (y que publica el Hub)
+    dtype = "quint8" if quantization_config == "avx2" else "qint8"
+    return f"onnx/model_{dtype}_{quantization_config}.onnx"
+
+
+def _load_onnx_model(model_name: str, quantize: str | None, threads: int) -> "SentenceTransformer":
     from sentence_transformers import SentenceTransformer
-    SENTENCE_TRANSFORMERS_AVAILABLE = True
-except ImportError:
-    SENTENCE_TRANSFORMERS_AVAILABLE = False
-    SentenceTransformer = None
 
+    model_kwargs: dict = {"provider": "CPUExecutionProvider"}
+    if threads:
+        import onnxruntime
+
+        session_options = onnxruntime.SessionOptions()
+        session_options.intra_op_num_threads = threads
+        session_options.inter_op_num_threads = 1
+        model_kwargs["session_options"] = session_options
 
-@lru_cache(maxsize=1)
-def get_embedding_model() -> Optional[SentenceTransformer]:
-    """Get or initialize the embedding model (cached)."""
+    if not quantize:
+        return SentenceTransformer(model_name, backend="onnx", model_kwargs=model_kwargs)
+
+    if quantize not in ONNX_QUANTIZATION_CONFIGS:
+        raise ValueError(f"Unknown ONNX quantization config '{quantize}', use one of {ONNX_QUANTIZATION_CONFIGS}")
+
+    file_name = _onnx_quantized_file_name(quantize)
+    try:
+        # all-MiniLM-L6-v2 publica variantes ya cuantizadas en el Hub
+        return SentenceTransformer(
+            model_name, backend="onnx", model_kwargs={**model_kwargs, "file_name": file_name}
+        )
+    except Exception:
+        logger.info("Quantized ONNX file not on the Hub, exporting it locally", extra={"file": file_name})
+
+    from sentence_transformers import export_dynamic_quantized_onnx_model
+
+    cache_dir = Path(os.getenv("EMBEDDING_ONNX_CACHE", Path.home() / ".cache" / "smartbrain" / "onnx"))
+    local_dir = cache_dir / model_name.replace("/", "__")
+    if not (local_dir / file_name).exists():
+        base_model = SentenceTransformer(model_name, backend="onnx")
+        base_model.save(str(local_dir))
+        export_dynamic_quantized_onnx_model(base_model, quantize, str(local_dir))
+    return SentenceTransformer(str(local_dir), backend="onnx", model_kwargs={**model_kwargs, "file_name": file_name})
+
+
+def load_embedding_model(
+    backend: str = "torch",
+    quantize: str | None = None,
+    threads: int = 0,
+    spec: EmbeddingModelSpec = DEFAULT_EMBEDDING_MODEL,
+) -> "SentenceTransformer":
+    """
+    Build an embedding model for a given backend.
+
+    Args:
+        backend: ``torch`` (PyTorch) or ``onnx`` (ONNX Runtime, CPU)
+        quantize: ONNX only, dynamic int8 quantization config (``avx2``, ``avx512``,
+            ``avx512_vnni``, ``arm64``); ``None`` keeps float32 weights
+        threads: intra-op threads, 0 keeps the library default
+        spec: registry entry of the model to load
+
+    Raises:
+        ValueError: unknown backend, or the model does not produce ``spec.dimension`` vectors
+    """
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{backend}', use one of {EMBEDDING_BACKENDS}")
+
+    if backend == "onnx":
+        model = _load_onnx_model(spec.model_name, quantize, threads)
+    else:
+        from sentence_transformers import SentenceTransformer
+
+        if threads:
+            import torch
+
+            torch.set_num_threads(threads)
+        model = SentenceTransformer(spec.model_name)
+
+    dimension = model.get_sentence_embedding_dimension()
+    if dimension != spec.dimension:
+        raise ValueError(f"Model {spec.id} produces {dimension}d vectors, registry says {spec.dimension}")
+    return model
+
+
+def _load_embedding_model(spec: EmbeddingModelSpec) -> Optional["SentenceTransformer"]:
     if not SENTENCE_TRANSFORMERS_AVAILABLE:
-        print("⚠️  sentence-transformers not available, embeddings disabled")
+        logger.warning("sentence-transformers not available, embeddings disabled")
         return None
     
+    backend = os.getenv("EMBEDDING_BACKEND", "torch").lower()
+    quantize = os.getenv("EMBEDDING_ONNX_QUANTIZE") or None
+    threads = int(os.getenv("EMBEDDING_THREADS", "0"))
     try:
-        print("📦 Loading embedding model: all-MiniLM-L6-v2 (384 dimensions)...")
-        model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
-        print("✓ Embedding model loaded")
+        logger.info(
+            "Loading embedding model",
+            extra={"model_id": spec.id, "dimension": spec.dimension, "backend": backend,
+                   "quantize": quantize, "threads": threads},
+        )
+        model = load_embedding_model(backend, quantize, threads, spec)
+        logger.info("Embedding model loaded", extra={"model_id": spec.id})
         return model
     except Exception as e:
-        print(f"❌ Failed to load embedding model: {e}")
+        logger.exception("Failed to load embedding model", extra={"model_id": spec.id})
         return None
 
 
+def get_embedding_model(model_id: str | None = None) -> Optional["SentenceTransformer"]:
+    """
+    Get or initialize the embedding model for ``model_id`` (default: active model).
+    Blocks while loading; from async code use ``get_embedding_model_async``.
+    """
+    spec = get_model_spec(model_id)
+    if spec.id not in _MODEL_STATE:
+        with _MODEL_LOCK:
+            if spec.id not in _MODEL_STATE:
+                started = time.perf_counter()
+                model = _load_embedding_model(spec)
+                _MODEL_STATE[spec.id] = {
+                    "model": model,
+                    "load_seconds": round(time.perf_counter() - started, 3),
+                }
+    return _MODEL_STATE[spec.id]["model"]
+
+
+async def get_embedding_model_async(model_id: str | None = None) -> Optional["SentenceTransformer"]:
+    """Return the embedding model, loading it in a worker thread on first use."""
+    state = _MODEL_STATE.get(model_id or _ACTIVE_MODEL["id"])
+    if state is not None:
+        return state["model"]
+    return await asyncio.to_thread(get_embedding_model, model_id)
+
+
+def is_embedding_model_loaded(model_id: str | None = None) -> bool:
+    """Whether the model has been loaded, without triggering the load."""
+    state = _MODEL_STATE.get(model_id or _ACTIVE_MODEL["id"])
+    return state is not None and state["model"] is not None
+
+
+def embedding_model_load_seconds(model_id: str | None = None) -> Optional[float]:
+    state = _MODEL_STATE.get(model_id or _ACTIVE_MODEL["id"])
+    return state["load_seconds"] if state else None
+
+
+def unload_embedding_model(model_id: str) -> None:
+    """Drop a cached model (e.g. the previous one after a cutover) to free memory."""
+    with _MODEL_LOCK:
+        _MODEL_STATE.pop(model_id, None)
+
+
+def set_embedding_model(model, model_id: str | None = None) -> None:
+    """Install an already-built model (benchmarks and tests)."""
+    with _MODEL_LOCK:
+        _MODEL_STATE[model_id or _ACTIVE_MODEL["id"]] = {"model": model, "load_seconds": 0.0}
+
+
 def chunk_text(text: str, max_chunk_size: int = 500, overlap: int = 50) -> list[str]:
     """
     Split text into overlapping chunks.
@@ -93,7 +306,7 @@ def chunk_text(text: str, max_chunk_size: int = 500, overlap: int = 50) -> list[
     return chunks
 
 
-async def generate_embeddings_for_text(text: str, model: Optional[SentenceTransformer] = None) -> list[tuple[str, list[float]]]:
+async def generate_embeddings_for_text(text: str, model: Optional["SentenceTransformer"] = None) -> list[tuple[str, list[float]]]:
     """
     Generate embeddings for text by chunking and encoding.
     
@@ -108,23 +321,25 @@ async def generate_embeddings_for_text(text: str, model: Optional[SentenceTransf
         return []
     
     if model is None:
-        model = get_embedding_model()
+        model = await get_embedding_model_async()
     
     if model is None:
-        print("⚠️  Embedding model not available")
+        logger.warning("Embedding model not available")
         return []
     
     # Chunk the text
-    chunks = chunk_text(text, max_chunk_size=500, overlap=50)
+    with PIPELINE_STAGE_SECONDS.time(stage="chunk"):
+        chunks = chunk_text(text, max_chunk_size=500, overlap=50)
     
     if not chunks:
         return []
     
-    print(f"📝 Generating embeddings for {len(chunks)} chunks...")
+    logger.debug("Generating embeddings for %d chunks", len(chunks))
     
     # Generate embeddings in a thread pool (sentence-transformers is CPU-bound)
     loop = asyncio.get_event_loop()
-    embeddings = await loop.run_in_executor(None, model.encode, chunks)
+    with PIPELINE_STAGE_SECONDS.time(stage="encode"):
+        embeddings = await loop.run_in_executor(None, model.encode, chunks)
     
     # Convert numpy arrays to lists
     result = []
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""In-process event bus behind the server-sent events stream (/api/v1/events).
+
+Copyright (C) 2026 Smart Brain Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+The pipeline publishes state changes (item created, embeddings stored,
+plan regenerated...) and every connected client gets them through its own
+bounded queue. ``publish`` never waits: a client whose queue is full is a
+slow consumer and is cut off with a final ``dropped`` event instead of
+holding events (or the publisher) back. The last events are kept, so a
+client that reconnects with ``Last-Event-ID`` replays what it missed, or
+gets a ``resync`` event when that is no longer possible.
+"""
+import asyncio
+import json
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import AsyncIterator, Iterable, Optional
+
+from utils.metrics import EVENT_STREAM_CLIENTS, EVENT_STREAM_DROPPED, EVENTS_PUBLISHED
+
+DROPPED = "dropped"
+RESYNC = "resync"
+
+KEEPALIVE = b": keepalive\n\n"
+
+
+def format_sse(event_type: str, data: dict, event_id: Optional[str] = None) -> bytes:
+    """One server-sent event; ``data`` is compact JSON on a single line."""
+    lines = [] if event_id is None else [f"id: {event_id}"]
+    lines.append(f"event: {event_type}")
+    lines.append("data: " + json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str))
+    return ("\n".join(lines) + "\n\n").encode("utf-8")
+
+
+@dataclass(frozen=True)
+class Event:
+    id: Optional[str]  # "<epoch>-<seq>"
+    seq: int
+    type: str
+    data: dict
+    sse: bytes  # codificado una vez, compartido por todos los clientes
+
+
+def _event(event_type: str, data: dict, event_id: Optional[str] = None, seq: int = 0) -> Event:
+    return Event(event_id, seq, event_type, data, format_sse(event_type, data, event_id))
+
+
+def _matches(event_type: str, types: Optional[frozenset[str]]) -> bool:
+    """``types`` holds full types (``item.created``) or prefixes (``item``)."""
+    return types is None or event_type in types or event_type.split(".", 1)[0] in types
+
+
+class Subscriber:
+    """One connected client: its bounded queue and the event types it asked for."""
+
+    def __init__(self, max_queue: int, types: Optional[frozenset[str]] = None):
+        self.queue: asyncio.Queue[Event] = asyncio.Queue(maxsize=max_queue)
+        self.types = types
+        self.dropped = False
+
+    def wants(self, event: Event) -> bool:
+        return _matches(event.type, self.types)
+
+    async def stream(self, keepalive_seconds: float = 15.0) -> AsyncIterator[bytes]:
+        """Encoded events as they arrive, a keepalive comment when idle; ends after ``dropped``."""
+        while True:
+            try:
+                event = await asyncio.wait_for(self.queue.get(), timeout=keepalive_seconds)
+            except asyncio.TimeoutError:
+                yield KEEPALIVE
+                continue
+            yield event.sse
+            if event.type == DROPPED:
+                return
+
+
+class EventBus:
+    """
+    Fan-out of pipeline events to ``Subscriber`` queues of ``max_queue`` events each.
+
+    Event ids are ``"<epoch>-<seq>"``: ``epoch`` is fixed per process (the boot
+    time by default), so an id sent by a client after a restart never matches
+    an event of the new process.
+    """
+
+    def __init__(self, max_queue: int = 256, history: int = 1024, epoch: Optional[str] = None):
+        self.max_queue = max(1, max_queue)
+        self.epoch = epoch or format(time.time_ns() // 1_000_000, "x")
+        self._subscribers: set[Subscriber] = set()
+        self._history: deque[Event] = deque(maxlen=history)
+        self._last_seq = 0
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    @property
+    def last_id(self) -> str:
+        return f"{self.epoch}-{self._last_seq}"
+
+    def _parse_id(self, event_id: str) -> Optional[int]:
+        """Sequence number of an id from this process, ``None`` for other epochs or garbage."""
+        epoch, _, seq = event_id.rpartition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def publish(self, event_type: str, **data) -> Event:
+        """Queue an event for every interested subscriber without waiting; full queues are dropped."""
+        self._last_seq += 1
+        event = _event(event_type, data, self.last_id, self._last_seq)
+        self._history.append(event)
+        EVENTS_PUBLISHED.inc(type=event_type)
+        for subscriber in list(self._subscribers):
+            if not subscriber.wants(event):
+                continue
+            try:
+                subscriber.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._drop(subscriber)
+        return event
+
+    def subscribe(self, types: Optional[Iterable[str]] = None, last_event_id: Optional[str] = None) -> Subscriber:
+        """
+        Register a client; with ``last_event_id`` the events published after it are queued first.
+
+        When those events are no longer kept (or do not fit in the queue, or
+        the id is from another process or unknown) the client gets a single
+        ``resync`` event instead and should reload its state.
+        """
+        subscriber = Subscriber(self.max_queue, frozenset(types) if types else None)
+        if last_event_id is not None and last_event_id != self.last_id:
+            last_seq = self._parse_id(last_event_id)
+            oldest = self._history[0].seq if self._history else self._last_seq + 1
+            missed = [e for e in self._history if e.seq > (last_seq or 0) and subscriber.wants(e)]
+            if (
+                last_seq is None
+                or last_seq < oldest - 1
+                or last_seq > self._last_seq
+                or len(missed) >= self.max_queue
+            ):
+                subscriber.queue.put_nowait(_event(RESYNC, {"last_id": self.last_id}, self.last_id, self._last_seq))
+            else:
+                for event in missed:
+                    subscriber.queue.put_nowait(event)
+        self._subscribers.add(subscriber)
+        EVENT_STREAM_CLIENTS.set(len(self._subscribers))
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self._subscribers.discard(subscriber)
+        EVENT_STREAM_CLIENTS.set(len(self._subscribers))
+
+    def _drop(self, subscriber: Subscriber) -> None:
+        """Cut off a slow consumer: empty its queue and leave only the ``dropped`` event."""
+        self.unsubscribe(subscriber)
+        subscriber.dropped = True
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        # Sin id: al reconectar, Last-Event-ID sigue siendo el último evento que sí recibió
+        subscriber.queue.put_nowait(_event(DROPPED, {"reason": "slow_consumer"}))
+        EVENT_STREAM_DROPPED.inc()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Folder sync: walk a tree, diff it against the stored manifest and extract changed files.
+
+Copyright (C) 2026 Smart Brain Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+A re-sync only stats the tree: files whose (mtime_ns, size) match the
+manifest are skipped without being opened. Files that did change are read
+and hashed in a worker process; when the hash is still the one in the
+manifest (touched, copied back...) the extraction is skipped too.
+"""
+import hashlib
+import io
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+from utils.cleaner import clean_text
+from utils.loader import EXTRACTORS_BY_SUFFIX, extract_text_from_stream
+
+SUPPORTED_SUFFIXES = frozenset(EXTRACTORS_BY_SUFFIX)
+
+# path -> (mtime_ns, size)
+FileStats = dict[str, tuple[int, int]]
+
+
+@dataclass
+class ManifestDiff:
+    new: list[str] = field(default_factory=list)
+    changed: list[str] = field(default_factory=list)
+    unchanged: list[str] = field(default_factory=list)
+    deleted: list[str] = field(default_factory=list)
+
+
+def _as_dir(path: str) -> str:
+    return path if path.endswith(os.sep) else path + os.sep
+
+
+def manifest_like_pattern(root: str) -> str:
+    """LIKE pattern (``ESCAPE '\\'``) matching every path under ``root``, whatever root synced it."""
+    escaped = _as_dir(root).replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escaped + "%"
+
+
+def folders_overlap(a: str, b: str) -> bool:
+    """Whether one folder contains the other (or they are the same)."""
+    a, b = _as_dir(a), _as_dir(b)
+    return a.startswith(b) or b.startswith(a)
+
+
+def scan_folder(root: str, recursive: bool = True) -> FileStats:
+    """
+    Supported files under ``root`` with their (mtime_ns, size).
+
+    Hidden files and directories are skipped and symlinked directories are
+    not followed, so a link cannot make the walk loop.
+    """
+    found: FileStats = {}
+    pending = [os.path.abspath(root)]
+    while pending:
+        directory = pending.pop()
+        try:
+            entries = os.scandir(directory)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            pending.append(entry.path)
+                    elif entry.is_file() and os.path.splitext(entry.name)[1].lower() in SUPPORTED_SUFFIXES:
+                        stat = entry.stat()
+                        found[entry.path] = (stat.st_mtime_ns, stat.st_size)
+                except OSError:
+                    continue
+    return found
+
+
+def diff_manifest(scanned: FileStats, manifest: dict[str, dict]) -> ManifestDiff:
+    """Compare a scan with manifest rows (``mtime_ns``/``size`` by path)."""
+    diff = ManifestDiff()
+    for path, (mtime_ns, size) in scanned.items():
+        known = manifest.get(path)
+        if known is None:
+            diff.new.append(path)
+        elif known["mtime_ns"] == mtime_ns and known["size"] == size:
+            diff.unchanged.append(path)
+        else:
+            diff.changed.append(path)
+    diff.deleted = [path for path in manifest if path not in scanned]
+    return diff
+
+
+def process_file(path: str, known_hash: Optional[str] = None) -> dict:
+    """
+    Read, hash and extract one file; runs in a worker process.
+
+    Returns ``path``, ``content_hash``, ``text`` (cleaned, None when the hash
+    equals ``known_hash``), ``error`` and ``seconds``. Never raises, so one
+    bad file does not abort the sync.
+    """
+    started = time.perf_counter()
+    result = {"path": path, "content_hash": None, "text": None, "error": None, "seconds": 0.0}
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        result["content_hash"] = hashlib.sha256(data).hexdigest()
+        if result["content_hash"] != known_hash:
+            suffix = os.path.splitext(path)[1].lower()
+            result["text"] = clean_text(extract_text_from_stream(io.BytesIO(data), suffix))
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["seconds"] = time.perf_counter() - started
+    return result
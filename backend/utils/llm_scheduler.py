@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Priority scheduler for calls to the local LLM (Ollama).
+
+Copyright (C) 2026 Smart Brain Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+import contextvars
+import heapq
+import itertools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Optional, TypeVar
+
+from utils.metrics import (
+    LLM_IN_FLIGHT,
+    LLM_QUEUE_DEPTH,
+    LLM_QUEUE_WAIT_SECONDS,
+    LLM_SHED_REQUESTS,
+)
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+PRIORITIES = {INTERACTIVE: 0, BACKGROUND: 1}
+
+T = TypeVar("T")
+
+
+class LLMOverloaded(Exception):
+    """The request would not finish within its deadline; ``estimated_seconds`` says by how much."""
+
+    def __init__(self, priority: str, estimated_seconds: float, deadline_seconds: float):
+        super().__init__(
+            f"{priority} LLM request would take ~{estimated_seconds:.0f}s, deadline is {deadline_seconds:.0f}s"
+        )
+        self.priority = priority
+        self.estimated_seconds = estimated_seconds
+        self.deadline_seconds = deadline_seconds
+
+
+class LLMScheduler:
+    """
+    Central dispatch queue in front of Ollama.
+
+    - At most ``concurrency`` generations run at once (match OLLAMA_NUM_PARALLEL).
+    - Waiting interactive requests always go before background ones, and
+      background requests only start when no interactive one is waiting and
+      fewer than ``background_concurrency`` background generations run.
+    - With a ``deadline``, a request whose estimated queue wait plus service
+      time exceeds it is rejected up front with ``LLMOverloaded`` so the
+      caller can shed or degrade instead of making the user wait. Service
+      times are an EWMA per priority class.
+
+    A generation cannot be preempted: a background call that already started
+    keeps its slot until it finishes. ``run_in_thread`` holds the slot until
+    the blocking call returns, even when the awaiting caller is cancelled.
+    """
+
+    def __init__(self, concurrency: int = 1, background_concurrency: Optional[int] = None, ewma_alpha: float = 0.2):
+        self.concurrency = max(1, concurrency)
+        self.background_concurrency = max(1, min(background_concurrency or self.concurrency, self.concurrency))
+        self.ewma_alpha = ewma_alpha
+        self._heap: list[tuple[int, int, str, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._active = {INTERACTIVE: 0, BACKGROUND: 0}
+        self._waiting = {INTERACTIVE: 0, BACKGROUND: 0}
+        self._service_seconds: dict[str, Optional[float]] = {INTERACTIVE: None, BACKGROUND: None}
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def active(self) -> int:
+        return self._active[INTERACTIVE] + self._active[BACKGROUND]
+
+    def stats(self) -> dict:
+        return {
+            "concurrency": self.concurrency,
+            "background_concurrency": self.background_concurrency,
+            "active": dict(self._active),
+            "waiting": dict(self._waiting),
+            "service_seconds_ewma": {
+                k: round(v, 3) if v is not None else None for k, v in self._service_seconds.items()
+            },
+        }
+
+    def estimate_seconds(self, priority: str) -> Optional[float]:
+        """Expected queue wait + service time for a new request (None without history)."""
+        service = self._service_seconds[priority]
+        if service is None:
+            return None
+        ahead = self._waiting[INTERACTIVE]
+        if priority == BACKGROUND:
+            ahead += self._waiting[BACKGROUND]
+        # Turnos completos que hay que esperar: lo que ocupa o va delante, menos los huecos libres
+        busy = max(0, self.active + ahead - self.concurrency + 1)
+        return service * busy / self.concurrency + service
+
+    def _observe(self, priority: str, seconds: float) -> None:
+        previous = self._service_seconds[priority]
+        self._service_seconds[priority] = (
+            seconds if previous is None else previous + self.ewma_alpha * (seconds - previous)
+        )
+
+    def _update_gauges(self) -> None:
+        for priority in PRIORITIES:
+            LLM_QUEUE_DEPTH.set(self._waiting[priority], priority=priority)
+            LLM_IN_FLIGHT.set(self._active[priority], priority=priority)
+
+    def _can_start(self, priority: str) -> bool:
+        if self.active >= self.concurrency:
+            return False
+        return priority == INTERACTIVE or self._active[BACKGROUND] < self.background_concurrency
+
+    def _dispatch(self) -> None:
+        while self._heap:
+            _, _, priority, future = self._heap[0]
+            if future.cancelled():
+                heapq.heappop(self._heap)
+                continue
+            # El heap está ordenado por prioridad: si la cabeza no puede empezar, nadie detrás tampoco
+            if not self._can_start(priority):
+                break
+            heapq.heappop(self._heap)
+            self._waiting[priority] -= 1
+            self._active[priority] += 1
+            future.set_result(None)
+        self._update_gauges()
+
+    def _release(self, priority: str) -> None:
+        self._active[priority] -= 1
+        self._dispatch()
+
+    async def acquire(self, priority: str = INTERACTIVE, deadline: Optional[float] = None) -> Callable[[], None]:
+        """
+        Wait for one LLM slot; returns the function that releases it (idempotent).
+
+        Raises:
+            LLMOverloaded: the estimate for this request exceeds ``deadline`` seconds
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown LLM priority '{priority}', use one of {tuple(PRIORITIES)}")
+
+        if deadline is not None:
+            estimate = self.estimate_seconds(priority)
+            if estimate is not None and estimate > deadline:
+                LLM_SHED_REQUESTS.inc(priority=priority)
+                raise LLMOverloaded(priority, estimate, deadline)
+
+        enqueued = time.perf_counter()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._heap, (PRIORITIES[priority], next(self._seq), priority, future))
+        self._waiting[priority] += 1
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Se concedió el hueco justo al cancelar: devolverlo
+                self._release(priority)
+            else:
+                self._waiting[priority] -= 1
+                self._update_gauges()
+            raise
+        LLM_QUEUE_WAIT_SECONDS.observe(time.perf_counter() - enqueued, priority=priority)
+
+        started = time.perf_counter()
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                self._observe(priority, time.perf_counter() - started)
+                self._release(priority)
+
+        return release
+
+    @asynccontextmanager
+    async def slot(self, priority: str = INTERACTIVE, deadline: Optional[float] = None) -> AsyncIterator[None]:
+        """
+        Hold one LLM slot for the duration of the block.
+
+        Raises:
+            LLMOverloaded: the estimate for this request exceeds ``deadline`` seconds
+        """
+        release = await self.acquire(priority, deadline)
+        try:
+            yield
+        finally:
+            release()
+
+    async def run_in_thread(
+        self, fn: Callable[[], T], priority: str = INTERACTIVE, deadline: Optional[float] = None
+    ) -> T:
+        """
+        Run the blocking ``fn`` (e.g. an Ollama call) in a worker thread while holding a slot.
+
+        A thread cannot be interrupted: if the caller is cancelled (client
+        gone) the slot stays taken until ``fn`` actually returns, so the GPU
+        never runs more than ``concurrency`` generations. Callers that can
+        stop ``fn`` early should signal it themselves.
+
+        Raises:
+            LLMOverloaded: the estimate for this request exceeds ``deadline`` seconds
+        """
+        release = await self.acquire(priority, deadline)
+        loop = asyncio.get_running_loop()
+        try:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="llm")
+            future = self._executor.submit(contextvars.copy_context().run, fn)
+        except BaseException:
+            release()
+            raise
+
+        def on_done(_) -> None:
+            try:
+                loop.call_soon_threadsafe(release)
+            except RuntimeError:
+                pass  # loop ya cerrado (apagado)
+
+        future.add_done_callback(on_done)
+        return await asyncio.wrap_future(future)
@@ -17,14 +17,23 @@ GNU Affero General Public License for more details.
 You should have received a copy of the GNU Affero General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
-import requests
-import io 
-from bs4 import BeautifulSoup
-import fitz  # PyMuPDF
-import pandas as pd
+import importlib
+import io
+
+# Los extractores se importan al primer uso: PyMuPDF, pandas, python-docx, odfpy,
+# bs4 y yt-dlp suman segundos y cientos de MB al arranque de la API.
+EXTRACTOR_MODULES = ("fitz", "docx", "odf.opendocument", "pandas", "bs4", "requests")
+
+
+def preload_extractors() -> None:
+    """Importa los módulos de extracción (para calentar en segundo plano)."""
+    for module in EXTRACTOR_MODULES:
+        importlib.import_module(module)
 
 
 def get_pdf_from_stream(stream: io.BytesIO) -> str:
+    import fitz  # PyMuPDF
+
     try:
         # Abrir el documento directamente desde la memoria
         doc = fitz.open(stream=stream, filetype="pdf")
@@ -46,19 +55,32 @@ def get_pdf_from_stream(stream: io.BytesIO) -> str:
         raise RuntimeError(f"Error al procesar el PDF desde memoria: {e}")
 
 
+# Etiquetas cuyo contenido nunca es texto visible de la página
+NON_TEXT_TAGS = ("script", "style", "noscript", "template", "svg")
+
+
+def get_text_from_html(html: str | bytes) -> str:
+    """Extrae el texto visible de un HTML (descargado o ya renderizado por el navegador)."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+    for tag in soup(NON_TEXT_TAGS):
+        tag.decompose()
+    return soup.get_text()
+
+
 def get_webpage_text(url: str) -> str:
     """Obtiene el texto de una página web dada su URL."""
+    import requests
+
     response = requests.get(url)
     if response.status_code == 200:
-        soup = BeautifulSoup(response.content, 'html.parser')
-        return soup.get_text()
+        return get_text_from_html(response.content)
     raise ...
 
-# pip install python-docx
-import docx
-import io
-
 def get_docx_from_stream(stream: io.BytesIO) -> str:
+    import docx  # pip install python-docx
+
     try:
         # Aseguramos que el puntero esté al inicio del "archivo"
         stream.seek(0)
@@ -68,12 +90,11 @@ def get_docx_from_stream(stream: io.BytesIO) -> str:
     except Exception as e:
         raise RuntimeError(f"Error al procesar DOCX: {e}")
 
-# pip install odfpy
-from odf import text, teletype
-from odf.opendocument import load
-import io
-
 def get_odt_from_stream(stream: io.BytesIO) -> str:
+    # pip install odfpy
+    from odf import text, teletype
+    from odf.opendocument import load
+
     try:
         stream.seek(0)
         textdoc = load(stream)
@@ -85,6 +106,8 @@ def get_odt_from_stream(stream: io.BytesIO) -> str:
 
 
 def get_excel_from_stream(stream: io.BytesIO) -> str:
+    import pandas as pd
+
     try:
         stream.seek(0)
         df = pd.read_excel(stream)
@@ -92,11 +115,34 @@ def get_excel_from_stream(stream: io.BytesIO) -> str:
     except Exception as e:
         raise RuntimeError(f"Error al procesar Excel: {e}") 
 
-import yt_dlp
-import io
-import sys
+def get_plain_text_from_stream(stream: io.BytesIO) -> str:
+    stream.seek(0)
+    return stream.read().decode("utf-8")
+
+
+# Extensión -> extractor; lo comparten las subidas, los ficheros locales y la sincronización de carpetas
+EXTRACTORS_BY_SUFFIX = {
+    ".pdf": get_pdf_from_stream,
+    ".docx": get_docx_from_stream,
+    ".odt": get_odt_from_stream,
+    ".xlsx": get_excel_from_stream,
+    ".xls": get_excel_from_stream,
+    ".txt": get_plain_text_from_stream,
+    ".csv": get_plain_text_from_stream,
+}
+
+
+def extract_text_from_stream(stream: io.BytesIO, suffix: str) -> str:
+    """Extrae el texto de un archivo según su extensión."""
+    extractor = EXTRACTORS_BY_SUFFIX.get(suffix.lower())
+    if extractor is None:
+        raise ValueError(f"Unsupported file type: {suffix}")
+    return extractor(stream)
+
 
 def get_audio_bytes(video_id) -> bytes:
+    import yt_dlp
+
     url = f"https://www.youtube.com/watch?v={video_id}"
     
     # Configuramos para capturar el flujo
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Minimal Prometheus-style metrics (counters, gauges and histograms).
+
+Copyright (C) 2026 Smart Brain Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Buckets por defecto (segundos), pensados para latencias de API y de LLM
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames: tuple[str, ...], labelvalues: tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, labelvalues)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    """Base class: one time series per combination of label values."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        header = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        return "\n".join(header + self.samples())
+
+
+class Counter(_Metric):
+    """Monotonically increasing value."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Histogram(_Metric):
+    """Cumulative histogram with fixed upper bounds."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # key -> [bucket counts..., sum, count]
+        self._values: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = [0.0] * (len(self.buckets) + 2)
+                self._values[key] = state
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the wall-clock duration of the ``with`` block."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels: str) -> float:
+        state = self._values.get(self._key(labels))
+        return state[-1] if state else 0.0
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = sorted((key, list(state)) for key, state in self._values.items())
+        lines = []
+        for key, state in items:
+            for i, bound in enumerate(self.buckets):
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {_format_value(state[i])}"
+                )
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(state[-2])}")
+            lines.append(f"{self.name}_count{labels} {_format_value(state[-1])}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together by the /metrics endpoint."""
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# --- Métricas de la aplicación ---
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "smartbrain_http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route", "status"),
+)
+EXTRACTION_SECONDS = REGISTRY.histogram(
+    "smartbrain_extraction_duration_seconds",
+    "Text extraction time by source format.",
+    ("format",),
+)
+PIPELINE_STAGE_SECONDS = REGISTRY.histogram(
+    "smartbrain_pipeline_stage_duration_seconds",
+    "Ingestion pipeline stage time (clean, chunk, encode, persist).",
+    ("stage",),
+)
+CHUNKS_PER_ITEM = REGISTRY.histogram(
+    "smartbrain_chunks_per_item",
+    "Number of embedding chunks generated per item.",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000),
+)
+EMBEDDING_QUEUE_DEPTH = REGISTRY.gauge(
+    "smartbrain_embedding_queue_depth",
+    "Items waiting for embeddings.",
+)
+DB_POOL_ACQUIRE_SECONDS = REGISTRY.histogram(
+    "smartbrain_db_pool_acquire_seconds",
+    "Time spent waiting for a PostgreSQL pool connection.",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+VECTOR_SEARCH_SECONDS = REGISTRY.histogram(
+    "smartbrain_vector_search_duration_seconds",
+    "pgvector similarity search latency.",
+    ("mode", "strategy"),
+)
+OLLAMA_TTFT_SECONDS = REGISTRY.histogram(
+    "smartbrain_ollama_time_to_first_token_seconds",
+    "Time until Ollama streams its first token.",
+    ("purpose",),
+)
+OLLAMA_GENERATION_SECONDS = REGISTRY.histogram(
+    "smartbrain_ollama_generation_duration_seconds",
+    "Total Ollama generation time.",
+    ("purpose",),
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    "smartbrain_cache_requests_total",
+    "Cache lookups by cache name and result (hit/miss).",
+    ("cache", "result"),
+)
+COALESCED_REQUESTS = REGISTRY.counter(
+    "smartbrain_coalesced_requests_total",
+    "Requests that started a computation (leader) or joined an identical in-flight one (follower).",
+    ("endpoint", "role"),
+)
+LLM_QUEUE_DEPTH = REGISTRY.gauge(
+    "smartbrain_llm_queue_depth",
+    "LLM requests waiting for a slot, by priority.",
+    ("priority",),
+)
+LLM_IN_FLIGHT = REGISTRY.gauge(
+    "smartbrain_llm_in_flight",
+    "LLM generations running, by priority.",
+    ("priority",),
+)
+LLM_QUEUE_WAIT_SECONDS = REGISTRY.histogram(
+    "smartbrain_llm_queue_wait_seconds",
+    "Time LLM requests wait in the scheduler queue.",
+    ("priority",),
+)
+LLM_SHED_REQUESTS = REGISTRY.counter(
+    "smartbrain_llm_shed_requests_total",
+    "LLM requests rejected because they would miss their deadline.",
+    ("priority",),
+)
+ITEMS_SUMMARIZED = REGISTRY.counter(
+    "smartbrain_items_summarized_total",
+    "Item summaries stored, by source (llm, hash_cache, fallback).",
+    ("source",),
+)
+FOLDER_SYNC_FILES = REGISTRY.counter(
+    "smartbrain_folder_sync_files_total",
+    "Files handled by folder sync, by result (created, updated, unchanged, deleted, failed).",
+    ("result",),
+)
+EMBEDDING_FAILURES = REGISTRY.counter(
+    "smartbrain_embedding_failures_total",
+    "Failed embedding attempts, by outcome (retry, dead_letter).",
+    ("outcome",),
+)
+EMBEDDING_LANE_DEPTH = REGISTRY.gauge(
+    "smartbrain_embedding_lane_queue_depth",
+    "Items waiting for embeddings, by lane (interactive, sync, backfill).",
+    ("lane",),
+)
+EMBEDDING_LANE_TURNS = REGISTRY.counter(
+    "smartbrain_embedding_lane_turns_total",
+    "Items embedded, by lane.",
+    ("lane",),
+)
+EMBEDDING_LANE_WAIT_SECONDS = REGISTRY.histogram(
+    "smartbrain_embedding_lane_wait_seconds",
+    "Time an item waits for its embedding turn, by lane.",
+    ("lane",),
+)
+EVENTS_PUBLISHED = REGISTRY.counter(
+    "smartbrain_events_published_total",
+    "Events published to /api/v1/events subscribers, by type.",
+    ("type",),
+)
+EVENT_STREAM_CLIENTS = REGISTRY.gauge(
+    "smartbrain_event_stream_clients",
+    "Clients connected to /api/v1/events.",
+)
+EVENT_STREAM_DROPPED = REGISTRY.counter(
+    "smartbrain_event_stream_dropped_total",
+    "Event stream clients disconnected because their buffer was full.",
+)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Opaque keyset cursors and field projection for paginated listings.
+
+Copyright (C) 2026 Smart Brain Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Iterable, Optional
+from uuid import UUID
+
+
+def encode_cursor(created_at: datetime, item_id: UUID) -> str:
+    """Cursor pointing just after the row (created_at, id) in a created_at DESC, id DESC listing."""
+    payload = json.dumps({"c": created_at.isoformat(), "i": str(item_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """
+    Inverse of ``encode_cursor``.
+
+    Raises:
+        ValueError: the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(payload["c"]), UUID(payload["i"])
+    except (binascii.Error, UnicodeError, KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def parse_fields(
+    fields: Optional[str],
+    allowed: Iterable[str],
+    default: Iterable[str],
+    required: Iterable[str] = (),
+) -> list[str]:
+    """
+    Columns to select from a comma-separated ``fields`` parameter.
+
+    ``required`` columns (e.g. the keyset columns) are always included;
+    the order of the result follows ``allowed``.
+
+    Raises:
+        ValueError: a requested field is not in ``allowed``
+    """
+    allowed = list(allowed)
+    if fields:
+        requested = {f.strip() for f in fields.split(",") if f.strip()}
+        unknown = requested.difference(allowed)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    else:
+        requested = set(default)
+    requested.update(required)
+    return [f for f in allowed if f in requested]
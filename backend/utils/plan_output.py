@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Structured (JSON schema) output for daily plan generation.
+
+Copyright (C) 2026 Smart Brain Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+MIN_TASKS = 3
+MAX_TASKS = 6
+MIN_TASK_CHARS = 10
+
+# Se pasa a Ollama como ``format``: la decodificación queda restringida a este esquema
+PLAN_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "tasks": {
+            "type": "array",
+            "minItems": MIN_TASKS,
+            "maxItems": MAX_TASKS,
+            "items": {
+                "type": "object",
+                "properties": {
+                    "text": {"type": "string", "minLength": MIN_TASK_CHARS},
+                    "item_id": {"type": ["string", "null"]},
+                },
+                "required": ["text", "item_id"],
+            },
+        },
+    },
+    "required": ["tasks"],
+}
+
+_CODE_FENCE_RE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$")
+_ID_TAG_RE = re.compile(r"\s*<id>([^<]+)</id>\s*")
+_GENERIC_TASK_RE = re.compile(r"^\W*(review stored resources|work on (the )?project)\W*$", re.IGNORECASE)
+
+
+@dataclass
+class PlanParseResult:
+    tasks: list[dict] = field(default_factory=list)  # {"text", "item_id"}
+    rejected: int = 0
+    error: Optional[str] = None
+
+    @property
+    def complete(self) -> bool:
+        return len(self.tasks) >= MIN_TASKS
+
+
+def _validate_task(raw, known_ids: Optional[set[str]]) -> Optional[dict]:
+    if not isinstance(raw, dict) or not isinstance(raw.get("text"), str):
+        return None
+    text = raw["text"].strip()
+    item_id = raw.get("item_id")
+    # Algunos modelos siguen incrustando <id>…</id> en el texto aunque haya campo propio
+    tag = _ID_TAG_RE.search(text)
+    if tag:
+        item_id = item_id or tag.group(1)
+        text = _ID_TAG_RE.sub(" ", text).strip()
+    if len(text) < MIN_TASK_CHARS or _GENERIC_TASK_RE.match(text):
+        return None
+    item_id = item_id.strip() if isinstance(item_id, str) and item_id.strip() else None
+    if item_id is not None and known_ids is not None and item_id not in known_ids:
+        item_id = None  # id inventado: se conserva la tarea, no el vínculo
+    return {"text": text, "item_id": item_id}
+
+
+def parse_plan_output(text: str, known_item_ids: Optional[Iterable[str]] = None) -> PlanParseResult:
+    """
+    Validate a structured plan answer, keeping every valid task.
+
+    Invalid tasks (too short, generic, wrong types) are dropped one by one
+    instead of rejecting the whole answer; ``item_id`` values that are not
+    among ``known_item_ids`` are cleared. At most ``MAX_TASKS`` are kept.
+    """
+    known_ids = {str(i) for i in known_item_ids} if known_item_ids is not None else None
+    try:
+        data = json.loads(_CODE_FENCE_RE.sub("", text))
+    except (TypeError, ValueError) as e:
+        return PlanParseResult(error=f"invalid JSON: {e}")
+
+    raw_tasks = data.get("tasks") if isinstance(data, dict) else data
+    if not isinstance(raw_tasks, list):
+        return PlanParseResult(error="missing 'tasks' array")
+
+    result = PlanParseResult()
+    seen = set()
+    for raw in raw_tasks:
+        task = _validate_task(raw, known_ids)
+        if task is None or task["text"].casefold() in seen:
+            result.rejected += 1
+            continue
+        seen.add(task["text"].casefold())
+        result.tasks.append(task)
+    result.tasks = result.tasks[:MAX_TASKS]
+    return result
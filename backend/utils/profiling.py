@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""On-demand sampling CPU profiler and tracemalloc helpers.
+
+Copyright (C) 2026 Smart Brain Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+
+
+class SamplingProfiler:
+    """
+    Periodically samples the stacks of all threads from a helper thread.
+
+    The result is exported in the "folded" format (``frame;frame;frame count``)
+    understood by flamegraph.pl, speedscope and inferno. Sampling covers every
+    thread, so the event loop and the executor threads used for extraction and
+    encoding both show up.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @staticmethod
+    def _frame_label(frame) -> str:
+        code = frame.f_code
+        return f"{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})"
+
+    def _sample_once(self) -> None:
+        own_id = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_label(frame))
+                frame = frame.f_back
+            stack.append(names.get(thread_id, f"thread-{thread_id}"))
+            self.samples[";".join(reversed(stack))] += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample_once()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def to_folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+_TRACEMALLOC_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+)
+
+_previous_snapshot: tracemalloc.Snapshot | None = None
+# Las llamadas corren en hilos (asyncio.to_thread): una a la vez sobre _previous_snapshot
+_tracemalloc_lock = threading.Lock()
+
+
+def tracemalloc_report(limit: int = 25, key_type: str = "lineno", frames: int = 1) -> dict:
+    """
+    Take a tracemalloc snapshot and compare it with the previous one.
+
+    The first call starts tracing (there is nothing to compare yet); following
+    calls return the top allocation sites and the growth since the last call.
+    Snapshot and diff take long on a large heap: call it from a worker thread.
+    """
+    with _tracemalloc_lock:
+        return _tracemalloc_report(limit, key_type, frames)
+
+
+def _tracemalloc_report(limit: int, key_type: str, frames: int) -> dict:
+    global _previous_snapshot
+
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+        _previous_snapshot = None
+        return {"status": "started", "frames": frames}
+
+    snapshot = tracemalloc.take_snapshot().filter_traces(_TRACEMALLOC_FILTERS)
+    current, peak = tracemalloc.get_traced_memory()
+
+    def _stat(stat) -> dict:
+        return {
+            "location": str(stat.traceback),
+            "size_bytes": stat.size,
+            "count": stat.count,
+            "size_diff_bytes": getattr(stat, "size_diff", None),
+            "count_diff": getattr(stat, "count_diff", None),
+        }
+
+    report = {
+        "status": "tracing",
+        "traced_current_bytes": current,
+        "traced_peak_bytes": peak,
+        "top": [_stat(s) for s in snapshot.statistics(key_type)[:limit]],
+        "growth": [],
+    }
+    if _previous_snapshot is not None:
+        diff = snapshot.compare_to(_previous_snapshot, key_type)
+        report["growth"] = [_stat(s) for s in diff[:limit] if s.size_diff > 0]
+    _previous_snapshot = snapshot
+    return report
+
+
+def stop_tracemalloc() -> None:
+    """Stop tracing and drop the stored snapshot."""
+    global _previous_snapshot
+    with _tracemalloc_lock:
+        _previous_snapshot = None
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
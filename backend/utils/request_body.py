@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Decoding of request bodies compressed by the client (e.g. the browser extension).
+
+Copyright (C) 2026 Smart Brain Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import zlib
+from typing import AsyncIterator, Optional
+
+# zlib wbits: 16+ -> gzip, 15 -> zlib (HTTP "deflate")
+_WBITS = {"gzip": 16 + zlib.MAX_WBITS, "x-gzip": 16 + zlib.MAX_WBITS, "deflate": zlib.MAX_WBITS}
+
+
+class BodyTooLarge(ValueError):
+    pass
+
+
+async def read_body(chunks: AsyncIterator[bytes], max_bytes: int) -> bytes:
+    """
+    Collect a streamed request body, stopping as soon as it exceeds ``max_bytes``.
+
+    Unlike ``Request.body()`` this also bounds chunked requests, which carry
+    no Content-Length to check up front.
+
+    Raises:
+        BodyTooLarge: more than ``max_bytes`` bytes were sent
+    """
+    parts, size = [], 0
+    async for chunk in chunks:
+        size += len(chunk)
+        if size > max_bytes:
+            raise BodyTooLarge(f"body larger than {max_bytes} bytes")
+        parts.append(chunk)
+    return b"".join(parts)
+
+
+def decompress_body(data: bytes, content_encoding: Optional[str], max_bytes: int) -> bytes:
+    """
+    Decode a request body sent with ``Content-Encoding`` gzip, deflate or identity.
+
+    Inflates incrementally and stops at ``max_bytes``, so a small
+    compressed body cannot expand into gigabytes in memory.
+
+    Raises:
+        BodyTooLarge: the decoded body exceeds ``max_bytes``
+        ValueError: unsupported encoding or corrupt data
+    """
+    encoding = (content_encoding or "identity").strip().lower()
+    if encoding == "identity":
+        if len(data) > max_bytes:
+            raise BodyTooLarge(f"body larger than {max_bytes} bytes")
+        return data
+    if encoding not in _WBITS:
+        raise ValueError(f"Unsupported Content-Encoding: {content_encoding}")
+
+    inflater = zlib.decompressobj(_WBITS[encoding])
+    try:
+        out = inflater.decompress(data, max_bytes + 1)
+        if len(out) > max_bytes or inflater.unconsumed_tail:
+            raise BodyTooLarge(f"body larger than {max_bytes} bytes")
+        out += inflater.flush()
+    except zlib.error as e:
+        raise ValueError(f"Corrupt {encoding} body: {e}") from e
+    if not inflater.eof:
+        raise ValueError(f"Truncated {encoding} body")
+    if len(out) > max_bytes:
+        raise BodyTooLarge(f"body larger than {max_bytes} bytes")
+    return out
+
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Exponential backoff for background jobs that retry failed items.
+
+Copyright (C) 2026 Smart Brain Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import random
+from typing import Optional
+
+
+def backoff_seconds(attempt: int, base: float, cap: float, jitter: float = 0.0) -> float:
+    """
+    Delay before retrying after failed attempt number ``attempt`` (1-based).
+
+    ``base * 2 ** (attempt - 1)`` capped at ``cap``; ``jitter`` spreads it
+    by up to that fraction either way so items that failed together do not
+    all come back in the same pass.
+    """
+    delay = min(cap, base * 2 ** max(0, attempt - 1))
+    if jitter:
+        delay *= random.uniform(1 - jitter, 1 + jitter)
+    return delay
+
+
+def next_retry(attempts: int, max_attempts: int, base: float, cap: float, jitter: float = 0.0) -> Optional[float]:
+    """Seconds until the next try after ``attempts`` failures, or None when the item should be dead-lettered."""
+    if attempts >= max_attempts:
+        return None
+    return backoff_seconds(attempts, base, cap, jitter)
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Single-flight coalescing of identical concurrent requests, with stream fan-out.
+
+Copyright (C) 2026 Smart Brain Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+import re
+import unicodedata
+from typing import Any, AsyncIterator, Awaitable, Callable, Hashable
+
+_SPACES_RE = re.compile(r"\s+")
+
+
+def normalize_message(text: str) -> str:
+    """Key form of a message: NFKC, case-folded, whitespace collapsed."""
+    return _SPACES_RE.sub(" ", unicodedata.normalize("NFKC", text).casefold()).strip()
+
+
+class _Broadcast:
+    """Items of one in-flight stream; every subscriber replays them from the start."""
+
+    def __init__(self, on_abandoned: Callable[[], None] | None = None):
+        self.items: list[Any] = []
+        self.done = False
+        self.error: BaseException | None = None
+        self.task: asyncio.Task | None = None
+        self.subscribers = 0  # se incrementa al suscribirse, antes de empezar a leer
+        self._on_abandoned = on_abandoned
+        self._cond = asyncio.Condition()
+
+    async def publish(self, item: Any) -> None:
+        async with self._cond:
+            self.items.append(item)
+            self._cond.notify_all()
+
+    async def close(self, error: BaseException | None = None) -> None:
+        async with self._cond:
+            self.done = True
+            self.error = error
+            self._cond.notify_all()
+
+    async def subscribe(self) -> AsyncIterator[Any]:
+        index = 0
+        try:
+            while True:
+                async with self._cond:
+                    await self._cond.wait_for(lambda: len(self.items) > index or self.done)
+                    new_items = self.items[index:]
+                    finished = self.done and index + len(new_items) == len(self.items)
+                for item in new_items:
+                    yield item
+                index += len(new_items)
+                if finished:
+                    if self.error is not None:
+                        raise self.error
+                    return
+        finally:
+            self.subscribers -= 1
+            # Nadie lee ya el stream: pararlo en vez de generarlo entero para nadie
+            if self.subscribers == 0 and not self.done and self._on_abandoned:
+                self._on_abandoned()
+
+
+class SingleFlight:
+    """
+    Run at most one computation per key at a time.
+
+    Callers that arrive while a computation for their key is in flight wait
+    for it instead of starting their own. The computation runs in its own
+    task, so a leader that disconnects does not cancel it for the others.
+    The key is released when the computation finishes: later callers start a
+    fresh one (results are not cached here).
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Task] = {}
+        self._streams: dict[Hashable, _Broadcast] = {}
+
+    def in_flight(self) -> int:
+        return len(self._calls) + len(self._streams)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> tuple[Any, bool]:
+        """Result of ``fn()`` for ``key`` and whether it was shared with an earlier caller."""
+        task = self._calls.get(key)
+        shared = task is not None
+        if task is None:
+            task = asyncio.create_task(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._release(self._calls, key, t))
+        return await asyncio.shield(task), shared
+
+    def stream(self, key: Hashable, factory: Callable[[], AsyncIterator[Any]]) -> tuple[AsyncIterator[Any], bool]:
+        """
+        Subscribe to the stream ``factory()`` for ``key``.
+
+        Late subscribers first receive everything produced so far, then the
+        rest live, so every caller sees the complete stream. When the last
+        subscriber closes before the end, ``factory()`` is cancelled and the
+        key released, so an abandoned stream stops producing.
+        """
+        broadcast = self._streams.get(key)
+        shared = broadcast is not None
+        if broadcast is None:
+            def abandon() -> None:
+                self._release(self._streams, key, broadcast)
+                broadcast.task.cancel()
+
+            broadcast = _Broadcast(on_abandoned=abandon)
+            self._streams[key] = broadcast
+            broadcast.task = asyncio.create_task(self._pump(key, broadcast, factory))
+        broadcast.subscribers += 1
+        return broadcast.subscribe(), shared
+
+    async def _pump(self, key: Hashable, broadcast: _Broadcast, factory: Callable[[], AsyncIterator[Any]]) -> None:
+        try:
+            async for item in factory():
+                await broadcast.publish(item)
+            await broadcast.close()
+        except BaseException as e:
+            # También ante cancelación: los suscriptores no deben quedarse esperando
+            await broadcast.close(e)
+            if not isinstance(e, Exception):
+                raise
+        finally:
+            self._release(self._streams, key, broadcast)
+
+    @staticmethod
+    def _release(registry: dict, key: Hashable, value: Any) -> None:
+        if registry.get(key) is value:
+            del registry[key]
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Batched item summarization with the local LLM: prompt, output schema and parsing.
+
+Copyright (C) 2026 Smart Brain Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import hashlib
+import json
+
+from utils.digest import summarize_text
+
+SUMMARY_MAX_CHARS = 300
+SUMMARY_INPUT_CHARS = 2000
+
+# Se pasa a Ollama como ``format``; "n" es el número del documento en el prompt
+SUMMARY_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "summaries": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "n": {"type": "integer"},
+                    "summary": {"type": "string"},
+                },
+                "required": ["n", "summary"],
+            },
+        },
+    },
+    "required": ["summaries"],
+}
+
+
+def content_hash(text: str) -> str:
+    """Cache key of a summary: SHA-256 of the text it was made from."""
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def build_summary_prompt(items: list[dict], input_chars: int = SUMMARY_INPUT_CHARS) -> str:
+    """One prompt for a batch of items; each document is cut to its first ``input_chars``."""
+    documents = []
+    for n, item in enumerate(items, 1):
+        excerpt = (item.get("extracted_text") or "")[:input_chars]
+        documents.append(f"### Document {n}: {item.get('title') or 'Untitled'}\n{excerpt}")
+    return (
+        "Summarize each document below in one or two sentences (max 40 words) in the language of the document. "
+        "State what it is about and any decision, date or figure that matters. No preamble.\n\n"
+        + "\n\n".join(documents)
+        + "\n\nAnswer with a JSON object: "
+        '{"summaries": [{"n": <document number>, "summary": "<summary>"}]}'
+    )
+
+
+def parse_summaries(text: str, count: int, max_chars: int = SUMMARY_MAX_CHARS) -> dict[int, str]:
+    """
+    Summaries by position (0-based) from the structured answer.
+
+    Entries with an unknown number or an empty summary are ignored, so the
+    caller can fall back only for the documents that are missing.
+    """
+    try:
+        data = json.loads(text)
+    except (TypeError, ValueError):
+        return {}
+    entries = data.get("summaries") if isinstance(data, dict) else None
+    if not isinstance(entries, list):
+        return {}
+
+    result = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        n, summary = entry.get("n"), entry.get("summary")
+        if not isinstance(n, int) or not 1 <= n <= count or not isinstance(summary, str):
+            continue
+        summary = summarize_text(summary, max_chars)
+        if summary:
+            result.setdefault(n - 1, summary)
+    return result
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""NDJSON export/import of items with their chunks and packed float32 vectors.
+
+Copyright (C) 2026 Smart Brain Contributors
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+Format (one JSON object per line):
+
+    {"type": "header", "version": 1, "model_id": "all-MiniLM-L6-v2@1", "dimension": 384, ...}
+    {"type": "item", "id": "...", "title": "...", ..., "chunks": [{"index": 0, "text": "...", "vector": "<base64>"}]}
+
+``vector`` is the base64 of the little-endian float32 array, so a 384-d
+vector takes 2 KB instead of ~8 KB of decimal text and is decoded without
+parsing floats. Vectors are only restored when the header model is
+configured here with the same dimension; otherwise the items are imported
+without chunks and the embedding worker re-embeds them.
+"""
+import base64
+import json
+import struct
+import sys
+from array import array
+from datetime import datetime
+from typing import AsyncIterator, Iterable, Optional
+from uuid import UUID
+
+from utils.embeddings import EMBEDDING_MODELS
+
+FORMAT_VERSION = 1
+
+# Columnas de items que viajan en la exportación (el id se conserva: reimportar es idempotente)
+ITEM_FIELDS = (
+    "id", "source_type", "title", "url", "file_path", "filename", "tags", "extracted_text",
+    "status", "error_message", "summary", "summary_hash", "created_at", "updated_at",
+)
+
+_PGVECTOR_HEADER = struct.Struct(">HH")  # dim, unused
+_BIG_ENDIAN_HOST = sys.byteorder == "big"
+
+
+def _float32(raw: bytes, swap: bool) -> array:
+    values = array("f")
+    values.frombytes(raw)
+    if swap:
+        values.byteswap()
+    return values
+
+
+def pgvector_to_b64(data: bytes) -> str:
+    """pgvector binary wire format (big-endian float32) -> base64 of little-endian float32."""
+    dim, _ = _PGVECTOR_HEADER.unpack_from(data)
+    body = data[_PGVECTOR_HEADER.size:_PGVECTOR_HEADER.size + 4 * dim]
+    # BE -> LE es siempre un byteswap, sea cual sea el orden del host
+    return base64.b64encode(_float32(body, swap=True).tobytes()).decode("ascii")
+
+
+def b64_to_pgvector(text: str, dimension: Optional[int] = None) -> bytes:
+    """
+    Base64 of little-endian float32 -> pgvector binary wire format.
+
+    Raises:
+        ValueError: not a float32 array, or not ``dimension`` values long
+    """
+    raw = base64.b64decode(text, validate=True)
+    if len(raw) % 4:
+        raise ValueError("vector is not a float32 array")
+    dim = len(raw) // 4
+    if dimension is not None and dim != dimension:
+        raise ValueError(f"vector has {dim} dimensions, expected {dimension}")
+    return _PGVECTOR_HEADER.pack(dim, 0) + _float32(raw, swap=True).tobytes()
+
+
+def vector_to_b64(vector: Iterable[float]) -> str:
+    values = array("f", vector)
+    if _BIG_ENDIAN_HOST:
+        values.byteswap()
+    return base64.b64encode(values.tobytes()).decode("ascii")
+
+
+def b64_to_vector(text: str) -> list[float]:
+    return _float32(base64.b64decode(text, validate=True), swap=_BIG_ENDIAN_HOST).tolist()
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def dumps_line(record: dict) -> str:
+    return json.dumps(record, ensure_ascii=False, default=_json_default, separators=(",", ":")) + "\n"
+
+
+def header_record(model_id: Optional[str], dimension: Optional[int]) -> dict:
+    return {
+        "type": "header",
+        "version": FORMAT_VERSION,
+        "model_id": model_id,
+        "dimension": dimension,
+        "exported_at": datetime.now().astimezone().isoformat(),
+    }
+
+
+def item_record(item: dict, chunks: list[dict]) -> dict:
+    """Export record of one item; ``chunks`` rows carry the raw pgvector bytes in ``embedding``."""
+    record = {"type": "item", **{field: item.get(field) for field in ITEM_FIELDS}}
+    record["chunks"] = [
+        {
+            "index": chunk["chunk_index"],
+            "text": chunk["chunk_text"],
+            "vector": pgvector_to_b64(chunk["embedding"]) if chunk.get("embedding") is not None else None,
+        }
+        for chunk in chunks
+    ]
+    return record
+
+
+def item_row(record: dict) -> tuple:
+    """Values of ITEM_FIELDS for COPY, parsed from an export record."""
+    values = []
+    for field in ITEM_FIELDS:
+        value = record.get(field)
+        if field == "id":
+            value = UUID(value)
+        elif field in ("created_at", "updated_at") and value is not None:
+            value = datetime.fromisoformat(value)
+        elif field == "tags":
+            value = list(value or [])
+        elif field == "status" and value is None:
+            value = "ready"
+        values.append(value)
+    return tuple(values)
+
+
+def chunk_rows(record: dict, dimension: int) -> list[tuple]:
+    """(item_id, chunk_index, chunk_text, pgvector bytes) rows; chunks without vector are skipped."""
+    item_id = UUID(record["id"])
+    return [
+        (item_id, int(chunk["index"]), chunk["text"], b64_to_pgvector(chunk["vector"], dimension))
+        for chunk in record.get("chunks") or []
+        if chunk.get("vector")
+    ]
+
+
+def reusable_vectors(header: dict) -> Optional[tuple[str, int]]:
+    """(model_id, dimension) if the export's vectors match a model configured here, else None."""
+    spec = EMBEDDING_MODELS.get(header.get("model_id"))
+    if spec is None or spec.dimension != header.get("dimension"):
+        return None
+    return spec.id, spec.dimension
+
+
+async def export_ndjson(dao, model_id: Optional[str], dimension: Optional[int], batch_size: int = 200) -> AsyncIterator[str]:
+    """Header line, then one line per item; ``dao.export_items`` streams from a single snapshot."""
+    yield dumps_line(header_record(model_id, dimension))
+    async for batch in dao.export_items(model_id, batch_size=batch_size):
+        for item, chunks in batch:
+            yield dumps_line(item_record(item, chunks))
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Split a byte stream into lines without holding more than one line in memory.
+
+    Only the new chunk is searched for newlines; the pieces of a partial line
+    are joined once it ends, so a very long line (an item with many vectors)
+    costs linear time instead of re-copying the buffer on every chunk.
+    """
+    pieces: list[bytes] = []
+    async for chunk in chunks:
+        start = 0
+        while (end := chunk.find(b"\n", start)) >= 0:
+            pieces.append(chunk[start:end])
+            line = b"".join(pieces)
+            pieces.clear()
+            if line.strip():
+                yield line.decode("utf-8")
+            start = end + 1
+        if start < len(chunk):
+            pieces.append(chunk[start:])
+    line = b"".join(pieces)
+    if line.strip():
+        yield line.decode("utf-8")
+
+
+async def import_ndjson(
+    dao,
+    lines: AsyncIterator[str],
+    vector_model_id=reusable_vectors,
+    batch_size: int = 200,
+) -> dict:
+    """
+    Bulk-load an export through ``dao.import_batch`` (COPY), ``batch_size`` items at a time.
+
+    ``vector_model_id(header)`` returns ``(model_id, dimension)`` when the
+    vectors of that export can be restored as-is, or None to import the
+    items without chunks (they are re-embedded later).
+
+    Raises:
+        ValueError: the stream does not start with a supported header, or a line is invalid
+    """
+    stats = {"items_read": 0, "items_imported": 0, "chunks_imported": 0, "vectors_reused": False, "model_id": None}
+    target = None
+    items, chunks = [], []
+    line_number = 0
+
+    async def flush():
+        inserted, chunk_count = await dao.import_batch(items, chunks, target[0] if target else None)
+        stats["items_imported"] += inserted
+        stats["chunks_imported"] += chunk_count
+        items.clear()
+        chunks.clear()
+
+    async for line in lines:
+        line_number += 1
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"line {line_number}: invalid JSON") from e
+
+        if line_number == 1:
+            if record.get("type") != "header" or record.get("version") != FORMAT_VERSION:
+                raise ValueError(f"line 1: expected a version {FORMAT_VERSION} header")
+            target = vector_model_id(record)
+            stats["vectors_reused"] = target is not None
+            stats["model_id"] = target[0] if target else record.get("model_id")
+            continue
+        if record.get("type") != "item":
+            raise ValueError(f"line {line_number}: unknown record type {record.get('type')!r}")
+
+        try:
+            items.append(item_row(record))
+            if target:
+                chunks.extend(chunk_rows(record, target[1]))
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"line {line_number}: {e}") from e
+        stats["items_read"] += 1
+        if len(items) >= batch_size:
+            await flush()
+
+    if line_number == 0:
+        raise ValueError("empty import")
+    if items:
+        await flush()
+    return stats
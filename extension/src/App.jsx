@@ -11,8 +11,37 @@ import React, { useState, useEffect } from 'react';
 const browserAPI = typeof browser !== 'undefined' ? browser : chrome;
 const API_BASE_URL = 'http://localhost:5000/api/v1';
 
+// Lee el HTML ya renderizado de la pestaña (incluye páginas tras login).
+// Devuelve null en páginas donde no se puede inyectar (chrome://, visor de PDF...).
+const capturePageHtml = async (tabId) => {
+    if (!tabId || !browserAPI.scripting) return null;
+    try {
+        const [injection] = await browserAPI.scripting.executeScript({
+            target: { tabId },
+            func: () => document.documentElement.outerHTML,
+        });
+        return injection?.result || null;
+    } catch (err) {
+        console.warn('Page capture failed, sending URL only:', err);
+        return null;
+    }
+};
+
+// gzip con CompressionStream cuando el navegador lo soporta (el HTML baja ~5-10x)
+const encodeBody = async (payload) => {
+    const json = JSON.stringify(payload);
+    if (typeof CompressionStream === 'undefined') {
+        return { body: json, headers: { 'Content-Type': 'application/json' } };
+    }
+    const stream = new Blob([json]).stream().pipeThrough(new CompressionStream('gzip'));
+    return {
+        body: await new Response(stream).arrayBuffer(),
+        headers: { 'Content-Type': 'application/json', 'Content-Encoding': 'gzip' },
+    };
+};
+
 const App = () => {
-    const [pageInfo, setPageInfo] = useState({ title: '', url: '', category: 'Work' });
+    const [pageInfo, setPageInfo] = useState({ tabId: null, title: '', url: '', category: 'Work' });
     const [status, setStatus] = useState('idle'); // idle, saving, success, error
 
     const categories = [
@@ -29,6 +58,7 @@ const App = () => {
                 if (activeTab) {
                     setPageInfo(prev => ({
                         ...prev,
+                        tabId: activeTab.id ?? null,
                         title: activeTab.title || '',
                         url: activeTab.url || ''
                     }));
@@ -43,15 +73,24 @@ const App = () => {
         if (!pageInfo.url) return;
         setStatus('saving');
         try {
-            const response = await fetch(`${API_BASE_URL}/items/urls`, {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({
-                    url: pageInfo.url,
-                    title: pageInfo.title || null,
-                    tags: [pageInfo.category]
-                }),
-            });
+            const item = {
+                url: pageInfo.url,
+                title: pageInfo.title || null,
+                tags: [pageInfo.category]
+            };
+            const html = await capturePageHtml(pageInfo.tabId);
+            let response;
+            if (html) {
+                // El backend extrae el texto de este HTML sin volver a descargar la página
+                const { body, headers } = await encodeBody({ ...item, html });
+                response = await fetch(`${API_BASE_URL}/items/pages`, { method: 'POST', headers, body });
+            } else {
+                response = await fetch(`${API_BASE_URL}/items/urls`, {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify(item),
+                });
+            }
 
             if (response.ok) {
                 setStatus('success');
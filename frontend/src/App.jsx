@@ -172,10 +172,32 @@ function App() {
       }
     }
     fetchDailyPlan()
-    // Refresh daily plan every 3 seconds
-    const interval = setInterval(fetchDailyPlan, 3000)
+    // Refrescar el plan solo cuando el backend avisa de un cambio (SSE); sondeo cada 3 s como respaldo
+    let interval = null
+    let events = null
+    const startPolling = () => {
+      if (!interval) interval = setInterval(fetchDailyPlan, 3000)
+    }
+    if (typeof EventSource === 'undefined') {
+      startPolling()
+    } else {
+      events = new EventSource(`${API_BASE_URL}/events?types=plan,task`)
+      for (const type of ['plan.regenerated', 'task.completed', 'resync']) {
+        events.addEventListener(type, fetchDailyPlan)
+      }
+      events.onopen = () => {
+        if (interval) {
+          clearInterval(interval)
+          interval = null
+          fetchDailyPlan()
+        }
+      }
+      // EventSource reconecta solo; mientras tanto, sondear
+      events.onerror = startPolling
+    }
     return () => {
-      clearInterval(interval)
+      if (events) events.close()
+      if (interval) clearInterval(interval)
       if (slowDailyGoalsTimerRef.current) {
         clearTimeout(slowDailyGoalsTimerRef.current)
       }